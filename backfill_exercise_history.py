@@ -0,0 +1,62 @@
+import argparse
+import os
+from typing import Any
+
+from mypy_boto3_dynamodb.service_resource import Table
+
+from src.adapters.repository import (
+    DynamoDBExerciseStatsRepository,
+    get_dynamodb_table,
+    get_workout_logs_repository,
+)
+
+
+def workout_log_owners(table: Table) -> set[str]:
+    """Find every owner with at least one workout log."""
+    scan: dict[str, Any] = {
+        "FilterExpression": "contains(PK, :log) AND attribute_exists(logs)",
+        "ProjectionExpression": "#owner",
+        "ExpressionAttributeNames": {"#owner": "owner"},
+        "ExpressionAttributeValues": {":log": "#WORKOUT_LOG"},
+    }
+    owners: set[str] = set()
+    while True:
+        response = table.scan(**scan)
+        owners.update(item["owner"] for item in response["Items"])  # type: ignore
+        if not (last_evaluated_key := response.get("LastEvaluatedKey")):
+            return owners
+        scan["ExclusiveStartKey"] = last_evaluated_key
+
+
+def main() -> None:
+    """Write the exercise history entries of every workout log.
+
+    Entries are written on every workout log write; logs written before that are
+    missing from `/exercises/{name}/history` until backfilled. Entries are
+    replaced, so the backfill can be run again safely.
+    """
+    parser = argparse.ArgumentParser(description="Backfill exercise history.")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    table_name = os.getenv("TABLE_NAME")
+    if not table_name:
+        print("TABLE_NAME environment variable not set")
+        return
+
+    dynamodb_url = os.getenv("DYNAMODB_URL")
+    table = get_dynamodb_table(table_name, dynamodb_url)
+    logs_repository = get_workout_logs_repository(table_name, dynamodb_url)
+    stats_repository = DynamoDBExerciseStatsRepository(table)
+    backfilled = 0
+    for owner in sorted(workout_log_owners(table)):
+        for workout_log in logs_repository.iter_items(owner=owner):
+            if not args.dry_run:
+                stats_repository.write_exercise_history(owner, workout_log)
+            backfilled += 1
+        print(f"{'Found' if args.dry_run else 'Backfilled'} logs of {owner!r}")
+    print(f"{'Found' if args.dry_run else 'Backfilled'} {backfilled} workout logs")
+
+
+if __name__ == "__main__":
+    main()
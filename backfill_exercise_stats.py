@@ -0,0 +1,42 @@
+import argparse
+import os
+
+from backfill_exercise_history import workout_log_owners
+from src.adapters.repository import (
+    DynamoDBExerciseStatsRepository,
+    get_dynamodb_table,
+    get_workout_logs_repository,
+)
+
+
+def main() -> None:
+    """Rebuild the exercise stats and records of every owner from their workout logs.
+
+    Workout log writes apply their changes as deltas to the stored stats and
+    records, so the logs written before they were kept must be counted first, or
+    editing or deleting them takes away what was never added. Stats and records
+    are replaced, so the backfill can be run again safely.
+    """
+    parser = argparse.ArgumentParser(description="Backfill exercise stats.")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    table_name = os.getenv("TABLE_NAME")
+    if not table_name:
+        print("TABLE_NAME environment variable not set")
+        return
+
+    dynamodb_url = os.getenv("DYNAMODB_URL")
+    table = get_dynamodb_table(table_name, dynamodb_url)
+    logs_repository = get_workout_logs_repository(table_name, dynamodb_url)
+    stats_repository = DynamoDBExerciseStatsRepository(table)
+    owners = sorted(workout_log_owners(table))
+    for owner in owners:
+        if not args.dry_run:
+            stats_repository.rebuild(owner, logs_repository.iter_items(owner=owner))
+        print(f"{'Found' if args.dry_run else 'Rebuilt'} stats of {owner!r}")
+    print(f"{'Found' if args.dry_run else 'Rebuilt'} stats of {len(owners)} owners")
+
+
+if __name__ == "__main__":
+    main()
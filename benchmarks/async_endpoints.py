@@ -0,0 +1,111 @@
+"""Compare requests/sec of sync and async endpoints under concurrent load.
+
+The repository is a stand-in that sleeps for a configurable latency to model a
+DynamoDB round trip, so the result reflects how each dispatch model queues work
+rather than how fast the mock database is.
+
+Usage:
+    poetry run python -m benchmarks.async_endpoints --clients 128 --requests 4000
+"""
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Any
+
+import anyio
+import httpx
+from fastapi import Depends, FastAPI
+
+from src import model
+from src.adapters.repository import (
+    AsyncWorkoutRepository,
+    AsyncWorkoutRepositoryAdapter,
+    Page,
+    WorkoutRepository,
+)
+
+
+class _SleepingPlanRepository:
+    """A workout plan repository that only simulates network latency."""
+
+    def __init__(self, latency: float):
+        self._latency = latency
+        self._plans = [
+            model.WorkoutPlan(
+                name=f"plan-{i}", exercises=[model.ExercisePlan(name="Squat", sets=5)]
+            )
+            for i in range(10)
+        ]
+
+    def list(self, owner: str, **kwargs: Any) -> Page[model.WorkoutPlan]:
+        time.sleep(self._latency)
+        return Page(items=self._plans)
+
+
+def _create_app(latency: float) -> FastAPI:
+    sync_repository = _SleepingPlanRepository(latency)
+    async_repository = AsyncWorkoutRepositoryAdapter(sync_repository)  # type: ignore
+    app = FastAPI()
+
+    def get_sync_repository() -> WorkoutRepository[model.WorkoutPlan]:
+        return sync_repository  # type: ignore
+
+    async def get_async_repository() -> AsyncWorkoutRepository[model.WorkoutPlan]:
+        return async_repository
+
+    @app.get("/sync")
+    def list_sync(
+        repository: WorkoutRepository[model.WorkoutPlan] = Depends(get_sync_repository),
+    ) -> list[model.WorkoutPlan]:
+        return repository.list(owner="benchmark").items
+
+    @app.get("/async")
+    async def list_async(
+        repository: AsyncWorkoutRepository[model.WorkoutPlan] = Depends(
+            get_async_repository
+        ),
+    ) -> list[model.WorkoutPlan]:
+        return (await repository.list(owner="benchmark")).items
+
+    return app
+
+
+async def _run(app: FastAPI, path: str, clients: int, requests: int) -> float:
+    """Fire `requests` requests from `clients` concurrent clients, return req/s."""
+    remaining = iter(range(requests))
+
+    async def worker(client: httpx.AsyncClient) -> None:
+        for _ in remaining:
+            response = await client.get(path)
+            response.raise_for_status()
+
+    transport = httpx.ASGITransport(app=app)  # type: ignore
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as c:
+        start = time.perf_counter()
+        async with anyio.create_task_group() as tg:
+            for _ in range(clients):
+                tg.start_soon(worker, c)
+        elapsed = time.perf_counter() - start
+    return requests / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=128)
+    parser.add_argument("--requests", type=int, default=4000)
+    parser.add_argument("--latency-ms", type=float, default=10.0)
+    args = parser.parse_args()
+
+    app = _create_app(latency=args.latency_ms / 1000)
+    print(
+        f"{args.requests} requests, {args.clients} concurrent clients, "
+        f"{args.latency_ms}ms simulated DynamoDB latency"
+    )
+    for path in ("/sync", "/async"):
+        rps = anyio.run(_run, app, path, args.clients, args.requests)
+        print(f"{path:<8} {rps:10.1f} req/s")
+
+
+if __name__ == "__main__":
+    main()
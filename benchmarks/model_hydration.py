@@ -0,0 +1,83 @@
+"""Measure the per-item cost of hydrating and returning stored workout logs.
+
+Hydration compares validating every item (`WorkoutLog(**item)`) with building
+it from trusted data (`WorkoutLog.from_trusted(item)`). Responding compares
+FastAPI validating the models against the response model and encoding them with
+`jsonable_encoder`, with rendering the models directly as the list endpoints do.
+Items are shaped like DynamoDB returns them, with every number a Decimal.
+
+Usage:
+    poetry run python -m benchmarks.model_hydration --sets 20
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from decimal import Decimal
+from typing import Any, Callable
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import parse_obj_as
+
+from src import model
+from src.api.responses import dumps
+
+
+def _items(count: int, sets: int) -> list[dict[str, Any]]:
+    items = []
+    for i in range(count):
+        log = model.WorkoutLog(
+            name=f"workout-{i}",
+            plans=[model.ExercisePlan(name="Squat", sets=sets)],
+            logs=[
+                model.ExerciseLog(
+                    name=f"exercise-{exercise}",
+                    sets=[
+                        model.SetLog(weight=Decimal("102.5"), reps=5)
+                        for _ in range(sets)
+                    ],
+                )
+                for exercise in range(5)
+            ],
+        )
+        item = json.loads(log.json(), parse_float=Decimal, parse_int=Decimal)
+        items.append({"PK": "OWNER#benchmark", "SK": f"WORKOUT_LOG#{log.id}", **item})
+    return items
+
+
+def _timed(count: int, repeat: int, run: Callable[[], Any]) -> float:
+    """Return the mean cost of `run` per item in microseconds."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        run()
+    return (time.perf_counter() - start) / repeat / count * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=200)
+    parser.add_argument("--sets", type=int, default=20, help="sets per exercise")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    items = _items(args.items, args.sets)
+    logs = [model.WorkoutLog.from_trusted(item) for item in items]
+    results = {
+        "hydrate, validated": lambda: [model.WorkoutLog(**item) for item in items],
+        "hydrate, trusted": lambda: [
+            model.WorkoutLog.from_trusted(item) for item in items
+        ],
+        "respond, validated": lambda: json.dumps(
+            jsonable_encoder(parse_obj_as(list[model.WorkoutLog], logs))
+        ),
+        "respond, rendered": lambda: dumps(logs),
+    }
+    print(f"{args.items} workout logs of {5 * args.sets} sets")
+    for name, run in results.items():
+        microseconds = _timed(args.items, args.repeat, run)
+        print(f"{name:<20} {microseconds:10.1f} us/item")
+
+
+if __name__ == "__main__":
+    main()
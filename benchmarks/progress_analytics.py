@@ -0,0 +1,73 @@
+"""Measure how progress analytics scale with the size of a workout log history.
+
+Synthetic histories of one exercise are loaded into arrays and bucketed by week.
+Loading is the one Python pass over the sets; bucketing is vectorised, so both
+should grow linearly, shown by a steady cost per set.
+
+Usage:
+    poetry run python -m benchmarks.progress_analytics --sets 10000 20000 40000 80000
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+from src import model
+from src.analytics import exercise_progress, load_exercise_sets
+
+_SETS_PER_LOG = 5
+
+
+def _history(sets: int) -> list[model.WorkoutLog]:
+    start = datetime(2015, 1, 1, tzinfo=timezone.utc)
+    return [
+        model.WorkoutLog(
+            name=f"workout-{i}",
+            created_at=(start + timedelta(days=2 * i)).isoformat(),
+            plans=[],
+            logs=[
+                model.ExerciseLog(
+                    name="Squat",
+                    sets=[
+                        model.SetLog(
+                            weight=Decimal(random.randint(80, 280)) / 2,
+                            reps=random.randint(1, 10),
+                        )
+                        for _ in range(_SETS_PER_LOG)
+                    ],
+                )
+            ],
+        )
+        for i in range(sets // _SETS_PER_LOG)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sets", type=int, nargs="+", default=[10_000, 20_000, 40_000, 80_000]
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'sets':>8} {'load ms':>10} {'bucket ms':>10} {'ns/set':>8}")
+    for sets in args.sets:
+        history = _history(sets)
+        load = bucket = 0.0
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            exercise_sets = load_exercise_sets(history, exercise="Squat")
+            loaded = time.perf_counter()
+            exercise_progress(exercise_sets, bucket=model.ProgressBucket.WEEK)
+            load += loaded - start
+            bucket += time.perf_counter() - loaded
+        load, bucket = load / args.repeat, bucket / args.repeat
+        per_set = (load + bucket) / sets * 1e9
+        print(f"{sets:>8} {load * 1e3:>10.2f} {bucket * 1e3:>10.2f} {per_set:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
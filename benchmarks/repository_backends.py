@@ -0,0 +1,183 @@
+"""Compare CRUD and list throughput of the workout log repository backends.
+
+Every backend creates, gets, lists a page at a time, patches and deletes the same
+synthetic workout logs, one call at a time, and reports operations per second.
+The DynamoDB backend runs against DynamoDB Local (see docker-compose.yml) in a
+table created for the run and deleted afterwards; SQLite runs on a temporary
+database file.
+
+Usage:
+    docker-compose up -d
+    poetry run python -m benchmarks.repository_backends --workouts 500
+    poetry run python -m benchmarks.repository_backends --backends sqlite memory
+"""
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+import uuid
+from contextlib import contextmanager
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+import boto3
+
+from src import model
+from src.adapters.repository import (
+    DynamoDBWorkoutLogRepository,
+    InMemoryWorkoutRepository,
+    SQLiteWorkoutRepository,
+    WorkoutRepository,
+    get_dynamodb_table,
+)
+
+_OWNER = "benchmark@email.com"
+
+
+def _workout_log(i: int) -> model.WorkoutLogCreate:
+    return model.WorkoutLogCreate(
+        name=f"workout-{i}",
+        plans=[model.ExercisePlan(name="Squat", sets=5)],
+        logs=[
+            model.ExerciseLog(
+                name=f"exercise-{exercise}",
+                sets=[model.SetLog(weight=Decimal("102.5"), reps=5) for _ in range(5)],
+            )
+            for exercise in range(4)
+        ],
+    )
+
+
+@contextmanager
+def dynamodb_repository(
+    url: str | None,
+) -> Iterator[WorkoutRepository[model.WorkoutLog]]:
+    """Yield a workout log repository on a table created for it at `url`."""
+    client = boto3.client("dynamodb", endpoint_url=url)
+    table_name = f"benchmark-{uuid.uuid4()}"
+    client.create_table(
+        AttributeDefinitions=[
+            {"AttributeName": "PK", "AttributeType": "S"},
+            {"AttributeName": "SK", "AttributeType": "S"},
+        ],
+        TableName=table_name,
+        KeySchema=[
+            {"AttributeName": "PK", "KeyType": "HASH"},
+            {"AttributeName": "SK", "KeyType": "RANGE"},
+        ],
+        BillingMode="PAY_PER_REQUEST",
+    )
+    try:
+        yield DynamoDBWorkoutLogRepository(
+            get_dynamodb_table(table_name, url),
+            workout_type=model.WorkoutType.LOG,
+            model=model.WorkoutLog,
+        )
+    finally:
+        client.delete_table(TableName=table_name)
+
+
+@contextmanager
+def sqlite_repository() -> Iterator[WorkoutRepository[model.WorkoutLog]]:
+    """Yield a workout log repository on a temporary SQLite database."""
+    with tempfile.TemporaryDirectory() as directory:
+        repository = SQLiteWorkoutRepository(
+            str(Path(directory) / "workouts.db"),
+            workout_type=model.WorkoutType.LOG,
+            model=model.WorkoutLog,
+        )
+        try:
+            yield repository
+        finally:
+            repository.close()
+
+
+@contextmanager
+def memory_repository() -> Iterator[WorkoutRepository[model.WorkoutLog]]:
+    """Yield an empty in-memory workout log repository."""
+    yield InMemoryWorkoutRepository(model.WorkoutType.LOG, model.WorkoutLog)
+
+
+def _rate(calls: int, run: Callable[[], Any]) -> float:
+    """Return the calls per second of `run`, which makes `calls` calls."""
+    start = time.perf_counter()
+    run()
+    return calls / (time.perf_counter() - start)
+
+
+def _list_all(repository: WorkoutRepository[model.WorkoutLog], limit: int) -> int:
+    pages, cursor = 0, None
+    while True:
+        page = repository.list(owner=_OWNER, limit=limit, cursor=cursor)
+        pages += 1
+        if not (cursor := page.next_cursor):
+            return pages
+
+
+def _benchmark(
+    repository: WorkoutRepository[model.WorkoutLog], workouts: int, page_size: int
+) -> dict[str, float]:
+    creates = [_workout_log(i) for i in range(workouts)]
+    ids: list[str] = []
+    update = model.WorkoutLogUpdate(name="patched")
+    rates = {
+        "create": _rate(
+            workouts,
+            lambda: ids.extend(
+                repository.create(model=create, owner=_OWNER).id for create in creates
+            ),
+        ),
+        "get": _rate(
+            workouts, lambda: [repository.get(id=id, owner=_OWNER) for id in ids]
+        ),
+    }
+    pages = -(-workouts // page_size)
+    rates["list page"] = _rate(pages, lambda: _list_all(repository, page_size))
+    rates["patch"] = _rate(
+        workouts,
+        lambda: [
+            repository.patch(id=id, update_model=update, owner=_OWNER) for id in ids
+        ],
+    )
+    rates["delete"] = _rate(
+        workouts, lambda: [repository.delete(id=id, owner=_OWNER) for id in ids]
+    )
+    return rates
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workouts", type=int, default=500)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument(
+        "--backends",
+        nargs="+",
+        choices=["dynamodb", "sqlite", "memory"],
+        default=["dynamodb", "sqlite"],
+    )
+    parser.add_argument("--dynamodb-url", default="http://localhost:9999")
+    args = parser.parse_args()
+
+    backends: dict[str, Callable[[], Any]] = {
+        "dynamodb": lambda: dynamodb_repository(args.dynamodb_url),
+        "sqlite": sqlite_repository,
+        "memory": memory_repository,
+    }
+    results = {}
+    for backend in args.backends:
+        with backends[backend]() as repository:
+            results[backend] = _benchmark(repository, args.workouts, args.page_size)
+
+    operations = list(next(iter(results.values())))
+    print(f"{'ops/s':<10}" + "".join(f"{backend:>12}" for backend in results))
+    for operation in operations:
+        print(
+            f"{operation:<10}"
+            + "".join(f"{rates[operation]:>12.0f}" for rates in results.values())
+        )
+
+
+if __name__ == "__main__":
+    main()
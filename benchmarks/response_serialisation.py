@@ -0,0 +1,92 @@
+"""Measure serialisation time and payload size of a workout log history.
+
+Compares FastAPI's default rendering (`jsonable_encoder` then stdlib `json`),
+the same conversion rendered by orjson, and orjson encoding the models directly,
+then reports the bytes sent uncompressed and with each negotiated compression.
+
+Usage:
+    poetry run python -m benchmarks.response_serialisation --workouts 500
+"""
+from __future__ import annotations
+
+import argparse
+import gzip
+import json
+import random
+import time
+from decimal import Decimal
+from typing import Any, Callable
+
+import brotli
+from fastapi.encoders import jsonable_encoder
+
+from src import model
+from src.api.responses import dumps
+from src.config import config
+
+
+def _workout_logs(count: int) -> list[model.WorkoutLog]:
+    exercises = ["Squat", "Bench Press", "Deadlift", "Overhead Press", "Barbell Row"]
+    return [
+        model.WorkoutLog(
+            name=f"workout-{i}",
+            plans=[model.ExercisePlan(name=name, sets=5) for name in exercises],
+            logs=[
+                model.ExerciseLog(
+                    name=name,
+                    sets=[
+                        model.SetLog(
+                            weight=Decimal(random.randint(40, 200)) / 2,
+                            reps=random.randint(1, 12),
+                        )
+                        for _ in range(5)
+                    ],
+                )
+                for name in exercises
+            ],
+        )
+        for i in range(count)
+    ]
+
+
+def _timed(repeat: int, serialise: Callable[[], Any]) -> float:
+    """Return the mean cost of `serialise` in milliseconds."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        serialise()
+    return (time.perf_counter() - start) / repeat * 1e3
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workouts", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    logs = _workout_logs(args.workouts)
+    results = {
+        "jsonable_encoder + json": _timed(
+            args.repeat,
+            lambda: json.dumps(jsonable_encoder(logs), separators=(",", ":")).encode(),
+        ),
+        "jsonable_encoder + orjson": _timed(
+            args.repeat, lambda: dumps(jsonable_encoder(logs))
+        ),
+        "orjson on models": _timed(args.repeat, lambda: dumps(logs)),
+    }
+    print(f"{args.workouts} workout logs")
+    for name, milliseconds in results.items():
+        print(f"{name:<26} {milliseconds:8.2f} ms")
+
+    body = dumps(logs)
+    payloads = {
+        "identity": len(body),
+        "gzip": len(gzip.compress(body, compresslevel=config.COMPRESSION_GZIP_LEVEL)),
+        "br": len(brotli.compress(body, quality=config.COMPRESSION_BROTLI_QUALITY)),
+    }
+    for encoding, size in payloads.items():
+        print(f"{encoding:<26} {size:8d} bytes ({size / len(body):.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,549 @@
+"""Benchmark repositories, models, serialisation and the API against a baseline.
+
+Every case times single calls in `--rounds` rounds and reports the lowest p50 of
+a round and the p95 and p99 of all calls, then traces a few more calls with
+tracemalloc for the peak memory each allocates.
+
+- repository/<backend>/*: create, get, list, update and delete workout logs on
+  each backend, seeded with `--users` synthetic users that each have a history
+  of `--history` workout logs. DynamoDB only runs if named in `--backends`, on
+  moto unless `--dynamodb-url` points at DynamoDB Local; moto is slow enough to
+  dominate the adapter's own cost, so keep its baselines separate.
+- model/*: hydrate a large workout log, trusted and validated.
+- json/*: render a page of workout logs and a large workout log.
+- api/*: the same operations as full requests through `TestClient` to the app
+  on the memory backend.
+
+`--cases` selects cases by glob pattern; as operations use the workout logs of
+the ones before, selecting any operation runs all of them.
+
+`--save` stores the results as a baseline, and `--compare` exits with status 1
+if the p50 latency or allocations of any case regress past the tolerance and
+past an absolute floor, so that noise in fast cases does not fail it, and again
+when the regressed cases are run once more. Latencies are compared relative to
+the reference case, a fixed pure Python workload timed between the groups of
+cases of every run, so that they compare across machines of the same kind. No
+baseline is committed; record one from the base branch where the comparison
+runs, e.g. in the same CI job.
+
+Usage:
+    git checkout main && poetry run python -m benchmarks.suite --save baseline.json
+    git checkout - && poetry run python -m benchmarks.suite --compare baseline.json
+    poetry run python -m benchmarks.suite --cases 'repository/sqlite/*' 'api/*'
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from decimal import Decimal
+from fnmatch import fnmatch
+from typing import Any, Callable, Iterator
+
+import jwt
+from fastapi.testclient import TestClient
+
+from src import model
+from src.adapters import repository
+from src.api.responses import dumps
+from src.config import RepositoryBackend, config
+
+from .repository_backends import (
+    dynamodb_repository,
+    memory_repository,
+    sqlite_repository,
+)
+
+_EXERCISES = ["Squat", "Bench Press", "Deadlift", "Overhead Press", "Barbell Row"]
+_WARMUP_CALLS = 10
+_TRACED_CALLS = 10
+# Regressions smaller than these are noise, however large relative to the baseline.
+_LATENCY_FLOOR_US = 5.0
+_ALLOC_FLOOR_BYTES = 1024
+# Tokens are not verified without JWKS_URL, the secret only needs to be long enough.
+_TOKEN_SECRET = "benchmark-" * 4
+
+Case = Callable[[int], Any]
+_REFERENCE = "reference"
+# The cases of every repository and of the API, each using the data of the last.
+_OPERATIONS = ("create", "get", "list", "update", "delete")
+
+
+@dataclass(frozen=True)
+class Settings:
+    users: int
+    history: int
+    sets: int
+    large_log_sets: int
+    page_size: int
+    iterations: int
+    rounds: int
+
+    @property
+    def calls(self) -> int:
+        """Get the number of calls made per case, warm up and traced included."""
+        return _WARMUP_CALLS + self.rounds * self.iterations + _TRACED_CALLS
+
+
+@dataclass(frozen=True)
+class Result:
+    p50_us: float
+    p95_us: float
+    p99_us: float
+    peak_alloc_bytes: int
+
+
+def _workout_log(rng: random.Random, name: str, sets: int) -> model.WorkoutLogCreate:
+    return model.WorkoutLogCreate(
+        name=name,
+        plans=[model.ExercisePlan(name=exercise, sets=sets) for exercise in _EXERCISES],
+        logs=[
+            model.ExerciseLog(
+                name=exercise,
+                sets=[
+                    model.SetLog(
+                        weight=Decimal(rng.randint(40, 400)) / 2,
+                        reps=rng.randint(1, 12),
+                    )
+                    for _ in range(sets)
+                ],
+            )
+            for exercise in _EXERCISES
+        ],
+    )
+
+
+def _owners(settings: Settings) -> list[str]:
+    return [f"user-{i}@email.com" for i in range(settings.users)]
+
+
+def _seed(
+    workouts: repository.WorkoutRepository[model.WorkoutLog],
+    settings: Settings,
+    rng: random.Random,
+) -> list[tuple[str, str]]:
+    """Create the history of every synthetic user, return its (owner, id) pairs."""
+    ids: list[tuple[str, str]] = []
+    for owner in _owners(settings):
+        logs = [
+            _workout_log(rng, f"workout-{i}", settings.sets)
+            for i in range(settings.history)
+        ]
+        results = workouts.create_many(logs, owner=owner)
+        ids.extend((owner, result.id) for result in results)
+    return ids
+
+
+def _repository_cases(
+    workouts: repository.WorkoutRepository[model.WorkoutLog],
+    settings: Settings,
+    rng: random.Random,
+) -> dict[str, Case]:
+    """Get the cases of a repository, to run in order: updates and deletes use
+    the workout logs that creates made."""
+    owners = _owners(settings)
+    history = _seed(workouts, settings, rng)
+    reads = [rng.choice(history) for _ in range(settings.calls)]
+    creates = [
+        _workout_log(rng, f"new-{i}", settings.sets) for i in range(settings.calls)
+    ]
+    created: list[tuple[str, str]] = []
+    update = model.WorkoutLogUpdate(name="renamed")
+
+    def create(i: int) -> None:
+        owner = owners[i % len(owners)]
+        created.append((owner, workouts.create(model=creates[i], owner=owner).id))
+
+    def get(i: int) -> None:
+        owner, id = reads[i]
+        workouts.get(id=id, owner=owner)
+
+    def list_page(i: int) -> None:
+        workouts.list(owner=owners[i % len(owners)], limit=settings.page_size)
+
+    def patch(i: int) -> None:
+        owner, id = created[i]
+        workouts.patch(id=id, update_model=update, owner=owner)
+
+    def delete(i: int) -> None:
+        owner, id = created[i]
+        workouts.delete(id=id, owner=owner)
+
+    return {
+        "create": create,
+        "get": get,
+        "list": list_page,
+        "update": patch,
+        "delete": delete,
+    }
+
+
+def _reference_case(rng: random.Random) -> Case:
+    """A fixed pure Python workload, which scales with the speed of the machine."""
+    values = [{"weight": rng.random(), "reps": rng.randrange(20)} for _ in range(500)]
+
+    def reference(i: int) -> None:
+        ranked = sorted(values, key=lambda value: value["weight"] * value["reps"])
+        json.loads(json.dumps(ranked))
+
+    return reference
+
+
+def _model_cases(settings: Settings, rng: random.Random) -> dict[str, Case]:
+    large_log = model.WorkoutLog(
+        **_workout_log(rng, "large", settings.large_log_sets).dict()
+    )
+    # Shaped like DynamoDB returns items, with every number a Decimal.
+    item = json.loads(large_log.json(), parse_float=Decimal, parse_int=Decimal)
+    page = [
+        model.WorkoutLog(**_workout_log(rng, f"workout-{i}", settings.sets).dict())
+        for i in range(settings.page_size)
+    ]
+    return {
+        "model/hydrate large log, trusted": lambda _: model.WorkoutLog.from_trusted(
+            item
+        ),
+        "model/hydrate large log, validated": lambda _: model.WorkoutLog(**item),
+        "json/page of logs": lambda _: dumps(page),
+        "json/large log": lambda _: dumps(large_log),
+    }
+
+
+def _api_cases(settings: Settings, rng: random.Random) -> dict[str, Case]:
+    """Get the API cases, to run in order and with the memory backend configured."""
+    from src.main import app
+
+    logs = f"{config.API_V1_STR}/logs"
+    client = TestClient(app)
+    owners = _owners(settings)
+    headers = [
+        {"Authorization": jwt.encode({"cognito:username": owner}, _TOKEN_SECRET)}
+        for owner in owners
+    ]
+    history = _seed(repository.get_workout_logs_repository(), settings, rng)
+    reads = [
+        (owners.index(owner), id)
+        for owner, id in (rng.choice(history) for _ in range(settings.calls))
+    ]
+    creates = [
+        json.loads(_workout_log(rng, f"new-{i}", settings.sets).json())
+        for i in range(settings.calls)
+    ]
+    created: list[tuple[int, str]] = []
+
+    def request(method: str, url: str, user: int, **kwargs: Any) -> Any:
+        response = client.request(method, url, headers=headers[user], **kwargs)
+        response.raise_for_status()
+        return response
+
+    def create(i: int) -> None:
+        user = i % len(owners)
+        response = request("POST", f"{logs}/", user, json=creates[i])
+        created.append((user, response.json()["id"]))
+
+    def get(i: int) -> None:
+        user, id = reads[i]
+        request("GET", f"{logs}/{id}", user)
+
+    def list_page(i: int) -> None:
+        request(
+            "GET", f"{logs}/", i % len(owners), params={"limit": settings.page_size}
+        )
+
+    def patch(i: int) -> None:
+        user, id = created[i]
+        request("PATCH", f"{logs}/{id}", user, json={"name": "renamed"})
+
+    def delete(i: int) -> None:
+        user, id = created[i]
+        request("DELETE", f"{logs}/{id}", user)
+
+    return {
+        "create": create,
+        "get": get,
+        "list": list_page,
+        "update": patch,
+        "delete": delete,
+    }
+
+
+@contextmanager
+def _repository(
+    backend: str, dynamodb_url: str | None
+) -> Iterator[repository.WorkoutRepository[model.WorkoutLog]]:
+    if backend == "sqlite":
+        with sqlite_repository() as sqlite:
+            yield sqlite
+    elif backend == "memory":
+        with memory_repository() as memory:
+            yield memory
+    elif dynamodb_url:
+        with dynamodb_repository(dynamodb_url) as dynamodb:
+            yield dynamodb
+    else:
+        from moto import mock_dynamodb
+
+        for name in ("AWS_ACCESS_KEY_ID", "AWS_SECRET_ACCESS_KEY"):
+            os.environ.setdefault(name, "benchmark")
+        os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+        repository.reset_dynamodb_tables()
+        try:
+            with mock_dynamodb(), dynamodb_repository(None) as dynamodb:
+                yield dynamodb
+        finally:
+            repository.reset_dynamodb_tables()
+
+
+@contextmanager
+def _memory_backend() -> Iterator[None]:
+    backend = config.REPOSITORY_BACKEND
+    config.REPOSITORY_BACKEND = RepositoryBackend.MEMORY
+    repository.reset_memory_repositories()
+    try:
+        yield
+    finally:
+        config.REPOSITORY_BACKEND = backend
+        repository.reset_memory_repositories()
+
+
+def _measure(case: Case, iterations: int, rounds: int) -> Result:
+    """Time `rounds` rounds of `iterations` calls of `case`, then trace the
+    allocations of a few more.
+
+    The p50 is the lowest of any round, which a busy machine slows least. Like
+    `timeit`, calls are timed with the garbage collector off, as its pauses depend
+    on everything the cases before left on the heap. Every call gets its own
+    index, so calls that use up state, like deletes, can each use different data.
+    """
+    for i in range(_WARMUP_CALLS):
+        case(i)
+    durations: list[int] = []
+    p50s = []
+    timed = _WARMUP_CALLS + rounds * iterations
+    for start in range(_WARMUP_CALLS, timed, iterations):
+        round_durations = []
+        gc.collect()
+        gc.disable()
+        try:
+            for i in range(start, start + iterations):
+                started = time.perf_counter_ns()
+                case(i)
+                round_durations.append(time.perf_counter_ns() - started)
+        finally:
+            gc.enable()
+        p50s.append(statistics.median(round_durations))
+        durations.extend(round_durations)
+    peaks = []
+    tracemalloc.start()
+    try:
+        for i in range(timed, timed + _TRACED_CALLS):
+            tracemalloc.reset_peak()
+            allocated = tracemalloc.get_traced_memory()[0]
+            case(i)
+            peaks.append(tracemalloc.get_traced_memory()[1] - allocated)
+    finally:
+        tracemalloc.stop()
+    percentiles = statistics.quantiles(durations, n=100, method="inclusive")
+    return Result(
+        p50_us=round(min(p50s) / 1e3, 1),
+        p95_us=round(percentiles[94] / 1e3, 1),
+        p99_us=round(percentiles[98] / 1e3, 1),
+        peak_alloc_bytes=int(statistics.median(peaks)),
+    )
+
+
+def run(
+    settings: Settings,
+    backends: list[str],
+    patterns: list[str],
+    dynamodb_url: str | None = None,
+    seed: int = 0,
+) -> dict[str, Result]:
+    """Run every case whose name matches any of `patterns`."""
+    rng = random.Random(seed)
+    results: dict[str, Result] = {}
+    references: list[Result] = []
+
+    def selected(name: str) -> bool:
+        return any(fnmatch(name, pattern) for pattern in patterns)
+
+    def measure_reference() -> None:
+        # Timed between groups of cases, so its median follows the machine's load.
+        reference = _reference_case(random.Random(seed))
+        references.append(_measure(reference, settings.iterations, settings.rounds))
+
+    def measure(cases: dict[str, Case]) -> None:
+        for name, case in cases.items():
+            results[name] = _measure(case, settings.iterations, settings.rounds)
+            print(f"  {name}", file=sys.stderr)
+
+    def measure_operations(prefix: str, cases: dict[str, Case]) -> None:
+        # Operations depend on the ones before, so all run if any is selected.
+        measure({prefix + name: case for name, case in cases.items()})
+
+    measure_reference()
+    for backend in backends:
+        prefix = f"repository/{backend}/"
+        if any(selected(prefix + operation) for operation in _OPERATIONS):
+            with _repository(backend, dynamodb_url) as workouts:
+                measure_operations(prefix, _repository_cases(workouts, settings, rng))
+            measure_reference()
+    measure(
+        {
+            name: case
+            for name, case in _model_cases(settings, rng).items()
+            if selected(name)
+        }
+    )
+    if any(selected(f"api/{operation}") for operation in _OPERATIONS):
+        with _memory_backend():
+            measure_operations("api/", _api_cases(settings, rng))
+    measure_reference()
+    return {_REFERENCE: _median_result(references), **results}
+
+
+def _median_result(results: list[Result]) -> Result:
+    return Result(
+        p50_us=statistics.median(result.p50_us for result in results),
+        p95_us=statistics.median(result.p95_us for result in results),
+        p99_us=statistics.median(result.p99_us for result in results),
+        peak_alloc_bytes=int(statistics.median(r.peak_alloc_bytes for r in results)),
+    )
+
+
+def _scale(results: dict[str, Result], baseline: dict[str, Result]) -> float:
+    """Get how much slower this run's machine is than the baseline's."""
+    if _REFERENCE not in results or _REFERENCE not in baseline:
+        return 1.0
+    return results[_REFERENCE].p50_us / baseline[_REFERENCE].p50_us
+
+
+def compare(
+    results: dict[str, Result],
+    baseline: dict[str, Result],
+    tolerance: float,
+    alloc_tolerance: float,
+) -> list[str]:
+    """Get the cases whose p50 latency or allocations regressed from `baseline`.
+
+    Latencies are scaled by the reference case's, so that only a change relative
+    to the machine's speed counts. Either must also grow by more than its floor.
+    """
+    scale = _scale(results, baseline)
+
+    def regressed(result: Result, base: Result) -> bool:
+        p50_us = base.p50_us * scale
+        peak_alloc_bytes = base.peak_alloc_bytes
+        return (
+            result.p50_us > p50_us * (1 + tolerance)
+            and result.p50_us - p50_us > _LATENCY_FLOOR_US
+        ) or (
+            result.peak_alloc_bytes > peak_alloc_bytes * (1 + alloc_tolerance)
+            and result.peak_alloc_bytes - peak_alloc_bytes > _ALLOC_FLOOR_BYTES
+        )
+
+    return [
+        name
+        for name, result in results.items()
+        if name != _REFERENCE
+        and (base := baseline.get(name))
+        and regressed(result, base)
+    ]
+
+
+def _print(results: dict[str, Result], baseline: dict[str, Result]) -> None:
+    scale = _scale(results, baseline)
+    print(
+        f"{'case':<40} {'p50 us':>10} {'p95 us':>10} {'p99 us':>10} "
+        f"{'peak KiB':>10} {'p50 vs base':>12}"
+    )
+    for name, result in results.items():
+        base = baseline.get(name)
+        change = f"{result.p50_us / (base.p50_us * scale) - 1:+.0%}" if base else "new"
+        print(
+            f"{name:<40} {result.p50_us:>10.1f} {result.p95_us:>10.1f} "
+            f"{result.p99_us:>10.1f} {result.peak_alloc_bytes / 1024:>10.1f} "
+            f"{change:>12}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=5)
+    parser.add_argument("--history", type=int, default=200, help="logs per user")
+    parser.add_argument("--sets", type=int, default=5, help="sets per exercise")
+    parser.add_argument("--large-log-sets", type=int, default=100)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--iterations", type=int, default=200, help="per round")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument(
+        "--backends",
+        nargs="+",
+        choices=[backend.value for backend in RepositoryBackend],
+        default=[RepositoryBackend.MEMORY.value, RepositoryBackend.SQLITE.value],
+    )
+    parser.add_argument("--cases", nargs="+", default=["*"], help="glob patterns")
+    parser.add_argument("--dynamodb-url", help="DynamoDB Local instead of moto")
+    parser.add_argument("--save", metavar="PATH", help="store results as baseline")
+    parser.add_argument("--compare", metavar="PATH", help="baseline to compare to")
+    parser.add_argument("--tolerance", type=float, default=0.5)
+    parser.add_argument("--alloc-tolerance", type=float, default=0.10)
+    args = parser.parse_args()
+
+    settings = Settings(
+        users=args.users,
+        history=args.history,
+        sets=args.sets,
+        large_log_sets=args.large_log_sets,
+        page_size=args.page_size,
+        iterations=args.iterations,
+        rounds=args.rounds,
+    )
+    baseline: dict[str, Result] = {}
+    if args.compare:
+        with open(args.compare) as file:
+            stored = json.load(file)
+        if stored["settings"] != asdict(settings):
+            sys.exit(f"{args.compare} was recorded with {stored['settings']}")
+        baseline = {
+            name: Result(**result) for name, result in stored["results"].items()
+        }
+
+    results = run(settings, args.backends, args.cases, args.dynamodb_url)
+    _print(results, baseline)
+
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump(
+                {
+                    "settings": asdict(settings),
+                    "results": {name: asdict(r) for name, r in results.items()},
+                },
+                file,
+                indent=2,
+            )
+            file.write("\n")
+    if regressions := compare(results, baseline, args.tolerance, args.alloc_tolerance):
+        print(f"Running again: {', '.join(regressions)}", file=sys.stderr)
+        rerun = run(settings, args.backends, regressions, args.dynamodb_url)
+        rerun = {
+            name: result
+            for name, result in rerun.items()
+            if name in regressions or name == _REFERENCE
+        }
+        if regressions := compare(
+            rerun, baseline, args.tolerance, args.alloc_tolerance
+        ):
+            sys.exit(f"Regressed from {args.compare}: {', '.join(regressions)}")
+
+
+if __name__ == "__main__":
+    main()
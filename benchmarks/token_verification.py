@@ -0,0 +1,70 @@
+"""Measure the per-request cost of identity token decoding.
+
+Compares unverified decoding (the previous behaviour), RS256 verification of
+every request, and verification with the claims cache that `get_user_email`
+uses, where repeat requests of a session skip the signature check.
+
+Usage:
+    poetry run python -m benchmarks.token_verification --requests 20000
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from typing import Any, Callable
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from src.adapters.cache import InMemoryCacheBackend
+from src.adapters.identity import JWKSCache, TokenVerifier
+
+
+def _timed(requests: int, decode: Callable[[], Any]) -> float:
+    """Return the mean cost of `decode` in microseconds."""
+    start = time.perf_counter()
+    for _ in range(requests):
+        decode()
+    return (time.perf_counter() - start) / requests * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20_000)
+    args = parser.parse_args()
+
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    jwks = {
+        "keys": [
+            {
+                **json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(key.public_key())),
+                "kid": "benchmark",
+                "alg": "RS256",
+            }
+        ]
+    }
+    token = jwt.encode(
+        {"cognito:username": "user@email.com", "exp": time.time() + 3600},
+        key,
+        algorithm="RS256",
+        headers={"kid": "benchmark"},
+    )
+    key_set = JWKSCache("benchmark", refresh_interval=3600, fetch=lambda _: jwks)
+    cached = TokenVerifier(key_set=key_set, cache=InMemoryCacheBackend(100))
+    uncached = TokenVerifier(key_set=key_set, cache=InMemoryCacheBackend(0))
+
+    results = {
+        "unverified decode": _timed(
+            args.requests,
+            lambda: jwt.decode(token, options={"verify_signature": False}),
+        ),
+        "verified, uncached": _timed(args.requests, lambda: uncached.verify(token)),
+        "verified, cached": _timed(args.requests, lambda: cached.verify(token)),
+    }
+    for name, microseconds in results.items():
+        print(f"{name:<20} {microseconds:8.2f} us/request")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+import argparse
+import os
+from datetime import datetime
+from typing import Any, Iterator
+
+import boto3
+from botocore.exceptions import ClientError
+from mypy_boto3_dynamodb.service_resource import Table
+
+from src.adapters.repository import DynamoDBExerciseStatsRepository
+from src.model import uuid7
+from src.stats import normalise_exercise_name
+
+LEGACY_LOG_SK_PREFIX = "WORKOUT_PLAN#"
+LOG_SK_PREFIX = "WORKOUT_LOG#"
+
+
+def legacy_log_items(table: Table) -> Iterator[dict[str, Any]]:
+    """Yield workout log items still keyed by a random id, and re-keyed ones whose
+    history entries and records may still hold it."""
+    scan: dict[str, Any] = {
+        "FilterExpression": "contains(PK, :log) AND (begins_with(SK, :legacy) OR "
+        "(begins_with(SK, :migrated) AND attribute_exists(legacy_id)))",
+        "ExpressionAttributeValues": {
+            ":legacy": LEGACY_LOG_SK_PREFIX,
+            ":migrated": LOG_SK_PREFIX,
+            ":log": "#WORKOUT_LOG",
+        },
+    }
+    while True:
+        response = table.scan(**scan)
+        yield from response["Items"]
+        if not (last_evaluated_key := response.get("LastEvaluatedKey")):
+            return
+        scan["ExclusiveStartKey"] = last_evaluated_key
+
+
+def migrate_item(table: Table, item: dict[str, Any]) -> str:
+    """Re-key a legacy workout log under a time-ordered id derived from created_at.
+
+    The new item, the removal of the old one and a bump of the owner's collection
+    version, which changes the ETag of their list, are written in one transaction.
+    The previous id is kept as `legacy_id` until the log's exercise history
+    entries and the records it holds are moved to the new id, so that a rerun
+    after a crash in between finishes moving them. Returns the new id.
+    """
+    if item["SK"].startswith(LOG_SK_PREFIX):
+        _rekey_exercises(table, item, legacy_id=item["legacy_id"], id=item["id"])
+        return item["id"]
+
+    created_at = datetime.fromisoformat(item["created_at"])
+    id = uuid7(timestamp_ms=int(created_at.timestamp() * 1000))
+    client = table.meta.client
+    client.transact_write_items(
+        TransactItems=[
+            {
+                "Put": {
+                    "TableName": table.name,
+                    "Item": {
+                        **item,
+                        "SK": f"{LOG_SK_PREFIX}{id}",
+                        "id": id,
+                        "legacy_id": item["id"],
+                    },
+                    "ConditionExpression": "attribute_not_exists(PK)",
+                }
+            },
+            {
+                "Delete": {
+                    "TableName": table.name,
+                    "Key": {"PK": item["PK"], "SK": item["SK"]},
+                    "ConditionExpression": "attribute_exists(PK)",
+                }
+            },
+            {
+                "Update": {
+                    "TableName": table.name,
+                    "Key": {"PK": f"{item['PK']}#VERSION", "SK": "VERSION"},
+                    "UpdateExpression": "ADD #version :one",
+                    "ExpressionAttributeNames": {"#version": "version"},
+                    "ExpressionAttributeValues": {":one": 1},
+                }
+            },
+        ]  # type: ignore
+    )
+    _rekey_exercises(table, item, legacy_id=item["id"], id=id)
+    return id
+
+
+def _rekey_exercises(
+    table: Table, item: dict[str, Any], legacy_id: str, id: str
+) -> None:
+    exercises = {normalise_exercise_name(log["name"]) for log in item.get("logs", [])}
+    stats_repository = DynamoDBExerciseStatsRepository(table)
+    stats_repository.rekey_exercise_history(
+        item["owner"],
+        exercises,
+        performed_at=item["created_at"],
+        legacy_id=legacy_id,
+        workout_log_id=id,
+    )
+    stats_repository.rekey_exercise_records(
+        item["owner"], exercises, legacy_id=legacy_id, workout_log_id=id
+    )
+    try:
+        table.update_item(
+            Key={"PK": item["PK"], "SK": f"{LOG_SK_PREFIX}{id}"},
+            UpdateExpression="REMOVE legacy_id",
+            ConditionExpression="attribute_exists(PK)",
+        )
+    except ClientError as e:
+        # The log was deleted since, there is nothing left to mark.
+        if e.response["Error"]["Code"] != "ConditionalCheckFailedException":
+            raise
+
+
+def main() -> None:
+    """Re-key workout logs so they can be listed by date range.
+
+    Logs created before time-ordered ids stay readable by their old id but are
+    left out of `since`/`until` queries until migrated. Migrated logs get a new id,
+    so clients holding old ids must re-list their logs afterwards.
+    """
+    parser = argparse.ArgumentParser(description="Migrate workout log sort keys.")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    table_name = os.getenv("TABLE_NAME")
+    if not table_name:
+        print("TABLE_NAME environment variable not set")
+        return
+
+    dynamodb = boto3.resource("dynamodb", endpoint_url=os.getenv("DYNAMODB_URL"))
+    table: Table = dynamodb.Table(table_name)  # type: ignore
+    migrated = 0
+    for item in legacy_log_items(table):
+        if args.dry_run:
+            print(f"Would migrate {item['PK']} {item['SK']}")
+        else:
+            id = migrate_item(table, item)
+            print(f"Migrated {item['PK']} {item['SK']} to {id}")
+        migrated += 1
+    print(f"{'Found' if args.dry_run else 'Migrated'} {migrated} workout logs")
+
+
+if __name__ == "__main__":
+    main()
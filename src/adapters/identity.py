@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Callable
+
+import httpx
+import jwt
+
+from src.adapters.cache import CacheBackend, InMemoryCacheBackend
+from src.config import config
+from src.exceptions import AuthenticationError
+
+_logger = logging.getLogger(__name__)
+
+# Unknown key ids trigger a synchronous refresh at most this often, so tokens with
+# made-up key ids cannot turn every request into a JWKS fetch.
+_MIN_REFRESH_SECONDS = 30.0
+
+# Cognito signs identity tokens with RS256 only.
+_ALGORITHMS = ["RS256"]
+
+
+def _fetch_jwks(url: str) -> dict[str, Any]:
+    response = httpx.get(url, timeout=5.0)
+    response.raise_for_status()
+    return response.json()
+
+
+class JWKSCache:
+    """Signing keys of a JSON Web Key Set, refreshed in the background.
+
+    Once keys are older than `refresh_interval` they keep being served while a
+    background thread fetches the key set again. Only an empty cache or an unknown
+    key id makes a caller wait for a fetch.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        refresh_interval: float,
+        fetch: Callable[[str], dict[str, Any]] = _fetch_jwks,
+    ):
+        self._url = url
+        self._refresh_interval = refresh_interval
+        self._fetch = fetch
+        self._keys: dict[str, jwt.PyJWK] = {}
+        self._fetched_at: float | None = None
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+    def get_signing_key(self, kid: str) -> jwt.PyJWK:
+        if kid not in self._keys:
+            self._refresh_if_due(_MIN_REFRESH_SECONDS)
+        elif self._age() > self._refresh_interval:
+            self._refresh_in_background()
+        try:
+            return self._keys[kid]
+        except KeyError:
+            raise AuthenticationError(f"Unknown signing key {kid!r}")
+
+    def refresh(self) -> None:
+        _logger.info(f"Fetching JWKS from {self._url}")
+        try:
+            jwks = jwt.PyJWKSet.from_dict(self._fetch(self._url))
+        except (httpx.HTTPError, jwt.PyJWKSetError, ValueError):
+            _logger.error(f"Error fetching JWKS from {self._url}", exc_info=True)
+            return
+        finally:
+            self._fetched_at = time.monotonic()
+        self._keys = {key.key_id: key for key in jwks.keys if key.key_id}
+
+    def _age(self) -> float:
+        if self._fetched_at is None:
+            return float("inf")
+        return time.monotonic() - self._fetched_at
+
+    def _refresh_if_due(self, min_age: float) -> None:
+        with self._lock:
+            if self._age() >= min_age:
+                self.refresh()
+
+    def _refresh_in_background(self) -> None:
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def refresh() -> None:
+            try:
+                self._refresh_if_due(self._refresh_interval)
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=refresh, name="jwks-refresh", daemon=True).start()
+
+
+class TokenVerifier:
+    """Verify identity tokens, caching verified claims until they expire.
+
+    Claims are cached by a hash of the token, so repeat requests from the same
+    session skip signature verification. Without a key set signatures are not
+    verified, which is only meant for local development.
+    """
+
+    def __init__(
+        self,
+        key_set: JWKSCache | None,
+        cache: CacheBackend,
+        issuer: str | None = None,
+        audience: str | None = None,
+    ):
+        self._key_set = key_set
+        self._cache = cache
+        self._issuer = issuer
+        self._audience = audience
+
+    @staticmethod
+    def _cache_key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def cached_claims(self, token: str) -> dict[str, Any] | None:
+        """Get the claims of a previously verified token that has not expired."""
+        claims = self._cache.get(self._cache_key(token))
+        if claims is None or claims.get("exp", float("inf")) <= time.time():
+            return None
+        return claims
+
+    def verify(self, token: str) -> dict[str, Any]:
+        """Get the claims of a token, verifying it unless already cached."""
+        if (claims := self.cached_claims(token)) is not None:
+            return claims
+        try:
+            claims = self._decode(token)
+        except jwt.PyJWTError as e:
+            raise AuthenticationError(f"Invalid token: {e}")
+
+        ttl = claims["exp"] - time.time() if "exp" in claims else None
+        self._cache.set(self._cache_key(token), claims, ttl=ttl)
+        return claims
+
+    def _decode(self, token: str) -> dict[str, Any]:
+        if self._key_set is None:
+            return jwt.decode(token, options={"verify_signature": False})
+        header = jwt.get_unverified_header(token)
+        signing_key = self._key_set.get_signing_key(header.get("kid", ""))
+        return jwt.decode(
+            token,
+            key=signing_key.key,
+            algorithms=_ALGORITHMS,
+            issuer=self._issuer,
+            audience=self._audience,
+            options={"require": ["exp"], "verify_aud": self._audience is not None},
+        )
+
+
+@lru_cache(maxsize=None)
+def get_token_verifier() -> TokenVerifier:
+    """Get the process-wide token verifier."""
+    if config.JWKS_URL is None:
+        _logger.warning("JWKS_URL is not set, token signatures are not verified")
+    return TokenVerifier(
+        key_set=(
+            JWKSCache(config.JWKS_URL, refresh_interval=config.JWKS_REFRESH_SECONDS)
+            if config.JWKS_URL
+            else None
+        ),
+        cache=InMemoryCacheBackend(max_entries=config.TOKEN_CACHE_MAX_ENTRIES),
+        issuer=config.JWT_ISSUER,
+        audience=config.JWT_AUDIENCE,
+    )
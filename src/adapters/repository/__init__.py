@@ -1,10 +1,63 @@
 __all__ = [
+    "AsyncExerciseStatsRepository",
+    "AsyncExerciseStatsRepositoryAdapter",
+    "CacheStats",
+    "CachingWorkoutRepository",
+    "AsyncWorkoutRepository",
+    "AsyncWorkoutRepositoryAdapter",
     "DynamoDBWorkoutPlanRepository",
     "get_workout_plans_repository",
     "DynamoDBWorkoutLogRepository",
+    "DynamoDBExerciseStatsRepository",
+    "DynamoDBCall",
+    "DynamoDBCalls",
+    "collect_dynamodb_calls",
+    "instrument_dynamodb_client",
+    "InMemoryExerciseStatsRepository",
+    "InMemoryWorkoutRepository",
+    "SQLiteWorkoutRepository",
+    "ExerciseStatsRepository",
     "get_workout_logs_repository",
+    "get_exercise_stats_repository",
+    "get_async_exercise_stats_repository",
+    "get_async_workout_plans_repository",
+    "get_async_workout_logs_repository",
+    "get_cache_stats",
+    "get_dynamodb_table",
+    "reset_dynamodb_tables",
+    "reset_memory_repositories",
+    "reset_sqlite_repositories",
+    "Page",
     "WorkoutRepository",
 ]
+from .async_adapter import (
+    AsyncExerciseStatsRepositoryAdapter,
+    AsyncWorkoutRepositoryAdapter,
+)
+from .caching import CacheStats, CachingWorkoutRepository
 from .dynamodb import DynamoDBWorkoutLogRepository, DynamoDBWorkoutPlanRepository
-from .factories import get_workout_logs_repository, get_workout_plans_repository
-from .workout_protocol import WorkoutRepository
+from .dynamodb_stats import DynamoDBExerciseStatsRepository
+from .factories import (
+    get_async_exercise_stats_repository,
+    get_async_workout_logs_repository,
+    get_async_workout_plans_repository,
+    get_cache_stats,
+    get_dynamodb_table,
+    get_exercise_stats_repository,
+    get_workout_logs_repository,
+    get_workout_plans_repository,
+    reset_dynamodb_tables,
+    reset_memory_repositories,
+    reset_sqlite_repositories,
+)
+from .instrumentation import (
+    DynamoDBCall,
+    DynamoDBCalls,
+    collect_dynamodb_calls,
+    instrument_dynamodb_client,
+)
+from .memory import InMemoryWorkoutRepository
+from .memory_stats import InMemoryExerciseStatsRepository
+from .sqlite import SQLiteWorkoutRepository
+from .stats_protocol import AsyncExerciseStatsRepository, ExerciseStatsRepository
+from .workout_protocol import AsyncWorkoutRepository, Page, WorkoutRepository
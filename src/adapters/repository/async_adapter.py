@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+from datetime import datetime
+from functools import partial
+from itertools import islice
+from typing import Any, AsyncIterator, Callable, Sequence, TypeVar
+
+from anyio import CapacityLimiter, to_thread
+from anyio.lowlevel import RunVar
+
+from src import metrics
+from src.config import config
+from src.model import (
+    BaseWorkoutCreate,
+    BaseWorkoutUpdate,
+    BatchWriteResult,
+    ExerciseHistoryEntry,
+    ExerciseRecord,
+    ExerciseStats,
+    WorkoutSummary,
+)
+
+from .instrumentation import call_repository_method
+from .stats_protocol import AsyncExerciseStatsRepository, ExerciseStatsRepository
+from .workout_protocol import (
+    AsyncWorkoutRepository,
+    ModelType,
+    Page,
+    WorkoutRepository,
+)
+
+T = TypeVar("T")
+
+_ITER_CHUNK_SIZE = 100
+
+_limiter: RunVar[CapacityLimiter] = RunVar("repository_limiter")
+
+
+def _get_limiter() -> CapacityLimiter:
+    """Get the repository limiter for the running event loop.
+
+    The limiter is sized to the DynamoDB connection pool, so blocking repository
+    calls queue on the pool rather than on Starlette's shared threadpool.
+    """
+    try:
+        return _limiter.get()
+    except LookupError:
+        limiter = CapacityLimiter(config.DYNAMODB_MAX_POOL_CONNECTIONS)
+        _limiter.set(limiter)
+        return limiter
+
+
+def _threadpool_statistics(statistic: str) -> dict[tuple[str, ...], float]:
+    try:
+        statistics = _limiter.get().statistics()
+    except (LookupError, RuntimeError):
+        # Outside an event loop, or before its first repository call.
+        return {}
+    return {(): getattr(statistics, statistic)}
+
+
+metrics.register(
+    metrics.CallbackMetric(
+        "repository_threadpool_queue_depth",
+        "Repository calls waiting for a worker thread.",
+        "gauge",
+        partial(_threadpool_statistics, "tasks_waiting"),
+    )
+)
+metrics.register(
+    metrics.CallbackMetric(
+        "repository_threadpool_busy_threads",
+        "Worker threads running repository calls.",
+        "gauge",
+        partial(_threadpool_statistics, "borrowed_tokens"),
+    )
+)
+
+
+async def _run_blocking(repository: str, func: Callable[..., T], **kwargs: Any) -> T:
+    return await to_thread.run_sync(
+        partial(call_repository_method, repository, func, **kwargs),
+        limiter=_get_limiter(),
+    )
+
+
+class AsyncWorkoutRepositoryAdapter(AsyncWorkoutRepository[ModelType]):
+    """Expose a blocking workout repository to async callers.
+
+    Calls are timed under `name`, the repository's class name by default.
+    """
+
+    def __init__(
+        self, repository: WorkoutRepository[ModelType], name: str | None = None
+    ):
+        self._repository = repository
+        self._name = name or type(repository).__name__
+
+    async def _run(self, func: Callable[..., T], **kwargs: Any) -> T:
+        return await _run_blocking(self._name, func, **kwargs)
+
+    async def create(self, model: BaseWorkoutCreate, owner: str) -> ModelType:
+        return await self._run(self._repository.create, model=model, owner=owner)
+
+    async def create_many(
+        self, models: Sequence[BaseWorkoutCreate], owner: str
+    ) -> list[BatchWriteResult]:
+        return await self._run(self._repository.create_many, models=models, owner=owner)
+
+    async def get(self, id: str, owner: str) -> ModelType | None:
+        return await self._run(self._repository.get, id=id, owner=owner)
+
+    async def get_many(self, ids: Sequence[str], owner: str) -> list[ModelType]:
+        return await self._run(self._repository.get_many, ids=ids, owner=owner)
+
+    async def list(
+        self,
+        owner: str,
+        limit: int | None = None,
+        cursor: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        newest_first: bool = False,
+    ) -> Page[ModelType]:
+        return await self._run(
+            self._repository.list,
+            owner=owner,
+            limit=limit,
+            cursor=cursor,
+            since=since,
+            until=until,
+            newest_first=newest_first,
+        )
+
+    async def list_summaries(
+        self,
+        owner: str,
+        fields: Sequence[str],
+        limit: int | None = None,
+        cursor: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        newest_first: bool = False,
+    ) -> Page[WorkoutSummary]:
+        return await self._run(
+            self._repository.list_summaries,
+            owner=owner,
+            fields=fields,
+            limit=limit,
+            cursor=cursor,
+            since=since,
+            until=until,
+            newest_first=newest_first,
+        )
+
+    async def iter_items(
+        self,
+        owner: str,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        newest_first: bool = False,
+    ) -> AsyncIterator[ModelType]:
+        iterator = self._repository.iter_items(
+            owner=owner, since=since, until=until, newest_first=newest_first
+        )
+
+        def iter_items() -> list[ModelType]:
+            return list(islice(iterator, _ITER_CHUNK_SIZE))
+
+        while chunk := await self._run(iter_items):
+            for item in chunk:
+                yield item
+
+    async def update(
+        self, id: str, update_model: BaseWorkoutUpdate, db_model: ModelType, owner: str
+    ) -> ModelType:
+        return await self._run(
+            self._repository.update,
+            id=id,
+            update_model=update_model,
+            db_model=db_model,
+            owner=owner,
+        )
+
+    async def patch(
+        self, id: str, update_model: BaseWorkoutUpdate, owner: str
+    ) -> ModelType:
+        return await self._run(
+            self._repository.patch, id=id, update_model=update_model, owner=owner
+        )
+
+    async def delete(
+        self, id: str, owner: str, return_deleted: bool = False
+    ) -> ModelType | None:
+        return await self._run(
+            self._repository.delete, id=id, owner=owner, return_deleted=return_deleted
+        )
+
+    async def get_collection_version(self, owner: str) -> int:
+        return await self._run(self._repository.get_collection_version, owner=owner)
+
+    async def health_check(self) -> None:
+        await self._run(self._repository.health_check)
+
+
+class AsyncExerciseStatsRepositoryAdapter(AsyncExerciseStatsRepository):
+    """Expose a blocking exercise stats repository to async callers.
+
+    Calls are timed under `name`, the repository's class name by default.
+    """
+
+    def __init__(self, repository: ExerciseStatsRepository, name: str | None = None):
+        self._repository = repository
+        self._name = name or type(repository).__name__
+
+    async def _run(self, func: Callable[..., T], **kwargs: Any) -> T:
+        return await _run_blocking(self._name, func, **kwargs)
+
+    async def list_exercise_stats(self, owner: str) -> list[ExerciseStats]:
+        return await self._run(self._repository.list_exercise_stats, owner=owner)
+
+    async def list_exercise_records(
+        self, owner: str, exercise: str | None = None
+    ) -> list[ExerciseRecord]:
+        return await self._run(
+            self._repository.list_exercise_records, owner=owner, exercise=exercise
+        )
+
+    async def list_exercise_history(
+        self,
+        owner: str,
+        exercise: str,
+        limit: int | None = None,
+        cursor: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        newest_first: bool = False,
+    ) -> Page[ExerciseHistoryEntry]:
+        return await self._run(
+            self._repository.list_exercise_history,
+            owner=owner,
+            exercise=exercise,
+            limit=limit,
+            cursor=cursor,
+            since=since,
+            until=until,
+            newest_first=newest_first,
+        )
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import logging
+import random
+import time
+from typing import Any, Iterator, Sequence
+
+from botocore.exceptions import ClientError
+from mypy_boto3_dynamodb.service_resource import Table
+
+from src.config import config
+from src.exceptions import WorkoutError
+
+_logger = logging.getLogger(__name__)
+
+
+def chunks(items: Sequence[Any], size: int) -> Iterator[Sequence[Any]]:
+    for start in range(0, len(items), size):
+        end = start + size
+        yield items[start:end]
+
+
+def backoff(attempt: int) -> None:
+    """Sleep with full jitter before retrying unprocessed batch items."""
+    time.sleep(random.uniform(0, config.DYNAMODB_BATCH_BACKOFF_BASE * 2**attempt))
+
+
+def batch_get(
+    table: Table, keys: Sequence[dict[str, Any]], description: str
+) -> list[dict[str, Any]]:
+    """Get items with BatchGetItem, 100 keys per call, in no particular order.
+
+    Unprocessed keys are retried with exponential backoff. Missing items are left
+    out.
+    """
+    items: list[dict[str, Any]] = []
+    for chunk in chunks(keys, 100):
+        items.extend(_batch_get_chunk(table, list(chunk), description))
+    return items
+
+
+def _batch_get_chunk(
+    table: Table, keys: list[dict[str, Any]], description: str
+) -> list[dict[str, Any]]:
+    client = table.meta.client
+    items: list[dict[str, Any]] = []
+    for attempt in range(config.DYNAMODB_BATCH_MAX_ATTEMPTS):
+        if attempt:
+            backoff(attempt)
+        try:
+            response = client.batch_get_item(
+                RequestItems={table.name: {"Keys": keys}}  # type: ignore
+            )
+        except ClientError:
+            _logger.warning(f"Error batch getting {description}", exc_info=True)
+            continue
+        items.extend(response["Responses"].get(table.name, []))
+        unprocessed = response.get("UnprocessedKeys", {})
+        if table.name not in unprocessed:
+            return items
+        keys = unprocessed[table.name]["Keys"]  # type: ignore
+
+    _logger.error(f"Error batch getting {description}")
+    raise WorkoutError(f"Error getting {description}")
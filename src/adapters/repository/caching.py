@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Iterator, Sequence
+
+from src.adapters.cache import CacheBackend
+from src.model import (
+    BaseWorkoutCreate,
+    BaseWorkoutUpdate,
+    BatchWriteResult,
+    WorkoutSummary,
+)
+
+from .workout_protocol import ItemType, ModelType, Page, WorkoutRepository
+
+
+@dataclass
+class CacheStats:
+    """Hit and miss counters, counted by every worker thread under a lock."""
+
+    hits: int = 0
+    misses: int = 0
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, compare=False, repr=False
+    )
+
+    def count(self, hits: int = 0, misses: int = 0) -> None:
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+
+    @property
+    def hit_ratio(self) -> float:
+        with self._lock:
+            hits, total = self.hits, self.hits + self.misses
+        return hits / total if total else 0.0
+
+
+class CachingWorkoutRepository(WorkoutRepository[ModelType]):
+    """Read-through cache of `get` and `list` results around any repository.
+
+    Items are cached per owner and id. Lists are cached per owner under the
+    collection version of the wrapped repository, read on every list, so pages
+    written by any process, e.g. another Lambda container, are never served from
+    an older version than the list's ETag. Cached models are shared and must not
+    be mutated.
+    """
+
+    def __init__(
+        self,
+        repository: WorkoutRepository[ModelType],
+        backend: CacheBackend,
+        namespace: str,
+        stats: CacheStats | None = None,
+    ):
+        self._repository = repository
+        self._backend = backend
+        self._namespace = namespace
+        self.stats = stats or CacheStats()
+
+    def _item_key(self, owner: str, id: str) -> str:
+        return f"{self._namespace}#{owner}#ITEM#{id}"
+
+    def _invalidate(self, owner: str, id: str) -> None:
+        self._backend.delete(self._item_key(owner, id))
+
+    def create(self, model: BaseWorkoutCreate, owner: str) -> ModelType:
+        return self._repository.create(model=model, owner=owner)
+
+    def create_many(
+        self, models: Sequence[BaseWorkoutCreate], owner: str
+    ) -> list[BatchWriteResult]:
+        return self._repository.create_many(models=models, owner=owner)
+
+    def get(self, id: str, owner: str) -> ModelType | None:
+        key = self._item_key(owner, id)
+        if (cached := self._backend.get(key)) is not None:
+            self.stats.count(hits=1)
+            return cached
+        self.stats.count(misses=1)
+        db_model = self._repository.get(id=id, owner=owner)
+        if db_model is not None:
+            self._backend.set(key, db_model)
+        return db_model
+
+    def get_many(self, ids: Sequence[str], owner: str) -> list[ModelType]:
+        found: dict[str, ModelType] = {}
+        for id in ids:
+            if (cached := self._backend.get(self._item_key(owner, id))) is not None:
+                found[id] = cached
+        missing = [id for id in dict.fromkeys(ids) if id not in found]
+        self.stats.count(hits=len(found), misses=len(missing))
+        if missing:
+            for db_model in self._repository.get_many(ids=missing, owner=owner):
+                self._backend.set(self._item_key(owner, db_model.id), db_model)
+                found[db_model.id] = db_model
+        return [found[id] for id in dict.fromkeys(ids) if id in found]
+
+    def _cached_page(
+        self, owner: str, arguments: tuple, load: Callable[[], Page[ItemType]]
+    ) -> Page[ItemType]:
+        version = self._repository.get_collection_version(owner=owner)
+        key = f"{self._namespace}#{owner}#LIST#{version}" + "".join(
+            f"#{argument}" for argument in arguments
+        )
+        if (cached := self._backend.get(key)) is not None:
+            self.stats.count(hits=1)
+            return cached
+        self.stats.count(misses=1)
+        page = load()
+        self._backend.set(key, page)
+        return page
+
+    def list(
+        self,
+        owner: str,
+        limit: int | None = None,
+        cursor: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        newest_first: bool = False,
+    ) -> Page[ModelType]:
+        return self._cached_page(
+            owner,
+            (limit, cursor, since, until, newest_first),
+            lambda: self._repository.list(
+                owner=owner,
+                limit=limit,
+                cursor=cursor,
+                since=since,
+                until=until,
+                newest_first=newest_first,
+            ),
+        )
+
+    def list_summaries(
+        self,
+        owner: str,
+        fields: Sequence[str],
+        limit: int | None = None,
+        cursor: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        newest_first: bool = False,
+    ) -> Page[WorkoutSummary]:
+        return self._cached_page(
+            owner,
+            ("SUMMARY", ",".join(fields), limit, cursor, since, until, newest_first),
+            lambda: self._repository.list_summaries(
+                owner=owner,
+                fields=fields,
+                limit=limit,
+                cursor=cursor,
+                since=since,
+                until=until,
+                newest_first=newest_first,
+            ),
+        )
+
+    def iter_items(
+        self,
+        owner: str,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        newest_first: bool = False,
+    ) -> Iterator[ModelType]:
+        return self._repository.iter_items(
+            owner=owner, since=since, until=until, newest_first=newest_first
+        )
+
+    def update(
+        self, id: str, update_model: BaseWorkoutUpdate, db_model: ModelType, owner: str
+    ) -> ModelType:
+        try:
+            # `db_model` may be the cached instance, which the update changes.
+            return self._repository.update(
+                id=id, update_model=update_model, db_model=db_model.copy(), owner=owner
+            )
+        finally:
+            self._invalidate(owner, id)
+
+    def patch(self, id: str, update_model: BaseWorkoutUpdate, owner: str) -> ModelType:
+        try:
+            return self._repository.patch(id=id, update_model=update_model, owner=owner)
+        finally:
+            self._invalidate(owner, id)
+
+    def delete(
+        self, id: str, owner: str, return_deleted: bool = False
+    ) -> ModelType | None:
+        try:
+            return self._repository.delete(
+                id=id, owner=owner, return_deleted=return_deleted
+            )
+        finally:
+            self._invalidate(owner, id)
+
+    def get_collection_version(self, owner: str) -> int:
+        return self._repository.get_collection_version(owner=owner)
+
+    def health_check(self) -> None:
+        self._repository.health_check()
@@ -1,36 +1,79 @@
 from __future__ import annotations
 
 import logging
-from typing import Any
+from datetime import datetime, timezone
+from typing import Any, Iterator, Sequence
+from uuid import UUID
 
+from boto3.dynamodb.types import Binary
 from botocore.exceptions import ClientError
 from mypy_boto3_dynamodb.service_resource import Table
 
-from src.exceptions import DuplicateWorkoutError, WorkoutError
+from src.config import config
+from src.exceptions import (
+    DuplicateWorkoutError,
+    InvalidCursorError,
+    WorkoutError,
+    WorkoutNotFoundError,
+)
 from src.model import (
     BaseWorkoutCreate,
     BaseWorkoutUpdate,
+    BatchWriteResult,
+    BatchWriteStatus,
     WorkoutLog,
     WorkoutPlan,
+    WorkoutSummary,
     WorkoutType,
+    now_isoformat,
 )
 
-from .workout_protocol import ModelType, WorkoutRepository
-
-
-def _get_pk(owner: str, workout_type: WorkoutType) -> str:
-    return f"OWNER#{owner}#WORKOUT_{workout_type}"
+from .batching import backoff, batch_get, chunks
+from .dynamodb_stats import DynamoDBExerciseStatsRepository
+from .paging import decode_cursor, get_workout_pk, query_page
+from .set_codec import pack_sets, unpack_sets
+from .workout_protocol import ModelType, Page, WorkoutRepository
 
 
 def _get_sk(workout_type: WorkoutType, id: str = "") -> str:
     if workout_type == WorkoutType.PLAN:
         return f"WORKOUT_PLAN#{id}"
     elif workout_type == WorkoutType.LOG:
-        return f"WORKOUT_PLAN#{id}"
+        if id and not _is_time_ordered(id):
+            # Logs created before time-ordered ids were keyed like plans.
+            return f"WORKOUT_PLAN#{id}"
+        return f"WORKOUT_LOG#{id}"
     else:
         raise ValueError("Invalid workout type")
 
 
+def _is_time_ordered(id: str) -> bool:
+    try:
+        return UUID(id).version == 7
+    except ValueError:
+        return False
+
+
+def _get_sk_bound(workout_type: WorkoutType, at: datetime | None, upper: bool) -> str:
+    """Get the lowest or highest sort key of a time-ordered id created at `at`."""
+    if at is None:
+        timestamp_ms = 0xFFFF_FFFF_FFFF if upper else 0
+    else:
+        if at.tzinfo is None:
+            at = at.replace(tzinfo=timezone.utc)
+        timestamp_ms = min(max(int(at.timestamp() * 1000), 0), 0xFFFF_FFFF_FFFF)
+    random_bits = 0x0FFF_3FFF_FFFF_FFFF_FFFF if upper else 0
+    id = UUID(int=timestamp_ms << 80 | 0x7 << 76 | 0b10 << 62 | random_bits)
+    return _get_sk(workout_type=workout_type, id=str(id))
+
+
+def _get_collection_version_key(owner: str, workout_type: WorkoutType) -> dict:
+    return {
+        "PK": f"{get_workout_pk(owner=owner, workout_type=workout_type)}#VERSION",
+        "SK": "VERSION",
+    }
+
+
 def _create_dynamodb_item(owner: str, pk: str, sk: str, **attributes: Any) -> dict:
     return {
         "PK": pk,
@@ -47,18 +90,34 @@ class DynamoDBWorkoutRepository(WorkoutRepository[ModelType]):
         self._model = model
         self._logger = logging.getLogger(__name__)
 
+    def _encode_attributes(self, attributes: dict[str, Any]) -> dict[str, Any]:
+        """Encode the attributes of a workout for storage."""
+        return attributes
+
+    def _from_item(self, item: dict[str, Any]) -> ModelType:
+        """Build a workout from a stored item."""
+        return self._model.from_trusted(item)
+
+    def _on_changes(
+        self, owner: str, changes: Sequence[tuple[ModelType | None, ModelType | None]]
+    ) -> None:
+        """Run after workouts are written, with each change from `old` to `new`.
+
+        A created workout has no `old` and a deleted one no `new`.
+        """
+
     def create(self, model: BaseWorkoutCreate, owner: str) -> ModelType:
         model_db = self._model(**model.dict())
         self._logger.info(
             f"Creating {self._workout_type} {model_db.id} for owner {owner!r}"
         )
-        pk = _get_pk(owner=owner, workout_type=self._workout_type)
+        pk = get_workout_pk(owner=owner, workout_type=self._workout_type)
         sk = _get_sk(workout_type=self._workout_type, id=model_db.id)
         item = _create_dynamodb_item(
             owner=owner,
             pk=pk,
             sk=sk,
-            **model_db.dict(),
+            **self._encode_attributes(model_db.dict()),
         )
         try:
             self._table.put_item(Item=item)
@@ -73,15 +132,92 @@ class DynamoDBWorkoutRepository(WorkoutRepository[ModelType]):
                 )
                 raise WorkoutError(f"Error creating {self._workout_type}")
 
+        self._on_changes(owner, [(None, model_db)])
+        self._bump_collection_version(owner)
         return model_db
 
+    def create_many(
+        self, models: Sequence[BaseWorkoutCreate], owner: str
+    ) -> list[BatchWriteResult]:
+        """Create workouts with BatchWriteItem, 25 items per call.
+
+        Unprocessed items are retried with exponential backoff. The results are in
+        the same order as `models`.
+        """
+        self._logger.info(
+            f"Creating {len(models)} {self._workout_type}s for owner {owner!r}"
+        )
+        pk = get_workout_pk(owner=owner, workout_type=self._workout_type)
+        models_db = [self._model(**model.dict()) for model in models]
+        failed_ids: set[str] = set()
+        for chunk in chunks(models_db, 25):
+            requests = [
+                {
+                    "PutRequest": {
+                        "Item": _create_dynamodb_item(
+                            owner=owner,
+                            pk=pk,
+                            sk=_get_sk(workout_type=self._workout_type, id=model.id),
+                            **self._encode_attributes(model.dict()),
+                        )
+                    }
+                }
+                for model in chunk
+            ]
+            unprocessed = self._batch_write(requests)
+            failed_ids.update(
+                request["PutRequest"]["Item"]["id"] for request in unprocessed
+            )
+
+        self._on_changes(
+            owner, [(None, model) for model in models_db if model.id not in failed_ids]
+        )
+        if len(failed_ids) < len(models_db):
+            self._bump_collection_version(owner)
+        return [
+            BatchWriteResult(
+                id=model.id,
+                status=(
+                    BatchWriteStatus.FAILED
+                    if model.id in failed_ids
+                    else BatchWriteStatus.CREATED
+                ),
+            )
+            for model in models_db
+        ]
+
+    def _batch_write(self, requests: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """Write a batch of at most 25 requests, returning those never processed."""
+        client = self._table.meta.client
+        for attempt in range(config.DYNAMODB_BATCH_MAX_ATTEMPTS):
+            if attempt:
+                backoff(attempt)
+            try:
+                response = client.batch_write_item(
+                    RequestItems={self._table.name: requests}  # type: ignore
+                )
+            except ClientError:
+                self._logger.warning(
+                    f"Error batch writing {self._workout_type}s", exc_info=True
+                )
+                continue
+            unprocessed = response.get("UnprocessedItems", {})
+            requests = unprocessed.get(self._table.name, [])  # type: ignore
+            if not requests:
+                return []
+
+        self._logger.error(
+            f"Giving up on {len(requests)} unprocessed {self._workout_type}s"
+        )
+        return requests
+
     def get(self, id: str, owner: str) -> ModelType | None:
         self._logger.info(f"Getting {self._workout_type} {id} for owner {owner!r}")
 
         try:
             response = self._table.get_item(
                 Key={
-                    "PK": _get_pk(owner=owner, workout_type=self._workout_type),
+                    "PK": get_workout_pk(owner=owner, workout_type=self._workout_type),
                     "SK": _get_sk(workout_type=self._workout_type, id=id),
                 }
             )
@@ -91,26 +227,170 @@ class DynamoDBWorkoutRepository(WorkoutRepository[ModelType]):
 
         item = response.get("Item")
 
-        return self._model(**item) if item else None  # type: ignore
+        return self._from_item(item) if item else None
+
+    def get_many(self, ids: Sequence[str], owner: str) -> list[ModelType]:
+        """Get workouts with BatchGetItem, 100 keys per call.
+
+        Unprocessed keys are retried with exponential backoff. Workouts are returned
+        in the order of `ids`; missing ones are left out.
+        """
+        self._logger.info(
+            f"Getting {len(ids)} {self._workout_type}s for owner {owner!r}"
+        )
+        pk = get_workout_pk(owner=owner, workout_type=self._workout_type)
+        unique_ids = list(dict.fromkeys(ids))
+        keys = [
+            {"PK": pk, "SK": _get_sk(workout_type=self._workout_type, id=id)}
+            for id in unique_ids
+        ]
+        items = {
+            item["id"]: item
+            for item in batch_get(self._table, keys, f"{self._workout_type}s")
+        }
+
+        return [self._from_item(items[id]) for id in unique_ids if id in items]
+
+    def _list_query(
+        self,
+        owner: str,
+        since: datetime | None,
+        until: datetime | None,
+        newest_first: bool,
+    ) -> dict[str, Any]:
+        pk = get_workout_pk(owner=owner, workout_type=self._workout_type)
+        query: dict[str, Any] = {
+            "KeyConditionExpression": "PK = :pk",
+            "ExpressionAttributeValues": {":pk": pk},
+            "ScanIndexForward": not newest_first,
+        }
+        if since or until:
+            if self._workout_type != WorkoutType.LOG:
+                raise ValueError("Time ranges are only supported for workout logs")
+            query["KeyConditionExpression"] += " AND SK BETWEEN :since AND :until"
+            query["ExpressionAttributeValues"][":since"] = _get_sk_bound(
+                self._workout_type, since, upper=False
+            )
+            query["ExpressionAttributeValues"][":until"] = _get_sk_bound(
+                self._workout_type, until, upper=True
+            )
+        return query
+
+    def _list_items(
+        self,
+        owner: str,
+        limit: int | None,
+        cursor: str | None,
+        since: datetime | None,
+        until: datetime | None,
+        newest_first: bool,
+        projection: Sequence[str] | None = None,
+    ) -> tuple[list[dict[str, Any]], str | None]:
+        query = self._list_query(owner, since, until, newest_first)
+        if projection:
+            query["ProjectionExpression"] = ", ".join(f"#{name}" for name in projection)
+            query["ExpressionAttributeNames"] = {
+                f"#{name}": name for name in projection
+            }
+        if cursor:
+            query["ExclusiveStartKey"] = decode_cursor(
+                cursor, pk=get_workout_pk(owner=owner, workout_type=self._workout_type)
+            )
+        return query_page(self._query, limit, **query)
 
-    def list(self, owner: str) -> list[ModelType]:
+    def list(
+        self,
+        owner: str,
+        limit: int | None = None,
+        cursor: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        newest_first: bool = False,
+    ) -> Page[ModelType]:
+        """List up to `limit` workouts for an owner, starting after `cursor`.
+
+        Without a limit every page is read, so results are never truncated at
+        DynamoDB's 1 MB query page size. `since` and `until` select workout logs
+        by creation time with a key condition, so only the returned items are read;
+        logs created before time-ordered ids are only listed without a range.
+        """
         self._logger.info(f"Listing {self._workout_type}s for owner {owner!r}")
+        items, next_cursor = self._list_items(
+            owner=owner,
+            limit=limit,
+            cursor=cursor,
+            since=since,
+            until=until,
+            newest_first=newest_first,
+        )
+        return Page(
+            items=[self._from_item(item) for item in items],
+            next_cursor=next_cursor,
+        )
+
+    def list_summaries(
+        self,
+        owner: str,
+        fields: Sequence[str],
+        limit: int | None = None,
+        cursor: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        newest_first: bool = False,
+    ) -> Page[WorkoutSummary]:
+        """List workouts like `list`, reading only the id and `fields` of each.
+
+        The fields become a ProjectionExpression, so exercises and sets are
+        neither read from the table nor parsed into models.
+        """
+        self._logger.info(f"Listing {self._workout_type} summaries for owner {owner!r}")
+        items, next_cursor = self._list_items(
+            owner=owner,
+            limit=limit,
+            cursor=cursor,
+            since=since,
+            until=until,
+            newest_first=newest_first,
+            projection=list(dict.fromkeys(["id", *fields])),
+        )
+        return Page(
+            items=[WorkoutSummary.from_trusted(item) for item in items],
+            next_cursor=next_cursor,
+        )
 
+    def iter_items(
+        self,
+        owner: str,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        newest_first: bool = False,
+    ) -> Iterator[ModelType]:
+        """Lazily iterate over the workouts of an owner, one query page at a time.
+
+        Workouts are selected and ordered like `list`.
+        """
+        self._logger.info(f"Iterating {self._workout_type}s for owner {owner!r}")
+        query = self._list_query(owner, since, until, newest_first)
+        while True:
+            response = self._query(**query)
+            for item in response["Items"]:
+                yield self._from_item(item)
+            if not (last_evaluated_key := response.get("LastEvaluatedKey")):
+                return
+            query["ExclusiveStartKey"] = last_evaluated_key
+
+    def _query(self, **query: Any) -> dict[str, Any]:
         try:
-            response = self._table.query(
-                KeyConditionExpression="PK = :pk",
-                ExpressionAttributeValues={
-                    ":pk": _get_pk(owner=owner, workout_type=self._workout_type)
-                },
-            )
-        except ClientError:
+            return self._table.query(**query)  # type: ignore
+        except ClientError as e:
+            if (
+                e.response["Error"]["Code"] == "ValidationException"
+                and "ExclusiveStartKey" in query
+            ):
+                raise InvalidCursorError("Cursor is outside of the listed range")
             self._logger.error(f"Error listing {self._workout_type}", exc_info=True)
             raise WorkoutError(f"Error listing {self._workout_type}")
 
-        items = response["Items"]
-
-        return [self._model(**item) for item in items]  # type: ignore
-
     def update(
         self,
         id: str,
@@ -123,18 +403,20 @@ class DynamoDBWorkoutRepository(WorkoutRepository[ModelType]):
         for field in db_model.dict().keys():
             if field in update_data:
                 setattr(db_model, field, update_data[field])
+        db_model.version += 1
+        db_model.updated_at = now_isoformat()
 
-        pk = _get_pk(owner=owner, workout_type=self._workout_type)
+        pk = get_workout_pk(owner=owner, workout_type=self._workout_type)
         sk = _get_sk(workout_type=self._workout_type, id=id)
         item = _create_dynamodb_item(
             owner=owner,
             pk=pk,
             sk=sk,
-            **db_model.dict(),
+            **self._encode_attributes(db_model.dict()),
         )
 
         try:
-            self._table.put_item(Item=item)
+            response = self._table.put_item(Item=item, ReturnValues="ALL_OLD")
         except ClientError as e:
             if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
                 raise DuplicateWorkoutError(
@@ -145,22 +427,127 @@ class DynamoDBWorkoutRepository(WorkoutRepository[ModelType]):
                     f"Error creating {self._workout_type}", exc_info=True
                 )
                 raise WorkoutError(f"Error creating {self._workout_type}")
-        return self._model(**item)
 
-    def delete(self, id: str, owner: str) -> None:
+        updated = self._from_item(item)
+        old_item = response.get("Attributes")
+        old = self._from_item(old_item) if old_item else None
+        self._on_changes(owner, [(old, updated)])
+        self._bump_collection_version(owner)
+        return updated
+
+    def patch(self, id: str, update_model: BaseWorkoutUpdate, owner: str) -> ModelType:
+        """Update the fields set on `update_model` in a single conditional write."""
+        self._logger.info(f"Patching {self._workout_type} {id!r} for owner {owner!r}")
+        update_data = self._encode_attributes(
+            update_model.dict(exclude_unset=True, exclude_none=True)
+        )
+        if not update_data:
+            if (db_model := self.get(id=id, owner=owner)) is None:
+                raise WorkoutNotFoundError(f"{self._workout_type} {id!r} not found")
+            return db_model
+        update_data["updated_at"] = now_isoformat()
+
+        try:
+            response = self._table.update_item(
+                Key={
+                    "PK": get_workout_pk(owner=owner, workout_type=self._workout_type),
+                    "SK": _get_sk(workout_type=self._workout_type, id=id),
+                },
+                UpdateExpression="SET "
+                + ", ".join(f"#{field} = :{field}" for field in update_data)
+                + ", #version = if_not_exists(#version, :one) + :one",
+                ConditionExpression="attribute_exists(PK)",
+                ExpressionAttributeNames={
+                    "#version": "version",
+                    **{f"#{field}": field for field in update_data},
+                },
+                ExpressionAttributeValues={
+                    ":one": 1,
+                    **{f":{field}": value for field, value in update_data.items()},
+                },
+                ReturnValues="ALL_OLD",
+            )
+        except ClientError as e:
+            if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                raise WorkoutNotFoundError(f"{self._workout_type} {id!r} not found")
+            self._logger.error(f"Error patching {self._workout_type}", exc_info=True)
+            raise WorkoutError(f"Error patching {self._workout_type}")
+
+        old_item = response["Attributes"]
+        # The new item follows from the old one and the SET expression, which saves
+        # reading it back when the old one is needed for `_on_changes`.
+        new_item = {
+            **old_item,
+            **update_data,
+            "version": int(old_item.get("version", 1)) + 1,  # type: ignore
+        }
+        patched = self._from_item(new_item)
+        self._on_changes(owner, [(self._from_item(old_item), patched)])
+        self._bump_collection_version(owner)
+        return patched
+
+    def delete(
+        self, id: str, owner: str, return_deleted: bool = False
+    ) -> ModelType | None:
+        """Delete a workout in a single conditional write.
+
+        Returns the deleted workout if `return_deleted` is set.
+        """
         self._logger.info(f"Deleting {self._workout_type} {id!r} for owner {owner!r}")
 
         try:
-            self._table.delete_item(
+            response = self._table.delete_item(
                 Key={
-                    "PK": _get_pk(owner=owner, workout_type=self._workout_type),
+                    "PK": get_workout_pk(owner=owner, workout_type=self._workout_type),
                     "SK": _get_sk(workout_type=self._workout_type, id=id),
-                }
+                },
+                ConditionExpression="attribute_exists(PK)",
+                ReturnValues="ALL_OLD",
             )
-        except ClientError:
+        except ClientError as e:
+            if e.response["Error"]["Code"] == "ConditionalCheckFailedException":
+                raise WorkoutNotFoundError(f"{self._workout_type} {id!r} not found")
             self._logger.error(f"Error deleting {self._workout_type}", exc_info=True)
             raise WorkoutError(f"Error deleting {self._workout_type}")
 
+        deleted = self._from_item(response["Attributes"])
+        self._on_changes(owner, [(deleted, None)])
+        self._bump_collection_version(owner)
+        return deleted if return_deleted else None
+
+    def get_collection_version(self, owner: str) -> int:
+        """Get a counter that changes whenever any workout of the owner changes."""
+        try:
+            response = self._table.get_item(
+                Key=_get_collection_version_key(owner, self._workout_type),
+                ConsistentRead=True,
+            )
+        except ClientError:
+            self._logger.error(
+                f"Error getting {self._workout_type} collection version", exc_info=True
+            )
+            raise WorkoutError(f"Error getting {self._workout_type} collection version")
+        return int(response.get("Item", {}).get("version", 0))  # type: ignore
+
+    def _bump_collection_version(self, owner: str) -> None:
+        """Increment the owner's collection version after a write.
+
+        A failure is raised even though the write itself succeeded, as the list's
+        ETag would otherwise stay the same and answer 304 for stale lists.
+        """
+        try:
+            self._table.update_item(
+                Key=_get_collection_version_key(owner, self._workout_type),
+                UpdateExpression="ADD #version :one",
+                ExpressionAttributeNames={"#version": "version"},
+                ExpressionAttributeValues={":one": 1},
+            )
+        except ClientError:
+            self._logger.error(
+                f"Error bumping {self._workout_type} collection version", exc_info=True
+            )
+            raise WorkoutError(f"Error bumping {self._workout_type} collection version")
+
     def health_check(self) -> None:
         self._logger.info(f"Health checking {self._workout_type}")
         try:
@@ -175,4 +562,57 @@ class DynamoDBWorkoutPlanRepository(DynamoDBWorkoutRepository[WorkoutPlan]):
 
 
 class DynamoDBWorkoutLogRepository(DynamoDBWorkoutRepository[WorkoutLog]):
-    pass
+    """Workout log repository that can pack the sets of each exercise.
+
+    With `pack_sets`, the sets of each exercise are written as one Binary attribute
+    (see `set_codec`) instead of a list of maps. Both forms are always readable.
+    Every change of a workout log's sets is applied to its exercise stats.
+    """
+
+    def __init__(
+        self,
+        table: Table,
+        workout_type: WorkoutType,
+        model: type[WorkoutLog],
+        pack_sets: bool = False,
+    ):
+        super().__init__(table=table, workout_type=workout_type, model=model)
+        self._pack_sets = pack_sets
+        self._stats = DynamoDBExerciseStatsRepository(table)
+
+    def _encode_attributes(self, attributes: dict[str, Any]) -> dict[str, Any]:
+        if self._pack_sets and attributes.get("logs"):
+            attributes["logs"] = [_pack_exercise(log) for log in attributes["logs"]]
+        return attributes
+
+    def _from_item(self, item: dict[str, Any]) -> WorkoutLog:
+        if item.get("logs"):
+            item["logs"] = [_unpack_exercise(log) for log in item["logs"]]
+        return super()._from_item(item)
+
+    def _on_changes(
+        self,
+        owner: str,
+        changes: Sequence[tuple[WorkoutLog | None, WorkoutLog | None]],
+    ) -> None:
+        changes = [
+            (old, new)
+            for old, new in changes
+            if old is None or new is None or old.logs != new.logs
+        ]
+        if changes:
+            self._stats.apply_changes(owner, changes)
+
+
+def _pack_exercise(exercise_log: dict[str, Any]) -> dict[str, Any]:
+    packed = pack_sets(exercise_log["sets"])
+    return exercise_log if packed is None else {**exercise_log, "sets": packed}
+
+
+def _unpack_exercise(exercise_log: dict[str, Any]) -> dict[str, Any]:
+    sets = exercise_log["sets"]
+    if isinstance(sets, Binary):
+        sets = sets.value
+    if isinstance(sets, (bytes, bytearray)):
+        return {**exercise_log, "sets": unpack_sets(bytes(sets))}
+    return exercise_log
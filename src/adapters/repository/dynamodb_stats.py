@@ -0,0 +1,727 @@
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Any, Iterable, Iterator, Sequence
+
+from botocore.exceptions import ClientError
+from mypy_boto3_dynamodb.service_resource import Table
+
+from src.exceptions import InvalidCursorError, WorkoutError
+from src.model import ExerciseHistoryEntry, ExerciseRecord, ExerciseStats, WorkoutLog
+from src.stats import (
+    ExerciseTotals,
+    aggregate_exercise_history,
+    aggregate_exercise_stats,
+    beats_record,
+    best_exercise_records,
+    best_history_records,
+    exercise_history_entries,
+    exercise_records,
+    exercise_totals,
+    normalise_exercise_name,
+    record_key,
+)
+
+from .batching import batch_get
+from .paging import decode_cursor, query_page
+from .stats_protocol import ExerciseStatsRepository
+from .workout_protocol import Page
+
+_BESTS = ("best_weight", "estimated_one_rep_max")
+_RAISE_CONDITIONS = {
+    "best_weight": "attribute_not_exists(best_weight) OR best_weight < :best_weight",
+    "estimated_one_rep_max": "attribute_not_exists(estimated_one_rep_max) "
+    "OR estimated_one_rep_max < :estimated_one_rep_max",
+    "last_performed_at": "attribute_not_exists(last_performed_at) "
+    "OR last_performed_at <= :last_performed_at",
+}
+
+
+def _get_stats_pk(owner: str) -> str:
+    return f"OWNER#{owner}#EXERCISE_STATS"
+
+
+def _get_stats_key(owner: str, exercise: str) -> dict[str, str]:
+    return {"PK": _get_stats_pk(owner), "SK": f"EXERCISE#{exercise}"}
+
+
+def _get_records_pk(owner: str) -> str:
+    return f"OWNER#{owner}#EXERCISE_RECORDS"
+
+
+def _get_records_sk_prefix(exercise: str) -> str:
+    return f"EXERCISE#{exercise}#REPS#"
+
+
+def _get_record_key(owner: str, record: ExerciseRecord) -> dict[str, str]:
+    exercise, reps = record_key(record)
+    # Zero padded, so that the records of an exercise sort by reps.
+    return {
+        "PK": _get_records_pk(owner),
+        "SK": f"{_get_records_sk_prefix(exercise)}{reps:010d}",
+    }
+
+
+def _get_history_pk(owner: str, exercise: str) -> str:
+    return f"OWNER#{owner}#EXERCISE#{exercise}"
+
+
+def _get_history_sk_bound(at: datetime) -> str:
+    """Get the sort key just below every history entry of workout logs created at
+    `at` or later.
+
+    Creation times are stored as `now_isoformat` writes them, in UTC and without
+    microseconds when there are none, which sorts before any with them.
+    """
+    if at.tzinfo is None:
+        at = at.replace(tzinfo=timezone.utc)
+    return f"WORKOUT_LOG#{at.astimezone(timezone.utc).isoformat()}"
+
+
+def _get_history_key(
+    owner: str, exercise: str, entry: ExerciseHistoryEntry
+) -> dict[str, str]:
+    # Keyed by creation time rather than id, as logs created before time-ordered
+    # ids would otherwise sort out of order.
+    return {
+        "PK": _get_history_pk(owner, exercise),
+        "SK": f"WORKOUT_LOG#{entry.performed_at}#{entry.workout_log_id}",
+    }
+
+
+def _is_conditional_check_failure(error: ClientError) -> bool:
+    return error.response["Error"]["Code"] == "ConditionalCheckFailedException"
+
+
+class DynamoDBExerciseStatsRepository(ExerciseStatsRepository):
+    """Per-exercise aggregates of an owner's workout logs, one item per exercise,
+    records, one item per exercise and number of reps, and the history of every
+    exercise, one entry item per exercise per workout log.
+
+    Changes of workout logs are applied as deltas, a batch of changes at a time:
+    counts and volume with an atomic ADD per exercise, which also raises bests and
+    the last performed date on the condition that they are still beaten. Records
+    are only written when beaten, on the same condition. Only when a change
+    removes the set holding a best or a record, which no delta can express, is
+    that exercise's history read to recompute it. Entries are partitioned by owner
+    and exercise and sorted by date, so the history of an exercise is read in
+    proportion to its length rather than to every workout log.
+    """
+
+    def __init__(self, table: Table):
+        self._table = table
+        self._logger = logging.getLogger(__name__)
+
+    def list_exercise_stats(self, owner: str) -> list[ExerciseStats]:
+        """List the stats of every exercise an owner has logged, by name."""
+        self._logger.info(f"Listing exercise stats for owner {owner!r}")
+        return [
+            ExerciseStats.from_trusted(item)
+            for item in self._query(
+                {
+                    "KeyConditionExpression": "PK = :pk",
+                    "ExpressionAttributeValues": {":pk": _get_stats_pk(owner)},
+                },
+                "exercise stats",
+            )
+            if int(item["log_count"]) > 0
+        ]
+
+    def list_exercise_records(
+        self, owner: str, exercise: str | None = None
+    ) -> list[ExerciseRecord]:
+        """List an owner's records by exercise name and reps.
+
+        With `exercise`, only the records of the exercise of that normalised name
+        are listed.
+        """
+        self._logger.info(f"Listing exercise records for owner {owner!r}")
+        query: dict[str, Any] = {
+            "KeyConditionExpression": "PK = :pk",
+            "ExpressionAttributeValues": {":pk": _get_records_pk(owner)},
+        }
+        if exercise is not None:
+            query["KeyConditionExpression"] += " AND begins_with(SK, :prefix)"
+            query["ExpressionAttributeValues"][":prefix"] = _get_records_sk_prefix(
+                normalise_exercise_name(exercise)
+            )
+        return [
+            ExerciseRecord.from_trusted(item)
+            for item in self._query(query, "exercise records")
+        ]
+
+    def list_exercise_history(
+        self,
+        owner: str,
+        exercise: str,
+        limit: int | None = None,
+        cursor: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        newest_first: bool = False,
+    ) -> Page[ExerciseHistoryEntry]:
+        """List up to `limit` workout logs' sets of an exercise, by date.
+
+        The exercise is matched by normalised name. `since` and `until` select
+        workout logs created in that range, inclusive, by the sort key.
+        """
+        self._logger.info(f"Listing history of {exercise!r} for owner {owner!r}")
+        pk = _get_history_pk(owner, normalise_exercise_name(exercise))
+        query: dict[str, Any] = {
+            "KeyConditionExpression": "PK = :pk",
+            "ExpressionAttributeValues": {":pk": pk},
+            "ScanIndexForward": not newest_first,
+        }
+        values = query["ExpressionAttributeValues"]
+        if since:
+            values[":since"] = _get_history_sk_bound(since)
+        if until:
+            # Just below the entries of the next microsecond, which BETWEEN includes.
+            values[":until"] = _get_history_sk_bound(until + timedelta(microseconds=1))
+        if since and until:
+            query["KeyConditionExpression"] += " AND SK BETWEEN :since AND :until"
+        elif since:
+            query["KeyConditionExpression"] += " AND SK >= :since"
+        elif until:
+            query["KeyConditionExpression"] += " AND SK < :until"
+        if cursor:
+            query["ExclusiveStartKey"] = decode_cursor(cursor, pk=pk)
+        items, next_cursor = query_page(self._query_page, limit, **query)
+        return Page(
+            items=[ExerciseHistoryEntry.from_trusted(item) for item in items],
+            next_cursor=next_cursor,
+        )
+
+    def _query_page(self, **query: Any) -> dict[str, Any]:
+        try:
+            return self._table.query(**query)  # type: ignore
+        except ClientError as e:
+            if (
+                e.response["Error"]["Code"] == "ValidationException"
+                and "ExclusiveStartKey" in query
+            ):
+                raise InvalidCursorError("Cursor is outside of the listed range")
+            self._logger.error("Error listing exercise history", exc_info=True)
+            raise WorkoutError("Error listing exercise history")
+
+    def write_exercise_history(self, owner: str, workout_log: WorkoutLog) -> None:
+        """Write the history entries of a workout log, replacing any stored ones."""
+        with self._table.batch_writer() as batch:
+            for exercise, entry in exercise_history_entries(workout_log).items():
+                batch.put_item(Item=self._history_item(owner, exercise, entry))
+
+    def rekey_exercise_history(
+        self,
+        owner: str,
+        exercises: Iterable[str],
+        performed_at: str,
+        legacy_id: str,
+        workout_log_id: str,
+    ) -> None:
+        """Move the history entries of a re-keyed workout log to its new id."""
+        legacy_keys = [
+            {
+                "PK": _get_history_pk(owner, exercise),
+                "SK": f"WORKOUT_LOG#{performed_at}#{legacy_id}",
+            }
+            for exercise in exercises
+        ]
+        entries = batch_get(self._table, legacy_keys, "exercise history")
+        with self._table.batch_writer() as batch:
+            for item in entries:
+                batch.put_item(
+                    Item={
+                        **item,
+                        "SK": f"WORKOUT_LOG#{performed_at}#{workout_log_id}",
+                        "workout_log_id": workout_log_id,
+                    }
+                )
+                batch.delete_item(Key={"PK": item["PK"], "SK": item["SK"]})
+
+    def rekey_exercise_records(
+        self,
+        owner: str,
+        exercises: Iterable[str],
+        legacy_id: str,
+        workout_log_id: str,
+    ) -> None:
+        """Point the records a re-keyed workout log holds at its new id."""
+        for exercise in exercises:
+            for item in self._query(
+                {
+                    "KeyConditionExpression": "PK = :pk AND begins_with(SK, :prefix)",
+                    "FilterExpression": "workout_log_id = :legacy_id",
+                    "ExpressionAttributeValues": {
+                        ":pk": _get_records_pk(owner),
+                        ":prefix": _get_records_sk_prefix(exercise),
+                        ":legacy_id": legacy_id,
+                    },
+                },
+                "exercise records",
+            ):
+                try:
+                    self._table.update_item(
+                        Key={"PK": item["PK"], "SK": item["SK"]},
+                        UpdateExpression="SET workout_log_id = :id",
+                        ConditionExpression="workout_log_id = :legacy_id",
+                        ExpressionAttributeValues={
+                            ":id": workout_log_id,
+                            ":legacy_id": legacy_id,
+                        },
+                    )
+                except ClientError as e:
+                    if not _is_conditional_check_failure(e):
+                        raise
+
+    def _query(self, query: dict[str, Any], description: str) -> Iterator[Any]:
+        while True:
+            try:
+                response = self._table.query(**query)
+            except ClientError:
+                self._logger.error(f"Error listing {description}", exc_info=True)
+                raise WorkoutError(f"Error listing {description}")
+            yield from response["Items"]
+            if not (last_evaluated_key := response.get("LastEvaluatedKey")):
+                return
+            query["ExclusiveStartKey"] = last_evaluated_key
+
+    def rebuild(self, owner: str, workout_logs: Iterable[WorkoutLog]) -> None:
+        """Replace an owner's stats and records with those of `workout_logs`.
+
+        Changes are applied as deltas to what is stored, so the stats and records
+        of logs written before they were kept must be rebuilt from every log.
+        """
+        workout_logs = list(workout_logs)
+        items = [
+            {
+                **_get_stats_key(owner, normalise_exercise_name(stats.name)),
+                **stats.dict(exclude_none=True),
+            }
+            for stats in aggregate_exercise_stats(workout_logs)
+        ] + [
+            {**_get_record_key(owner, record), **record.dict()}
+            for record in best_exercise_records(workout_logs)
+        ]
+        kept = {_item_key(item) for item in items}
+        with self._table.batch_writer(overwrite_by_pkeys=["PK", "SK"]) as batch:
+            for pk, description in (
+                (_get_stats_pk(owner), "exercise stats"),
+                (_get_records_pk(owner), "exercise records"),
+            ):
+                for item in self._query(
+                    {
+                        "KeyConditionExpression": "PK = :pk",
+                        "ExpressionAttributeValues": {":pk": pk},
+                        "ProjectionExpression": "PK, SK",
+                    },
+                    description,
+                ):
+                    if _item_key(item) not in kept:
+                        batch.delete_item(Key=item)
+            for item in items:
+                batch.put_item(Item=item)
+
+    def apply_changes(
+        self,
+        owner: str,
+        changes: Sequence[tuple[WorkoutLog | None, WorkoutLog | None]],
+    ) -> None:
+        """Apply the changes of workout logs, each from `old` to `new`.
+
+        History entries are written first, as bests and records are recomputed from
+        them. The stored stats and records of every exercise changed are then read
+        in one batch, so that each exercise's stats are updated in one write and
+        only beaten records are written. Failures are logged rather than raised,
+        as the workout logs themselves were written.
+        """
+        try:
+            self._apply_history_changes(owner, changes)
+        except (ClientError, WorkoutError):
+            self._logger.error(
+                f"Error updating exercise history for owner {owner!r}", exc_info=True
+            )
+        exercise_changes = _exercise_changes(changes)
+        raised_records, lowered_records = _record_changes(changes)
+        keys = [
+            *(_get_stats_key(owner, exercise) for exercise in exercise_changes),
+            *(
+                _get_record_key(owner, record)
+                for record in [*raised_records.values(), *lowered_records]
+            ),
+        ]
+        try:
+            stored = {
+                _item_key(item): item
+                for item in batch_get(
+                    self._table,
+                    list({_item_key(key): key for key in keys}.values()),
+                    "exercise stats",
+                )
+            }
+        except WorkoutError:
+            self._logger.error(
+                f"Error updating exercise stats for owner {owner!r}", exc_info=True
+            )
+            return
+        histories: dict[str, list[ExerciseHistoryEntry]] = {}
+        for exercise, exercise_change in exercise_changes.items():
+            try:
+                self._apply_exercise_change(
+                    owner, exercise, exercise_change, stored, histories
+                )
+            except (ClientError, WorkoutError):
+                self._logger.error(
+                    f"Error updating stats of exercise {exercise!r} "
+                    f"for owner {owner!r}",
+                    exc_info=True,
+                )
+        try:
+            self._apply_record_changes(
+                owner, raised_records, lowered_records, stored, histories
+            )
+        except (ClientError, WorkoutError):
+            self._logger.error(
+                f"Error updating exercise records for owner {owner!r}", exc_info=True
+            )
+
+    def _apply_history_changes(
+        self,
+        owner: str,
+        changes: Sequence[tuple[WorkoutLog | None, WorkoutLog | None]],
+    ) -> None:
+        with self._table.batch_writer(overwrite_by_pkeys=["PK", "SK"]) as batch:
+            for old, new in changes:
+                old_entries = exercise_history_entries(old) if old else {}
+                new_entries = exercise_history_entries(new) if new else {}
+                for exercise, entry in old_entries.items():
+                    if exercise not in new_entries:
+                        batch.delete_item(Key=_get_history_key(owner, exercise, entry))
+                for exercise, entry in new_entries.items():
+                    if old_entries.get(exercise) != entry:
+                        batch.put_item(Item=self._history_item(owner, exercise, entry))
+
+    def _history_item(
+        self, owner: str, exercise: str, entry: ExerciseHistoryEntry
+    ) -> dict[str, Any]:
+        return {**_get_history_key(owner, exercise, entry), **entry.dict()}
+
+    def _exercise_history(
+        self,
+        owner: str,
+        exercise: str,
+        histories: dict[str, list[ExerciseHistoryEntry]],
+    ) -> list[ExerciseHistoryEntry]:
+        """Read the whole history of an exercise, once per batch of changes."""
+        if exercise not in histories:
+            histories[exercise] = [
+                ExerciseHistoryEntry.from_trusted(item)
+                for item in self._query(
+                    {
+                        "KeyConditionExpression": "PK = :pk",
+                        "ExpressionAttributeValues": {
+                            ":pk": _get_history_pk(owner, exercise)
+                        },
+                        "ConsistentRead": True,
+                    },
+                    "exercise history",
+                )
+            ]
+        return histories[exercise]
+
+    def _apply_exercise_change(
+        self,
+        owner: str,
+        exercise: str,
+        exercise_change: list[tuple[ExerciseTotals | None, ExerciseTotals | None]],
+        stored: dict[tuple[str, str], dict[str, Any]],
+        histories: dict[str, list[ExerciseHistoryEntry]],
+    ) -> None:
+        key = _get_stats_key(owner, exercise)
+        raised = _raised_bests(exercise_change, stored.get(_item_key(key), {}))
+        try:
+            attributes = self._add_deltas(key, exercise_change, raised)
+        except ClientError as e:
+            if not raised or not _is_conditional_check_failure(e):
+                raise
+            # A concurrent write raised a best first, so each is raised on its own.
+            attributes = self._add_deltas(key, exercise_change, {})
+            self._raise_bests(key, raised)
+        if int(attributes["log_count"]) <= 0:
+            self._delete_if_unused(key)
+        elif any(
+            old is not None and _removes_best(old, new, attributes)
+            for old, new in exercise_change
+        ):
+            self._recompute_bests(
+                key, exercise, self._exercise_history(owner, exercise, histories)
+            )
+
+    def _add_deltas(
+        self,
+        key: dict[str, str],
+        exercise_change: list[tuple[ExerciseTotals | None, ExerciseTotals | None]],
+        raised: dict[str, Any],
+    ) -> dict[str, Any]:
+        """Add the deltas of an exercise's changes, setting `raised` if still raised."""
+
+        def delta(attribute: str) -> Any:
+            return sum(
+                (getattr(new, attribute) if new else 0)
+                - (getattr(old, attribute) if old else 0)
+                for old, new in exercise_change
+            )
+
+        values: dict[str, Any] = {
+            ":logs": sum(
+                (1 if new else 0) - (1 if old else 0) for old, new in exercise_change
+            ),
+            ":sets": delta("set_count"),
+            ":reps": delta("rep_count"),
+            ":volume": delta("volume"),
+        }
+        assignments = []
+        if "name" not in raised:
+            old, new = exercise_change[-1]
+            assignments.append("#name = if_not_exists(#name, :name)")
+            values[":name"] = (new or old).name  # type: ignore
+        assignments.extend(f"#{name} = :{name}" for name in raised)
+        values.update({f":{name}": value for name, value in raised.items()})
+        update: dict[str, Any] = {
+            "Key": key,
+            "UpdateExpression": "SET "
+            + ", ".join(assignments)
+            + " ADD log_count :logs, set_count :sets, rep_count :reps, "
+            "total_volume :volume",
+            "ExpressionAttributeNames": {
+                "#name": "name",
+                **{f"#{name}": name for name in raised},
+            },
+            "ExpressionAttributeValues": values,
+            "ReturnValues": "ALL_NEW",
+        }
+        if conditions := [
+            f"({condition})"
+            for attribute, condition in _RAISE_CONDITIONS.items()
+            if attribute in raised
+        ]:
+            update["ConditionExpression"] = " AND ".join(conditions)
+        response = self._table.update_item(**update)
+        return response["Attributes"]
+
+    def _raise_bests(self, key: dict[str, str], raised: dict[str, Any]) -> None:
+        for attribute, condition in _RAISE_CONDITIONS.items():
+            if attribute not in raised:
+                continue
+            values = {attribute: raised[attribute]}
+            if attribute == "last_performed_at":
+                values["name"] = raised["name"]
+            self._set_if(key, condition, values)
+
+    def _set_if(
+        self, key: dict[str, str], condition: str, values: dict[str, Any]
+    ) -> None:
+        """Set attributes unless the condition fails, as a concurrent write won."""
+        try:
+            self._table.update_item(
+                Key=key,
+                UpdateExpression="SET "
+                + ", ".join(f"#{name} = :{name}" for name in values),
+                ConditionExpression=condition,
+                ExpressionAttributeNames={f"#{name}": name for name in values},
+                ExpressionAttributeValues={
+                    f":{name}": value for name, value in values.items()
+                },
+            )
+        except ClientError as e:
+            if not _is_conditional_check_failure(e):
+                raise
+
+    def _recompute_bests(
+        self,
+        key: dict[str, str],
+        exercise: str,
+        history: list[ExerciseHistoryEntry],
+    ) -> None:
+        self._logger.info(f"Recomputing bests of exercise {exercise!r}")
+        stats = aggregate_exercise_history(history)
+        if stats is None:
+            self._table.delete_item(Key=key)
+            return
+        values = {
+            "name": stats.name,
+            "best_weight": stats.best_weight,
+            "estimated_one_rep_max": stats.estimated_one_rep_max,
+            "last_performed_at": stats.last_performed_at,
+        }
+        set_values = {
+            name: value for name, value in values.items() if value is not None
+        }
+        removed = [name for name, value in values.items() if value is None]
+        self._table.update_item(
+            Key=key,
+            UpdateExpression="SET "
+            + ", ".join(f"#{name} = :{name}" for name in set_values)
+            + (
+                " REMOVE " + ", ".join(f"#{name}" for name in removed)
+                if removed
+                else ""
+            ),
+            ExpressionAttributeNames={f"#{name}": name for name in values},
+            ExpressionAttributeValues={
+                f":{name}": value for name, value in set_values.items()
+            },
+        )
+
+    def _apply_record_changes(
+        self,
+        owner: str,
+        raised: dict[tuple[str, int], ExerciseRecord],
+        lowered: list[ExerciseRecord],
+        stored: dict[tuple[str, str], dict[str, Any]],
+        histories: dict[str, list[ExerciseHistoryEntry]],
+    ) -> None:
+        released: dict[str, set[int]] = {}
+        for record in lowered:
+            current = stored.get(_item_key(_get_record_key(owner, record)))
+            if (
+                current is not None
+                and current["workout_log_id"] == record.workout_log_id
+                and self._release_record(owner, record)
+            ):
+                exercise, reps = record_key(record)
+                released.setdefault(exercise, set()).add(reps)
+        for (exercise, reps), record in raised.items():
+            current = stored.get(_item_key(_get_record_key(owner, record)))
+            if reps not in released.get(exercise, set()) and (
+                current is None
+                or beats_record(record, ExerciseRecord.from_trusted(current))
+            ):
+                self._raise_record(owner, record)
+        for exercise, reps_released in released.items():
+            self._logger.info(
+                f"Recomputing {len(reps_released)} records of exercise {exercise!r}"
+            )
+            for record in best_history_records(
+                self._exercise_history(owner, exercise, histories), reps=reps_released
+            ):
+                self._raise_record(owner, record)
+
+    def _raise_record(self, owner: str, record: ExerciseRecord) -> None:
+        self._set_if(
+            _get_record_key(owner, record),
+            "attribute_not_exists(#weight) OR #weight < :weight "
+            "OR (#weight = :weight AND #performed_at > :performed_at)",
+            record.dict(),
+        )
+
+    def _release_record(self, owner: str, record: ExerciseRecord) -> bool:
+        """Delete a record if the workout log of `record` holds it."""
+        try:
+            self._table.delete_item(
+                Key=_get_record_key(owner, record),
+                ConditionExpression="workout_log_id = :id",
+                ExpressionAttributeValues={":id": record.workout_log_id},
+            )
+        except ClientError as e:
+            if not _is_conditional_check_failure(e):
+                raise
+            return False
+        return True
+
+    def _delete_if_unused(self, key: dict[str, str]) -> None:
+        try:
+            self._table.delete_item(
+                Key=key,
+                ConditionExpression="log_count <= :zero",
+                ExpressionAttributeValues={":zero": 0},
+            )
+        except ClientError as e:
+            if not _is_conditional_check_failure(e):
+                raise
+
+
+def _item_key(item: dict[str, Any]) -> tuple[str, str]:
+    return item["PK"], item["SK"]
+
+
+def _exercise_changes(
+    changes: Sequence[tuple[WorkoutLog | None, WorkoutLog | None]],
+) -> dict[str, list[tuple[ExerciseTotals | None, ExerciseTotals | None]]]:
+    """Group the changes of workout logs' totals by the exercise they change."""
+    exercise_changes: dict[
+        str, list[tuple[ExerciseTotals | None, ExerciseTotals | None]]
+    ] = {}
+    for old, new in changes:
+        old_totals = exercise_totals(old) if old else {}
+        new_totals = exercise_totals(new) if new else {}
+        for exercise in dict.fromkeys([*old_totals, *new_totals]):
+            change = (old_totals.get(exercise), new_totals.get(exercise))
+            if change[0] != change[1]:
+                exercise_changes.setdefault(exercise, []).append(change)
+    return exercise_changes
+
+
+def _record_changes(
+    changes: Sequence[tuple[WorkoutLog | None, WorkoutLog | None]],
+) -> tuple[dict[tuple[str, int], ExerciseRecord], list[ExerciseRecord]]:
+    """Find the best new record per key, and the old records changes lower."""
+    raised: dict[tuple[str, int], ExerciseRecord] = {}
+    lowered: list[ExerciseRecord] = []
+    for old, new in changes:
+        old_records = exercise_records(old) if old else {}
+        new_records = exercise_records(new) if new else {}
+        lowered.extend(
+            record
+            for key, record in old_records.items()
+            if key not in new_records or new_records[key].weight < record.weight
+        )
+        for key, record in new_records.items():
+            if key not in raised or beats_record(record, raised[key]):
+                raised[key] = record
+    return raised, lowered
+
+
+def _raised_bests(
+    exercise_change: list[tuple[ExerciseTotals | None, ExerciseTotals | None]],
+    stored: dict[str, Any],
+) -> dict[str, Any]:
+    """Find the bests and last performance that changes raise above `stored`."""
+    new_totals = [new for _, new in exercise_change if new is not None]
+    raised: dict[str, Any] = {}
+    for attribute in _BESTS:
+        values = [
+            value
+            for totals in new_totals
+            if (value := getattr(totals, attribute)) is not None
+        ]
+        current = stored.get(attribute)
+        if values and (current is None or max(values) > current):
+            raised[attribute] = max(values)
+    if new_totals:
+        latest = max(new_totals, key=lambda totals: totals.performed_at)
+        current_at = stored.get("last_performed_at")
+        if current_at is None or latest.performed_at >= current_at:
+            raised["last_performed_at"] = latest.performed_at
+            raised["name"] = latest.name
+    return raised
+
+
+def _removes_best(
+    old: ExerciseTotals, new: ExerciseTotals | None, attributes: dict[str, Any]
+) -> bool:
+    """Check whether a change removed a set holding one of the stored bests."""
+    for attribute in _BESTS:
+        old_value: Decimal | None = getattr(old, attribute)
+        stored = attributes.get(attribute)
+        new_value = getattr(new, attribute) if new else None
+        if (
+            old_value is not None
+            and stored is not None
+            and old_value >= stored
+            and (new_value is None or new_value < old_value)
+        ):
+            return True
+    stored_at = attributes.get("last_performed_at")
+    return new is None and stored_at is not None and old.performed_at >= stored_at
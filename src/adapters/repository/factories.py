@@ -1,20 +1,176 @@
 from __future__ import annotations
 
 import logging
+import threading
 from functools import partial
 from typing import Callable
 
 import boto3
+from botocore.config import Config
 from mypy_boto3_dynamodb.service_resource import DynamoDBServiceResource, Table
 
-from src.config import config
+from src import metrics
+from src.adapters.cache import InMemoryCacheBackend
+from src.config import RepositoryBackend, config
 from src.model import WorkoutLog, WorkoutPlan, WorkoutType
 
+from .async_adapter import (
+    AsyncExerciseStatsRepositoryAdapter,
+    AsyncWorkoutRepositoryAdapter,
+)
+from .caching import CacheStats, CachingWorkoutRepository
 from .dynamodb import DynamoDBWorkoutLogRepository, DynamoDBWorkoutPlanRepository
-from .workout_protocol import WorkoutRepository
+from .dynamodb_stats import DynamoDBExerciseStatsRepository
+from .instrumentation import instrument_dynamodb_client
+from .memory import InMemoryWorkoutRepository
+from .memory_stats import InMemoryExerciseStatsRepository
+from .sqlite import SQLiteWorkoutRepository
+from .stats_protocol import AsyncExerciseStatsRepository, ExerciseStatsRepository
+from .workout_protocol import AsyncWorkoutRepository, WorkoutRepository
 
 _logger = logging.getLogger(__name__)
 
+_lock = threading.Lock()
+_resources: dict[str | None, DynamoDBServiceResource] = {}
+_tables: dict[tuple[str, str | None], Table] = {}
+
+_cache_backend = InMemoryCacheBackend(
+    max_entries=config.CACHE_MAX_ENTRIES, ttl=config.CACHE_TTL_SECONDS
+)
+_cache_stats = {workout_type: CacheStats() for workout_type in WorkoutType}
+
+_memory_repositories: dict[WorkoutType, InMemoryWorkoutRepository] = {}
+_sqlite_repositories: dict[tuple[WorkoutType, str], SQLiteWorkoutRepository] = {}
+
+
+def _botocore_config() -> Config:
+    """Get the botocore config shared by all pooled DynamoDB connections."""
+    return Config(
+        max_pool_connections=config.DYNAMODB_MAX_POOL_CONNECTIONS,
+        connect_timeout=config.DYNAMODB_CONNECT_TIMEOUT,
+        read_timeout=config.DYNAMODB_READ_TIMEOUT,
+        tcp_keepalive=config.DYNAMODB_TCP_KEEPALIVE,
+        retries={"max_attempts": config.DYNAMODB_MAX_ATTEMPTS, "mode": "standard"},
+    )
+
+
+def get_dynamodb_table(table_name: str, dynamodb_url: str | None = None) -> Table:
+    """Get the process-wide DynamoDB table for a table name and endpoint.
+
+    The underlying resource and its connection pool are created once per endpoint
+    and reused by every subsequent call, so warm processes skip session creation,
+    credential resolution and service model loading.
+    """
+    key = (table_name, dynamodb_url)
+    if (table := _tables.get(key)) is not None:
+        return table
+
+    with _lock:
+        if (table := _tables.get(key)) is not None:
+            return table
+        if (dynamodb := _resources.get(dynamodb_url)) is None:
+            _logger.info(f"Connecting to DynamoDB at {dynamodb_url}")
+            session = boto3.session.Session()
+            dynamodb = session.resource(
+                "dynamodb", endpoint_url=dynamodb_url, config=_botocore_config()
+            )  # type: ignore
+            instrument_dynamodb_client(dynamodb.meta.client)
+            _resources[dynamodb_url] = dynamodb
+        table = dynamodb.Table(table_name)
+        _tables[key] = table
+        return table
+
+
+def reset_dynamodb_tables() -> None:
+    """Drop all pooled DynamoDB resources and tables."""
+    with _lock:
+        _tables.clear()
+        _resources.clear()
+
+
+def _get_memory_repository(
+    workout_type: WorkoutType, model: type[WorkoutPlan] | type[WorkoutLog]
+) -> InMemoryWorkoutRepository:
+    """Get the process-wide in-memory repository of a workout type."""
+    with _lock:
+        if (repository := _memory_repositories.get(workout_type)) is None:
+            repository = InMemoryWorkoutRepository(workout_type, model)
+            _memory_repositories[workout_type] = repository
+        return repository
+
+
+def reset_memory_repositories() -> None:
+    """Drop every workout held by the in-memory repositories."""
+    with _lock:
+        _memory_repositories.clear()
+
+
+def _get_sqlite_repository(
+    workout_type: WorkoutType, model: type[WorkoutPlan] | type[WorkoutLog]
+) -> SQLiteWorkoutRepository:
+    """Get the process-wide SQLite repository of a workout type and database.
+
+    It is shared so that every thread keeps reusing its one connection.
+    """
+    key = (workout_type, config.SQLITE_PATH)
+    with _lock:
+        if (repository := _sqlite_repositories.get(key)) is None:
+            repository = SQLiteWorkoutRepository(
+                config.SQLITE_PATH, workout_type, model
+            )
+            _sqlite_repositories[key] = repository
+        return repository
+
+
+def reset_sqlite_repositories() -> None:
+    """Close and drop every SQLite repository and its connections."""
+    with _lock:
+        for repository in _sqlite_repositories.values():
+            repository.close()
+        _sqlite_repositories.clear()
+
+
+def get_cache_stats() -> dict[WorkoutType, CacheStats]:
+    """Get the process-wide repository cache hit and miss counters."""
+    return _cache_stats
+
+
+def _cache_statistic(statistic: str) -> dict[tuple[str, ...], float]:
+    return {
+        (workout_type.value,): getattr(stats, statistic)
+        for workout_type, stats in _cache_stats.items()
+    }
+
+
+for _name, _kind, _statistic in (
+    ("cache_hits_total", "counter", "hits"),
+    ("cache_misses_total", "counter", "misses"),
+    ("cache_hit_ratio", "gauge", "hit_ratio"),
+):
+    metrics.register(
+        metrics.CallbackMetric(
+            _name,
+            f"Repository cache {_statistic.replace('_', ' ')} per workout type.",
+            _kind,
+            partial(_cache_statistic, _statistic),
+            labelnames=["workout_type"],
+        )
+    )
+
+
+def _with_cache(
+    repository: WorkoutRepository, workout_type: WorkoutType
+) -> WorkoutRepository:
+    """Wrap a repository in the process-wide read-through cache, if enabled."""
+    if not config.CACHE_ENABLED:
+        return repository
+    return CachingWorkoutRepository(
+        repository,
+        backend=_cache_backend,
+        namespace=f"WORKOUT_{workout_type.value}",
+        stats=_cache_stats[workout_type],
+    )
+
 
 def _configure_dynamodb_workout_repository(
     repository: Callable[[Table], WorkoutRepository],
@@ -24,12 +180,7 @@ def _configure_dynamodb_workout_repository(
     """Get a workout repository configured for DynamoDB."""
     table_name = table_name or config.TABLE_NAME
     dynamodb_url = dynamodb_url or config.DYNAMODB_URL
-    _logger.info(f"Connecting to DynamoDB at {dynamodb_url} and table {table_name}")
-    dynamodb: DynamoDBServiceResource = boto3.resource(
-        "dynamodb", endpoint_url=dynamodb_url
-    )  # type: ignore
-    table: Table = dynamodb.Table(table_name)
-    return repository(table)
+    return repository(get_dynamodb_table(table_name, dynamodb_url))
 
 
 def get_workout_plans_repository(
@@ -37,11 +188,21 @@ def get_workout_plans_repository(
     dynamodb_url: str | None = None,
 ) -> WorkoutRepository[WorkoutPlan]:
     """Get a workout plan repository."""
+    if config.REPOSITORY_BACKEND == RepositoryBackend.MEMORY:
+        return _get_memory_repository(WorkoutType.PLAN, WorkoutPlan)
+    if config.REPOSITORY_BACKEND == RepositoryBackend.SQLITE:
+        return _with_cache(
+            _get_sqlite_repository(WorkoutType.PLAN, WorkoutPlan),
+            workout_type=WorkoutType.PLAN,
+        )
     repo = partial(
         DynamoDBWorkoutPlanRepository, workout_type=WorkoutType.PLAN, model=WorkoutPlan
     )
-    return _configure_dynamodb_workout_repository(
-        repository=repo, table_name=table_name, dynamodb_url=dynamodb_url
+    return _with_cache(
+        _configure_dynamodb_workout_repository(
+            repository=repo, table_name=table_name, dynamodb_url=dynamodb_url
+        ),
+        workout_type=WorkoutType.PLAN,
     )
 
 
@@ -50,9 +211,55 @@ def get_workout_logs_repository(
     dynamodb_url: str | None = None,
 ) -> WorkoutRepository[WorkoutLog]:
     """Get a workout log repository."""
+    if config.REPOSITORY_BACKEND == RepositoryBackend.MEMORY:
+        return _get_memory_repository(WorkoutType.LOG, WorkoutLog)
+    if config.REPOSITORY_BACKEND == RepositoryBackend.SQLITE:
+        return _with_cache(
+            _get_sqlite_repository(WorkoutType.LOG, WorkoutLog),
+            workout_type=WorkoutType.LOG,
+        )
     repo = partial(
-        DynamoDBWorkoutLogRepository, workout_type=WorkoutType.LOG, model=WorkoutLog
+        DynamoDBWorkoutLogRepository,
+        workout_type=WorkoutType.LOG,
+        model=WorkoutLog,
+        pack_sets=config.DYNAMODB_PACK_SETS,
+    )
+    return _with_cache(
+        _configure_dynamodb_workout_repository(
+            repository=repo, table_name=table_name, dynamodb_url=dynamodb_url
+        ),
+        workout_type=WorkoutType.LOG,
     )
-    return _configure_dynamodb_workout_repository(
-        repository=repo, table_name=table_name, dynamodb_url=dynamodb_url
+
+
+def get_exercise_stats_repository(
+    table_name: str | None = None,
+    dynamodb_url: str | None = None,
+) -> ExerciseStatsRepository:
+    """Get an exercise stats repository."""
+    if config.REPOSITORY_BACKEND != RepositoryBackend.DYNAMODB:
+        return InMemoryExerciseStatsRepository(get_workout_logs_repository())
+    table_name = table_name or config.TABLE_NAME
+    dynamodb_url = dynamodb_url or config.DYNAMODB_URL
+    return DynamoDBExerciseStatsRepository(get_dynamodb_table(table_name, dynamodb_url))
+
+
+async def get_async_workout_plans_repository() -> AsyncWorkoutRepository[WorkoutPlan]:
+    """Get an async workout plan repository."""
+    return AsyncWorkoutRepositoryAdapter(
+        get_workout_plans_repository(), name="workout_plans"
+    )
+
+
+async def get_async_workout_logs_repository() -> AsyncWorkoutRepository[WorkoutLog]:
+    """Get an async workout log repository."""
+    return AsyncWorkoutRepositoryAdapter(
+        get_workout_logs_repository(), name="workout_logs"
+    )
+
+
+async def get_async_exercise_stats_repository() -> AsyncExerciseStatsRepository:
+    """Get an async exercise stats repository."""
+    return AsyncExerciseStatsRepositoryAdapter(
+        get_exercise_stats_repository(), name="exercise_stats"
     )
@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import logging
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator, TypeVar
+
+from src import metrics
+
+T = TypeVar("T")
+
+_logger = logging.getLogger(__name__)
+
+_READ_OPERATIONS = {"GetItem", "BatchGetItem", "Query", "Scan", "TransactGetItems"}
+_CONTEXT_KEY = "dynamodb_call"
+
+_repository_call_seconds = metrics.histogram(
+    "repository_call_duration_seconds",
+    "Time taken by repository methods, excluding the wait for a worker thread.",
+    ["repository", "method"],
+)
+_dynamodb_call_seconds = metrics.histogram(
+    "dynamodb_call_duration_seconds",
+    "Time taken by DynamoDB calls, retries included, per repository method.",
+    ["repository", "method", "operation"],
+)
+_dynamodb_capacity_units = metrics.counter(
+    "dynamodb_consumed_capacity_units_total",
+    "DynamoDB capacity units consumed per repository method.",
+    ["repository", "method", "operation"],
+)
+
+
+@dataclass(frozen=True)
+class DynamoDBCall:
+    operation: str
+    duration: float
+    items: int
+    read_capacity: float = 0.0
+    write_capacity: float = 0.0
+
+
+@dataclass
+class DynamoDBCalls:
+    """The DynamoDB calls made in one scope, such as the handling of a request.
+
+    Calls may be recorded from worker threads, which only ever append.
+    """
+
+    calls: list[DynamoDBCall] = field(default_factory=list)
+
+    def record(self, call: DynamoDBCall) -> None:
+        self.calls.append(call)
+
+    @property
+    def duration(self) -> float:
+        return sum(call.duration for call in self.calls)
+
+    @property
+    def items(self) -> int:
+        return sum(call.items for call in self.calls)
+
+    @property
+    def read_capacity(self) -> float:
+        return sum(call.read_capacity for call in self.calls)
+
+    @property
+    def write_capacity(self) -> float:
+        return sum(call.write_capacity for call in self.calls)
+
+    @property
+    def operations(self) -> dict[str, int]:
+        return dict(Counter(call.operation for call in self.calls))
+
+
+_current_calls: ContextVar[DynamoDBCalls | None] = ContextVar(
+    "dynamodb_calls", default=None
+)
+_current_method: ContextVar[tuple[str, str]] = ContextVar(
+    "repository_method", default=("", "")
+)
+
+
+@contextmanager
+def collect_dynamodb_calls() -> Iterator[DynamoDBCalls]:
+    """Collect the DynamoDB calls made in this context and the ones it spawns.
+
+    Worker threads started through anyio or Starlette copy the context, so calls
+    made on behalf of a request are collected with it.
+    """
+    calls = DynamoDBCalls()
+    token = _current_calls.set(calls)
+    try:
+        yield calls
+    finally:
+        _current_calls.reset(token)
+
+
+def call_repository_method(
+    repository: str, method: Callable[..., T], **kwargs: Any
+) -> T:
+    """Call a repository method, timing it and labelling its DynamoDB calls."""
+    labels = (repository, method.__name__)
+    token = _current_method.set(labels)
+    start = time.perf_counter()
+    try:
+        return method(**kwargs)
+    finally:
+        _repository_call_seconds.observe(time.perf_counter() - start, *labels)
+        _current_method.reset(token)
+
+
+def _requested_items(operation: str, params: dict[str, Any]) -> int:
+    if operation == "BatchWriteItem":
+        return sum(len(requests) for requests in params["RequestItems"].values())
+    if operation == "TransactWriteItems":
+        return len(params["TransactItems"])
+    return 1
+
+
+def _item_count(operation: str, requested: int, parsed: dict[str, Any]) -> int:
+    """Count the items a call read, or the items it wrote."""
+    if "Count" in parsed:
+        return parsed["Count"]
+    if operation == "GetItem":
+        return int("Item" in parsed)
+    if operation == "BatchGetItem":
+        return sum(len(items) for items in parsed.get("Responses", {}).values())
+    if operation == "TransactGetItems":
+        return sum("Item" in response for response in parsed.get("Responses", []))
+    if operation == "BatchWriteItem":
+        unprocessed = parsed.get("UnprocessedItems", {})
+        return requested - sum(len(requests) for requests in unprocessed.values())
+    return requested
+
+
+def _capacity_units(parsed: dict[str, Any]) -> float:
+    capacity = parsed.get("ConsumedCapacity", [])
+    if isinstance(capacity, dict):
+        capacity = [capacity]
+    return sum(float(table.get("CapacityUnits", 0)) for table in capacity)
+
+
+def _before_call(
+    params: dict[str, Any], model: Any, context: dict[str, Any], **kwargs: Any
+) -> None:
+    if "ReturnConsumedCapacity" in model.input_shape.members:
+        params.setdefault("ReturnConsumedCapacity", "TOTAL")
+    context[_CONTEXT_KEY] = (
+        time.perf_counter(),
+        _requested_items(model.name, params),
+    )
+
+
+def _record(operation: str, context: dict[str, Any], parsed: dict[str, Any]) -> None:
+    if _CONTEXT_KEY not in context:
+        return
+    start, requested = context.pop(_CONTEXT_KEY)
+    capacity = _capacity_units(parsed)
+    read = operation in _READ_OPERATIONS
+    call = DynamoDBCall(
+        operation=operation,
+        duration=time.perf_counter() - start,
+        items=_item_count(operation, requested, parsed) if parsed else 0,
+        read_capacity=capacity if read else 0.0,
+        write_capacity=0.0 if read else capacity,
+    )
+    _logger.debug(
+        f"DynamoDB {operation} took {call.duration * 1000:.1f}ms for {call.items} "
+        f"items, consuming {capacity} capacity units"
+    )
+    labels = (*_current_method.get(), operation)
+    _dynamodb_call_seconds.observe(call.duration, *labels)
+    if capacity:
+        _dynamodb_capacity_units.inc(*labels, amount=capacity)
+    if (calls := _current_calls.get()) is not None:
+        calls.record(call)
+
+
+def _after_call(
+    parsed: dict[str, Any], model: Any, context: dict[str, Any], **kwargs: Any
+) -> None:
+    _record(model.name, context, {} if "Error" in parsed else parsed)
+
+
+def _after_call_error(event_name: str, context: dict[str, Any], **kwargs: Any) -> None:
+    _record(event_name.rpartition(".")[2], context, {})
+
+
+def instrument_dynamodb_client(client: Any) -> None:
+    """Account for every call of a DynamoDB client.
+
+    Calls ask for their consumed capacity, then their latency, retries included,
+    item count and capacity units are recorded with `collect_dynamodb_calls`.
+    """
+    events = client.meta.events
+    for event, handler in (
+        ("before-parameter-build.dynamodb", _before_call),
+        ("after-call.dynamodb", _after_call),
+        ("after-call-error.dynamodb", _after_call_error),
+    ):
+        events.register(event, handler, unique_id=f"{__name__}.{event}")
@@ -0,0 +1,314 @@
+from __future__ import annotations
+
+import logging
+import threading
+from bisect import bisect_left, bisect_right, insort
+from datetime import datetime
+from typing import Any, Iterator, Sequence
+
+from src.exceptions import DuplicateWorkoutError, WorkoutNotFoundError
+from src.model import (
+    BaseWorkoutCreate,
+    BaseWorkoutUpdate,
+    BatchWriteResult,
+    BatchWriteStatus,
+    WorkoutSummary,
+    WorkoutType,
+    now_isoformat,
+)
+
+from .paging import decode_cursor, encode_cursor, get_workout_pk, time_key
+from .workout_protocol import ModelType, Page, WorkoutRepository
+
+# Sorts after every character of an id, to bound the keys of one creation time.
+_KEY_MAX = "~"
+
+
+def _created_key(item: dict[str, Any]) -> str:
+    return f"{time_key(datetime.fromisoformat(item['created_at']))}#{item['id']}"
+
+
+def page_of_keys(
+    index: Sequence[str],
+    pk: str,
+    limit: int | None = None,
+    cursor: str | None = None,
+    newest_first: bool = False,
+    lo: int = 0,
+    hi: int | None = None,
+) -> tuple[list[str], str | None]:
+    """Get up to `limit` keys of a sorted index, between `lo` and `hi`, after `cursor`.
+
+    Cursors hold the last returned key within the `pk` partition, like those of the
+    DynamoDB repositories. The next cursor is only returned if keys are left.
+    """
+    hi = len(index) if hi is None else hi
+    if cursor:
+        start = decode_cursor(cursor, pk=pk)["SK"]
+        if newest_first:
+            hi = min(hi, bisect_left(index, start, lo, hi))
+        else:
+            lo = max(lo, bisect_right(index, start, lo, hi))
+    keys = list(index[lo:hi])
+    if newest_first:
+        keys.reverse()
+    if limit is None or len(keys) <= limit:
+        return keys, None
+    keys = keys[:limit]
+    return keys, encode_cursor({"PK": pk, "SK": keys[-1]})
+
+
+class InMemoryWorkoutRepository(WorkoutRepository[ModelType]):
+    """Workout repository that keeps workouts in process memory.
+
+    Meant for tests and local development, not for production, as nothing outlives
+    the process. Workouts are stored per owner as the items the DynamoDB repository
+    would write, with two sorted indexes: of ids, the order workouts are listed in,
+    and of creation times, for `since`/`until` ranges. Every operation holds one
+    lock, so it is atomic across threads.
+    """
+
+    def __init__(self, workout_type: WorkoutType, model: type[ModelType]):
+        self._workout_type = workout_type
+        self._model = model
+        self._logger = logging.getLogger(__name__)
+        self._lock = threading.RLock()
+        self._items: dict[str, dict[str, dict[str, Any]]] = {}
+        self._ids: dict[str, list[str]] = {}
+        self._created_keys: dict[str, list[str]] = {}
+        self._collection_versions: dict[str, int] = {}
+
+    def _put(self, owner: str, item: dict[str, Any]) -> None:
+        items = self._items.setdefault(owner, {})
+        if item["id"] not in items:
+            insort(self._ids.setdefault(owner, []), item["id"])
+            insort(self._created_keys.setdefault(owner, []), _created_key(item))
+        items[item["id"]] = item
+
+    def _remove(self, owner: str, id: str) -> dict[str, Any]:
+        item = self._items[owner].pop(id)
+        self._ids[owner].remove(id)
+        self._created_keys[owner].remove(_created_key(item))
+        return item
+
+    def _get_item(self, owner: str, id: str) -> dict[str, Any] | None:
+        return self._items.get(owner, {}).get(id)
+
+    def _bump_collection_version(self, owner: str) -> None:
+        self._collection_versions[owner] = self._collection_versions.get(owner, 0) + 1
+
+    def create(self, model: BaseWorkoutCreate, owner: str) -> ModelType:
+        model_db = self._model(**model.dict())
+        self._logger.info(
+            f"Creating {self._workout_type} {model_db.id} for owner {owner!r}"
+        )
+        with self._lock:
+            if self._get_item(owner, model_db.id) is not None:
+                raise DuplicateWorkoutError(
+                    f"{self._workout_type} already exists for owner {owner!r}"
+                )
+            self._put(owner, model_db.dict())
+            self._bump_collection_version(owner)
+        return model_db
+
+    def create_many(
+        self, models: Sequence[BaseWorkoutCreate], owner: str
+    ) -> list[BatchWriteResult]:
+        self._logger.info(
+            f"Creating {len(models)} {self._workout_type}s for owner {owner!r}"
+        )
+        models_db = [self._model(**model.dict()) for model in models]
+        with self._lock:
+            for model_db in models_db:
+                self._put(owner, model_db.dict())
+            if models_db:
+                self._bump_collection_version(owner)
+        return [
+            BatchWriteResult(id=model_db.id, status=BatchWriteStatus.CREATED)
+            for model_db in models_db
+        ]
+
+    def get(self, id: str, owner: str) -> ModelType | None:
+        self._logger.info(f"Getting {self._workout_type} {id} for owner {owner!r}")
+        with self._lock:
+            item = self._get_item(owner, id)
+        return self._model.from_trusted(item) if item else None
+
+    def get_many(self, ids: Sequence[str], owner: str) -> list[ModelType]:
+        """Get workouts in the order of `ids`, leaving out missing ones."""
+        self._logger.info(
+            f"Getting {len(ids)} {self._workout_type}s for owner {owner!r}"
+        )
+        with self._lock:
+            items = [self._get_item(owner, id) for id in dict.fromkeys(ids)]
+        return [self._model.from_trusted(item) for item in items if item]
+
+    def _list_items(
+        self,
+        owner: str,
+        limit: int | None,
+        cursor: str | None,
+        since: datetime | None,
+        until: datetime | None,
+        newest_first: bool,
+    ) -> tuple[list[dict[str, Any]], str | None]:
+        pk = get_workout_pk(owner=owner, workout_type=self._workout_type)
+        with self._lock:
+            if since or until:
+                if self._workout_type != WorkoutType.LOG:
+                    raise ValueError("Time ranges are only supported for workout logs")
+                index = self._created_keys.get(owner, [])
+                lo = bisect_left(index, time_key(since)) if since else 0
+                hi = (
+                    bisect_right(index, f"{time_key(until)}#{_KEY_MAX}")
+                    if until
+                    else len(index)
+                )
+                keys, next_cursor = page_of_keys(
+                    index, pk, limit, cursor, newest_first, lo=lo, hi=hi
+                )
+                ids = [key.rpartition("#")[2] for key in keys]
+            else:
+                ids, next_cursor = page_of_keys(
+                    self._ids.get(owner, []), pk, limit, cursor, newest_first
+                )
+            items = [self._items[owner][id] for id in ids]
+        return items, next_cursor
+
+    def list(
+        self,
+        owner: str,
+        limit: int | None = None,
+        cursor: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        newest_first: bool = False,
+    ) -> Page[ModelType]:
+        """List up to `limit` workouts for an owner, starting after `cursor`.
+
+        Workouts are listed by id, or by creation time within `since` and `until`.
+        """
+        self._logger.info(f"Listing {self._workout_type}s for owner {owner!r}")
+        items, next_cursor = self._list_items(
+            owner=owner,
+            limit=limit,
+            cursor=cursor,
+            since=since,
+            until=until,
+            newest_first=newest_first,
+        )
+        return Page(
+            items=[self._model.from_trusted(item) for item in items],
+            next_cursor=next_cursor,
+        )
+
+    def list_summaries(
+        self,
+        owner: str,
+        fields: Sequence[str],
+        limit: int | None = None,
+        cursor: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        newest_first: bool = False,
+    ) -> Page[WorkoutSummary]:
+        """List workouts like `list`, with only the id and `fields` of each."""
+        self._logger.info(f"Listing {self._workout_type} summaries for owner {owner!r}")
+        items, next_cursor = self._list_items(
+            owner=owner,
+            limit=limit,
+            cursor=cursor,
+            since=since,
+            until=until,
+            newest_first=newest_first,
+        )
+        names = ["id", *fields]
+        return Page(
+            items=[
+                WorkoutSummary.from_trusted(
+                    {name: item[name] for name in names if name in item}
+                )
+                for item in items
+            ],
+            next_cursor=next_cursor,
+        )
+
+    def iter_items(
+        self,
+        owner: str,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        newest_first: bool = False,
+    ) -> Iterator[ModelType]:
+        """Iterate over the workouts an owner had when iteration started.
+
+        Workouts are ordered like `list`.
+        """
+        self._logger.info(f"Iterating {self._workout_type}s for owner {owner!r}")
+        items, _ = self._list_items(
+            owner=owner,
+            limit=None,
+            cursor=None,
+            since=since,
+            until=until,
+            newest_first=newest_first,
+        )
+        return (self._model.from_trusted(item) for item in items)
+
+    def update(
+        self,
+        id: str,
+        update_model: BaseWorkoutUpdate,
+        db_model: ModelType,
+        owner: str,
+    ) -> ModelType:
+        self._logger.info(f"Updating {self._workout_type} {id!r} for owner {owner!r}")
+        update_data = update_model.dict(exclude_unset=True)
+        for field in db_model.dict().keys():
+            if field in update_data:
+                setattr(db_model, field, update_data[field])
+        db_model.version += 1
+        db_model.updated_at = now_isoformat()
+        item = db_model.dict()
+        with self._lock:
+            self._put(owner, item)
+            self._bump_collection_version(owner)
+        return self._model.from_trusted(item)
+
+    def patch(self, id: str, update_model: BaseWorkoutUpdate, owner: str) -> ModelType:
+        """Update the fields set on `update_model`."""
+        self._logger.info(f"Patching {self._workout_type} {id!r} for owner {owner!r}")
+        update_data = update_model.dict(exclude_unset=True, exclude_none=True)
+        with self._lock:
+            if (item := self._get_item(owner, id)) is None:
+                raise WorkoutNotFoundError(f"{self._workout_type} {id!r} not found")
+            if update_data:
+                item = {
+                    **item,
+                    **update_data,
+                    "updated_at": now_isoformat(),
+                    "version": item["version"] + 1,
+                }
+                self._put(owner, item)
+                self._bump_collection_version(owner)
+        return self._model.from_trusted(item)
+
+    def delete(
+        self, id: str, owner: str, return_deleted: bool = False
+    ) -> ModelType | None:
+        """Delete a workout, returning it if `return_deleted` is set."""
+        self._logger.info(f"Deleting {self._workout_type} {id!r} for owner {owner!r}")
+        with self._lock:
+            if self._get_item(owner, id) is None:
+                raise WorkoutNotFoundError(f"{self._workout_type} {id!r} not found")
+            item = self._remove(owner, id)
+            self._bump_collection_version(owner)
+        return self._model.from_trusted(item) if return_deleted else None
+
+    def get_collection_version(self, owner: str) -> int:
+        """Get a counter that changes whenever any workout of the owner changes."""
+        with self._lock:
+            return self._collection_versions.get(owner, 0)
+
+    def health_check(self) -> None:
+        self._logger.info(f"Health checking {self._workout_type}")
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import logging
+from datetime import datetime
+
+from src.model import ExerciseHistoryEntry, ExerciseRecord, ExerciseStats, WorkoutLog
+from src.stats import (
+    aggregate_exercise_stats,
+    best_exercise_records,
+    exercise_history_entries,
+    normalise_exercise_name,
+    record_key,
+)
+
+from .memory import page_of_keys
+from .stats_protocol import ExerciseStatsRepository
+from .workout_protocol import Page, WorkoutRepository
+
+
+def _get_history_key(entry: ExerciseHistoryEntry) -> str:
+    return f"{entry.performed_at}#{entry.workout_log_id}"
+
+
+class InMemoryExerciseStatsRepository(ExerciseStatsRepository):
+    """Exercise stats, records and history computed from every workout log.
+
+    Serves the in-memory and SQLite backends, whose histories are local and small
+    enough to aggregate on every read, so nothing is kept up to date on writes.
+    """
+
+    def __init__(self, logs_repository: WorkoutRepository[WorkoutLog]):
+        self._logs_repository = logs_repository
+        self._logger = logging.getLogger(__name__)
+
+    def list_exercise_stats(self, owner: str) -> list[ExerciseStats]:
+        self._logger.info(f"Listing exercise stats for owner {owner!r}")
+        return aggregate_exercise_stats(self._logs_repository.iter_items(owner=owner))
+
+    def list_exercise_records(
+        self, owner: str, exercise: str | None = None
+    ) -> list[ExerciseRecord]:
+        self._logger.info(f"Listing exercise records for owner {owner!r}")
+        records = best_exercise_records(self._logs_repository.iter_items(owner=owner))
+        if exercise is None:
+            return records
+        name = normalise_exercise_name(exercise)
+        return [record for record in records if record_key(record)[0] == name]
+
+    def list_exercise_history(
+        self,
+        owner: str,
+        exercise: str,
+        limit: int | None = None,
+        cursor: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        newest_first: bool = False,
+    ) -> Page[ExerciseHistoryEntry]:
+        self._logger.info(f"Listing history of {exercise!r} for owner {owner!r}")
+        name = normalise_exercise_name(exercise)
+        entries = {
+            _get_history_key(entry): entry
+            for workout_log in self._logs_repository.iter_items(
+                owner=owner, since=since, until=until
+            )
+            if (entry := exercise_history_entries(workout_log).get(name))
+        }
+        keys, next_cursor = page_of_keys(
+            sorted(entries),
+            pk=f"OWNER#{owner}#EXERCISE#{name}",
+            limit=limit,
+            cursor=cursor,
+            newest_first=newest_first,
+        )
+        return Page(items=[entries[key] for key in keys], next_cursor=next_cursor)
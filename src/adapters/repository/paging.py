@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from datetime import datetime, timezone
+from typing import Any, Callable
+
+from src.exceptions import InvalidCursorError
+from src.model import WorkoutType
+
+
+def get_workout_pk(owner: str, workout_type: WorkoutType) -> str:
+    """Get the partition key of an owner's workouts, which cursors are bound to."""
+    return f"OWNER#{owner}#WORKOUT_{workout_type}"
+
+
+def time_key(at: datetime) -> str:
+    """Get a time as a fixed width UTC string, which sorts by time."""
+    if at.tzinfo is None:
+        at = at.replace(tzinfo=timezone.utc)
+    return at.astimezone(timezone.utc).isoformat(timespec="microseconds")
+
+
+def encode_cursor(last_evaluated_key: dict[str, Any]) -> str:
+    return base64.urlsafe_b64encode(json.dumps(last_evaluated_key).encode()).decode()
+
+
+def decode_cursor(cursor: str, pk: str) -> dict[str, Any]:
+    """Decode a cursor into an exclusive start key within the `pk` partition."""
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursorError(f"Invalid cursor {cursor!r}")
+    if (
+        not isinstance(key, dict)
+        or key.keys() != {"PK", "SK"}
+        or key["PK"] != pk
+        or not isinstance(key["SK"], str)
+    ):
+        raise InvalidCursorError(f"Invalid cursor {cursor!r}")
+    return key
+
+
+def query_page(
+    query: Callable[..., dict[str, Any]], limit: int | None, **kwargs: Any
+) -> tuple[list[dict[str, Any]], str | None]:
+    """Query up to `limit` items, or every item, and the cursor of the next page.
+
+    DynamoDB pages are followed until the limit is reached, so a page is never
+    truncated at DynamoDB's 1 MB query page size.
+    """
+    items: list[dict[str, Any]] = []
+    while True:
+        if limit is not None:
+            kwargs["Limit"] = limit - len(items)
+        response = query(**kwargs)
+        items.extend(response["Items"])
+        last_evaluated_key = response.get("LastEvaluatedKey")
+        if not last_evaluated_key or (limit is not None and len(items) >= limit):
+            break
+        kwargs["ExclusiveStartKey"] = last_evaluated_key
+
+    next_cursor = encode_cursor(last_evaluated_key) if last_evaluated_key else None
+    return items, next_cursor
@@ -0,0 +1,75 @@
+"""Packed binary encoding of the sets of an exercise log.
+
+Stored as a DynamoDB Binary attribute in place of a list of `{weight, reps}` maps,
+so attribute names are not repeated for every set. The layout is
+
+    version (uint8) | flags (uint8) | body
+
+where the body, zlib-compressed if the `COMPRESSED` flag is set, is
+
+    count (uint32) | weight exponent (int8) | weights (int32 * count) | reps (int32 * count)
+
+Weights are stored as integers scaled by 10 ** -exponent, so Decimals round trip
+exactly. All integers are little-endian.
+"""
+from __future__ import annotations
+
+import struct
+import zlib
+from decimal import Decimal
+from typing import Any
+
+from src.exceptions import WorkoutError
+
+VERSION = 1
+COMPRESSED = 0b0000_0001
+
+_PREFIX = struct.Struct("<BB")
+_HEADER = struct.Struct("<Ib")
+_INT32_MIN = -(2**31)
+_INT32_MAX = 2**31 - 1
+_MIN_EXPONENT = -9
+
+
+def pack_sets(sets: list[dict[str, Any]]) -> bytes | None:
+    """Pack the sets of an exercise, or return None if they cannot be packed.
+
+    Sets cannot be packed if a weight has more than nine decimal places or a
+    weight or rep count does not fit 32 bits; such sets are stored as maps.
+    """
+    weights = [Decimal(set_["weight"]) for set_ in sets]
+    reps = [int(set_["reps"]) for set_ in sets]
+    exponent = min((int(weight.as_tuple().exponent) for weight in weights), default=0)
+    exponent = min(exponent, 0)
+    if exponent < _MIN_EXPONENT:
+        return None
+    scaled = [int(weight.scaleb(-exponent)) for weight in weights]
+    if any(not _INT32_MIN <= value <= _INT32_MAX for value in (*scaled, *reps)):
+        return None
+
+    count = len(sets)
+    body = _HEADER.pack(count, exponent) + struct.pack(
+        f"<{count}i{count}i", *scaled, *reps
+    )
+    flags = 0
+    compressed = zlib.compress(body)
+    if len(compressed) < len(body):
+        body, flags = compressed, flags | COMPRESSED
+    return _PREFIX.pack(VERSION, flags) + body
+
+
+def unpack_sets(data: bytes) -> list[dict[str, Any]]:
+    """Unpack sets packed by `pack_sets` into `{weight, reps}` dicts."""
+    version, flags = _PREFIX.unpack_from(data)
+    if version != VERSION:
+        raise WorkoutError(f"Unsupported packed sets version {version}")
+    offset = _PREFIX.size
+    body = data[offset:]
+    if flags & COMPRESSED:
+        body = zlib.decompress(body)
+    count, exponent = _HEADER.unpack_from(body)
+    values = struct.unpack_from(f"<{count}i{count}i", body, _HEADER.size)
+    return [
+        {"weight": Decimal(weight).scaleb(exponent), "reps": reps}
+        for weight, reps in zip(values[:count], values[count:])
+    ]
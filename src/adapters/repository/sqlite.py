@@ -0,0 +1,498 @@
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+import threading
+import weakref
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Iterator, Sequence
+
+from src.exceptions import DuplicateWorkoutError, WorkoutError, WorkoutNotFoundError
+from src.model import (
+    BaseWorkoutCreate,
+    BaseWorkoutDB,
+    BaseWorkoutUpdate,
+    BatchWriteResult,
+    BatchWriteStatus,
+    WorkoutSummary,
+    WorkoutType,
+    now_isoformat,
+)
+
+from .paging import decode_cursor, encode_cursor, get_workout_pk, time_key
+from .workout_protocol import ModelType, Page, WorkoutRepository
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS workouts (
+    owner TEXT NOT NULL,
+    type TEXT NOT NULL,
+    id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    created_key TEXT NOT NULL,
+    updated_at TEXT,
+    version INTEGER NOT NULL,
+    payload TEXT NOT NULL CHECK (json_valid(payload)),
+    PRIMARY KEY (owner, type, id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS workouts_by_created_at
+    ON workouts (owner, type, created_key, id);
+CREATE TABLE IF NOT EXISTS collection_versions (
+    owner TEXT NOT NULL,
+    type TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    PRIMARY KEY (owner, type)
+) WITHOUT ROWID;
+"""
+
+_COLUMNS = "id, name, created_at, updated_at, version, payload"
+_INSERT = (
+    "INSERT INTO workouts "
+    "(owner, type, id, name, created_at, created_key, updated_at, version, payload) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+_UPSERT = (
+    _INSERT + " ON CONFLICT (owner, type, id) DO UPDATE SET name = excluded.name, "
+    "updated_at = excluded.updated_at, version = excluded.version, "
+    "payload = excluded.payload"
+)
+_SELECT = f"SELECT {_COLUMNS} FROM workouts WHERE owner = ? AND type = ? AND id = ?"
+_SELECT_MANY = (
+    f"SELECT {_COLUMNS} FROM workouts WHERE owner = ? AND type = ? "
+    "AND id IN (SELECT value FROM json_each(?))"
+)
+_DELETE = "DELETE FROM workouts WHERE owner = ? AND type = ? AND id = ?"
+_BUMP_COLLECTION_VERSION = (
+    "INSERT INTO collection_versions (owner, type, version) VALUES (?, ?, 1) "
+    "ON CONFLICT (owner, type) DO UPDATE SET version = version + 1"
+)
+_SELECT_COLLECTION_VERSION = (
+    "SELECT version FROM collection_versions WHERE owner = ? AND type = ?"
+)
+
+# Fields stored as columns; every other field of a workout goes into the payload.
+_COLUMN_FIELDS = frozenset(BaseWorkoutDB.__fields__)
+
+
+def _dumps(value: Any) -> str:
+    # Decimals are stored as strings, so they are read back exactly.
+    return json.dumps(value, default=str, separators=(",", ":"))
+
+
+def _from_row(row: tuple[Any, ...]) -> dict[str, Any]:
+    id, name, created_at, updated_at, version, payload = row
+    return {
+        "id": id,
+        "name": name,
+        "created_at": created_at,
+        "updated_at": updated_at,
+        "version": version,
+        **json.loads(payload),
+    }
+
+
+class _ConnectionOwner:
+    """Lives as long as the thread-local it is stored on, i.e. its thread."""
+
+
+class SQLiteWorkoutRepository(WorkoutRepository[ModelType]):
+    """Workout repository backed by a SQLite database, for self-hosted deployments.
+
+    Every thread gets its own connection to the database, which is opened in WAL
+    mode so reads do not block on writes, and closed when the thread ends. Statements are constant SQL with
+    parameters, so each connection prepares them once and reuses them from its
+    statement cache. Exercises, plans and logs are stored as one JSON payload per
+    workout; other fields are columns, so summaries are read without the payload.
+    Workouts are listed by id, or by creation time through an index on owner,
+    type and creation time. Writes and collection version bumps share a
+    transaction.
+    """
+
+    def __init__(self, path: str, workout_type: WorkoutType, model: type[ModelType]):
+        self._path = path
+        self._workout_type = workout_type
+        self._model = model
+        self._payload_fields = [
+            name for name in model.__fields__ if name not in _COLUMN_FIELDS
+        ]
+        self._logger = logging.getLogger(__name__)
+        self._local = threading.local()
+        self._connections: dict[int, sqlite3.Connection] = {}
+        self._lock = threading.Lock()
+        with self._errors("creating schema for"):
+            self._connection().executescript(_SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        """Get the connection of the current thread, opening it on first use."""
+        connection: sqlite3.Connection | None = getattr(self._local, "connection", None)
+        if connection is None:
+            # Only this thread uses the connection, but `close` may run on another.
+            connection = sqlite3.connect(
+                self._path,
+                isolation_level=None,
+                timeout=5.0,
+                cached_statements=64,
+                check_same_thread=False,
+            )
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute("PRAGMA synchronous = NORMAL")
+            owner = _ConnectionOwner()
+            with self._lock:
+                self._connections[id(owner)] = connection
+            weakref.finalize(owner, self._close_connection, id(owner))
+            self._local.owner = owner
+            self._local.connection = connection
+        return connection
+
+    def _close_connection(self, key: int) -> None:
+        with self._lock:
+            connection = self._connections.pop(key, None)
+        if connection is not None:
+            connection.close()
+
+    def close(self) -> None:
+        """Close the connections of every thread."""
+        with self._lock:
+            connections = list(self._connections.values())
+            self._connections.clear()
+        for connection in connections:
+            connection.close()
+        self._local = threading.local()
+
+    @contextmanager
+    def _errors(self, action: str) -> Iterator[None]:
+        try:
+            yield
+        except sqlite3.Error:
+            self._logger.error(f"Error {action} {self._workout_type}", exc_info=True)
+            raise WorkoutError(f"Error {action} {self._workout_type}")
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield connection
+            connection.execute("COMMIT")
+        except BaseException:
+            # A failed COMMIT, e.g. when the database is busy, leaves the
+            # transaction open, unless SQLite already rolled it back.
+            if connection.in_transaction:
+                connection.execute("ROLLBACK")
+            raise
+
+    def _row(self, owner: str, model: BaseWorkoutDB) -> tuple[Any, ...]:
+        payload = model.dict(include=set(self._payload_fields))
+        return (
+            owner,
+            self._workout_type.value,
+            model.id,
+            model.name,
+            model.created_at,
+            time_key(datetime.fromisoformat(model.created_at)),
+            model.updated_at,
+            model.version,
+            _dumps(payload),
+        )
+
+    def _bump_collection_version(
+        self, connection: sqlite3.Connection, owner: str
+    ) -> None:
+        connection.execute(_BUMP_COLLECTION_VERSION, (owner, self._workout_type.value))
+
+    def create(self, model: BaseWorkoutCreate, owner: str) -> ModelType:
+        model_db = self._model(**model.dict())
+        self._logger.info(
+            f"Creating {self._workout_type} {model_db.id} for owner {owner!r}"
+        )
+        with self._errors("creating"):
+            try:
+                with self._transaction() as connection:
+                    connection.execute(_INSERT, self._row(owner, model_db))
+                    self._bump_collection_version(connection, owner)
+            except sqlite3.IntegrityError:
+                raise DuplicateWorkoutError(
+                    f"{self._workout_type} already exists for owner {owner!r}"
+                )
+        return model_db
+
+    def create_many(
+        self, models: Sequence[BaseWorkoutCreate], owner: str
+    ) -> list[BatchWriteResult]:
+        """Create workouts in one transaction, so either all or none are created."""
+        self._logger.info(
+            f"Creating {len(models)} {self._workout_type}s for owner {owner!r}"
+        )
+        models_db = [self._model(**model.dict()) for model in models]
+        status = BatchWriteStatus.CREATED
+        try:
+            with self._transaction() as connection:
+                connection.executemany(
+                    _INSERT, [self._row(owner, model_db) for model_db in models_db]
+                )
+                if models_db:
+                    self._bump_collection_version(connection, owner)
+        except sqlite3.Error:
+            self._logger.error(f"Error creating {self._workout_type}s", exc_info=True)
+            status = BatchWriteStatus.FAILED
+        return [
+            BatchWriteResult(id=model_db.id, status=status) for model_db in models_db
+        ]
+
+    def get(self, id: str, owner: str) -> ModelType | None:
+        self._logger.info(f"Getting {self._workout_type} {id} for owner {owner!r}")
+        with self._errors("getting"):
+            row = (
+                self._connection()
+                .execute(_SELECT, (owner, self._workout_type.value, id))
+                .fetchone()
+            )
+        return self._model.from_trusted(_from_row(row)) if row else None
+
+    def get_many(self, ids: Sequence[str], owner: str) -> list[ModelType]:
+        """Get workouts with one statement, whatever their number.
+
+        The ids are passed as one JSON array and expanded with `json_each`.
+        Workouts are returned in the order of `ids`; missing ones are left out.
+        """
+        self._logger.info(
+            f"Getting {len(ids)} {self._workout_type}s for owner {owner!r}"
+        )
+        unique_ids = list(dict.fromkeys(ids))
+        with self._errors("getting"):
+            rows = (
+                self._connection()
+                .execute(
+                    _SELECT_MANY, (owner, self._workout_type.value, _dumps(unique_ids))
+                )
+                .fetchall()
+            )
+        items = {item["id"]: item for item in map(_from_row, rows)}
+        return [self._model.from_trusted(items[id]) for id in unique_ids if id in items]
+
+    def _select_page(
+        self,
+        owner: str,
+        columns: str,
+        limit: int | None,
+        cursor: str | None,
+        since: datetime | None,
+        until: datetime | None,
+        newest_first: bool,
+    ) -> tuple[list[tuple[Any, ...]], str | None]:
+        """Select up to `limit` rows after `cursor` and the cursor of the next page.
+
+        Rows are keyed by id, or by creation time and id within `since` and
+        `until`. The key of each row is selected as its last column.
+        """
+        pk = get_workout_pk(owner=owner, workout_type=self._workout_type)
+        ranged = bool(since or until)
+        if ranged and self._workout_type != WorkoutType.LOG:
+            raise ValueError("Time ranges are only supported for workout logs")
+        key = "created_key || '#' || id" if ranged else "id"
+        after = "<" if newest_first else ">"
+        sql = f"SELECT {columns}, {key} FROM workouts WHERE owner = ? AND type = ?"
+        params: list[Any] = [owner, self._workout_type.value]
+        if since:
+            sql += " AND created_key >= ?"
+            params.append(time_key(since))
+        if until:
+            sql += " AND created_key <= ?"
+            params.append(time_key(until))
+        if cursor:
+            start = decode_cursor(cursor, pk=pk)["SK"]
+            if ranged:
+                created_key, _, id = start.rpartition("#")
+                sql += f" AND (created_key, id) {after} (?, ?)"
+                params.extend([created_key, id])
+            else:
+                sql += f" AND id {after} ?"
+                params.append(start)
+        order = "DESC" if newest_first else "ASC"
+        sql += (
+            f" ORDER BY created_key {order}, id {order}"
+            if ranged
+            else f" ORDER BY id {order}"
+        )
+        if limit is not None:
+            # One more row than asked tells whether there is a next page.
+            sql += " LIMIT ?"
+            params.append(limit + 1)
+
+        with self._errors("listing"):
+            rows = self._connection().execute(sql, params).fetchall()
+        if limit is None or len(rows) <= limit:
+            return rows, None
+        rows = rows[:limit]
+        return rows, encode_cursor({"PK": pk, "SK": rows[-1][-1]})
+
+    def list(
+        self,
+        owner: str,
+        limit: int | None = None,
+        cursor: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        newest_first: bool = False,
+    ) -> Page[ModelType]:
+        """List up to `limit` workouts for an owner, starting after `cursor`.
+
+        Workouts are listed by id, or by creation time within `since` and `until`.
+        """
+        self._logger.info(f"Listing {self._workout_type}s for owner {owner!r}")
+        rows, next_cursor = self._select_page(
+            owner, _COLUMNS, limit, cursor, since, until, newest_first
+        )
+        return Page(
+            items=[self._model.from_trusted(_from_row(row[:-1])) for row in rows],
+            next_cursor=next_cursor,
+        )
+
+    def list_summaries(
+        self,
+        owner: str,
+        fields: Sequence[str],
+        limit: int | None = None,
+        cursor: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        newest_first: bool = False,
+    ) -> Page[WorkoutSummary]:
+        """List workouts like `list`, selecting only the id and `fields` of each.
+
+        Summary fields are all columns, so payloads are neither read nor parsed.
+        """
+        self._logger.info(f"Listing {self._workout_type} summaries for owner {owner!r}")
+        names = list(dict.fromkeys(["id", *fields]))
+        if unknown := set(names) - _COLUMN_FIELDS:
+            raise ValueError(f"Unknown summary fields {sorted(unknown)!r}")
+        rows, next_cursor = self._select_page(
+            owner, ", ".join(names), limit, cursor, since, until, newest_first
+        )
+        return Page(
+            items=[WorkoutSummary.from_trusted(dict(zip(names, row))) for row in rows],
+            next_cursor=next_cursor,
+        )
+
+    def iter_items(
+        self,
+        owner: str,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        newest_first: bool = False,
+    ) -> Iterator[ModelType]:
+        """Lazily iterate over the workouts of an owner, a page at a time.
+
+        Workouts are ordered like `list`. Each page is a query of its own, so
+        iteration can move between threads.
+        """
+        self._logger.info(f"Iterating {self._workout_type}s for owner {owner!r}")
+        cursor = None
+        while True:
+            page = self.list(
+                owner=owner,
+                limit=500,
+                cursor=cursor,
+                since=since,
+                until=until,
+                newest_first=newest_first,
+            )
+            yield from page.items
+            if not (cursor := page.next_cursor):
+                return
+
+    def update(
+        self,
+        id: str,
+        update_model: BaseWorkoutUpdate,
+        db_model: ModelType,
+        owner: str,
+    ) -> ModelType:
+        self._logger.info(f"Updating {self._workout_type} {id!r} for owner {owner!r}")
+        update_data = update_model.dict(exclude_unset=True)
+        for field in db_model.dict().keys():
+            if field in update_data:
+                setattr(db_model, field, update_data[field])
+        db_model.version += 1
+        db_model.updated_at = now_isoformat()
+
+        with self._errors("updating"), self._transaction() as connection:
+            connection.execute(_UPSERT, self._row(owner, db_model))
+            self._bump_collection_version(connection, owner)
+        return self._model.from_trusted(db_model.dict())
+
+    def patch(self, id: str, update_model: BaseWorkoutUpdate, owner: str) -> ModelType:
+        """Update the fields set on `update_model` in one transaction.
+
+        Payload fields are replaced in place with `json_set`.
+        """
+        self._logger.info(f"Patching {self._workout_type} {id!r} for owner {owner!r}")
+        update_data = update_model.dict(exclude_unset=True, exclude_none=True)
+        columns = {
+            name: value for name, value in update_data.items() if name in _COLUMN_FIELDS
+        }
+        payload = {
+            name: value
+            for name, value in update_data.items()
+            if name not in _COLUMN_FIELDS
+        }
+        assignments = [f"{name} = ?" for name in columns]
+        params: list[Any] = list(columns.values())
+        if payload:
+            assignments.append(
+                "payload = json_set(payload, "
+                + ", ".join("?, json(?)" for _ in payload)
+                + ")"
+            )
+            for name, value in payload.items():
+                params.extend([f"$.{name}", _dumps(value)])
+        key = (owner, self._workout_type.value, id)
+
+        with self._errors("patching"), self._transaction() as connection:
+            if update_data:
+                updated = connection.execute(
+                    "UPDATE workouts SET "
+                    + ", ".join(
+                        [*assignments, "updated_at = ?", "version = version + 1"]
+                    )
+                    + " WHERE owner = ? AND type = ? AND id = ?",
+                    [*params, now_isoformat(), *key],
+                )
+                if updated.rowcount:
+                    self._bump_collection_version(connection, owner)
+            row = connection.execute(_SELECT, key).fetchone()
+        if row is None:
+            raise WorkoutNotFoundError(f"{self._workout_type} {id!r} not found")
+        return self._model.from_trusted(_from_row(row))
+
+    def delete(
+        self, id: str, owner: str, return_deleted: bool = False
+    ) -> ModelType | None:
+        """Delete a workout, returning it if `return_deleted` is set."""
+        self._logger.info(f"Deleting {self._workout_type} {id!r} for owner {owner!r}")
+        key = (owner, self._workout_type.value, id)
+        with self._errors("deleting"), self._transaction() as connection:
+            row = connection.execute(_SELECT, key).fetchone()
+            if row is not None:
+                connection.execute(_DELETE, key)
+                self._bump_collection_version(connection, owner)
+        if row is None:
+            raise WorkoutNotFoundError(f"{self._workout_type} {id!r} not found")
+        return self._model.from_trusted(_from_row(row)) if return_deleted else None
+
+    def get_collection_version(self, owner: str) -> int:
+        """Get a counter that changes whenever any workout of the owner changes."""
+        with self._errors("getting collection version of"):
+            row = (
+                self._connection()
+                .execute(_SELECT_COLLECTION_VERSION, (owner, self._workout_type.value))
+                .fetchone()
+            )
+        return row[0] if row else 0
+
+    def health_check(self) -> None:
+        self._logger.info(f"Health checking {self._workout_type}")
+        with self._errors("health checking"):
+            self._connection().execute("SELECT 1").fetchone()
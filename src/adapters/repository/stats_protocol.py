@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Protocol
+
+from src.model import ExerciseHistoryEntry, ExerciseRecord, ExerciseStats
+
+from .workout_protocol import Page
+
+
+class ExerciseStatsRepository(Protocol):
+    def list_exercise_stats(self, owner: str) -> list[ExerciseStats]:
+        ...
+
+    def list_exercise_records(
+        self, owner: str, exercise: str | None = None
+    ) -> list[ExerciseRecord]:
+        ...
+
+    def list_exercise_history(
+        self,
+        owner: str,
+        exercise: str,
+        limit: int | None = None,
+        cursor: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        newest_first: bool = False,
+    ) -> Page[ExerciseHistoryEntry]:
+        ...
+
+
+class AsyncExerciseStatsRepository(Protocol):
+    async def list_exercise_stats(self, owner: str) -> list[ExerciseStats]:
+        ...
+
+    async def list_exercise_records(
+        self, owner: str, exercise: str | None = None
+    ) -> list[ExerciseRecord]:
+        ...
+
+    async def list_exercise_history(
+        self,
+        owner: str,
+        exercise: str,
+        limit: int | None = None,
+        cursor: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        newest_first: bool = False,
+    ) -> Page[ExerciseHistoryEntry]:
+        ...
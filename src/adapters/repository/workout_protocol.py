@@ -1,29 +1,165 @@
 from __future__ import annotations
 
-from typing import Protocol, TypeVar
+from dataclasses import dataclass
+from datetime import datetime
+from typing import AsyncIterator, Generic, Iterator, Protocol, Sequence, TypeVar
 
-from src.model import BaseWorkoutCreate, BaseWorkoutDB, BaseWorkoutUpdate
+from src.model import (
+    BaseWorkoutCreate,
+    BaseWorkoutDB,
+    BaseWorkoutUpdate,
+    BatchWriteResult,
+    WorkoutSummary,
+)
 
 ModelType = TypeVar("ModelType", bound=BaseWorkoutDB)
+ItemType = TypeVar("ItemType")
+
+
+@dataclass(frozen=True)
+class Page(Generic[ItemType]):
+    """A page of workouts and the opaque cursor of the next page, if any."""
+
+    items: list[ItemType]
+    next_cursor: str | None = None
 
 
 class WorkoutRepository(Protocol[ModelType]):
     def create(self, model: BaseWorkoutCreate, owner: str) -> ModelType:
         ...
 
+    def create_many(
+        self, models: Sequence[BaseWorkoutCreate], owner: str
+    ) -> list[BatchWriteResult]:
+        ...
+
     def get(self, id: str, owner: str) -> ModelType | None:
         ...
 
-    def list(self, owner: str) -> list[ModelType]:
+    def get_many(self, ids: Sequence[str], owner: str) -> list[ModelType]:
+        ...
+
+    def list(
+        self,
+        owner: str,
+        limit: int | None = None,
+        cursor: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        newest_first: bool = False,
+    ) -> Page[ModelType]:
+        ...
+
+    def list_summaries(
+        self,
+        owner: str,
+        fields: Sequence[str],
+        limit: int | None = None,
+        cursor: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        newest_first: bool = False,
+    ) -> Page[WorkoutSummary]:
+        ...
+
+    def iter_items(
+        self,
+        owner: str,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        newest_first: bool = False,
+    ) -> Iterator[ModelType]:
         ...
 
     def update(
         self, id: str, update_model: BaseWorkoutUpdate, db_model: ModelType, owner: str
     ) -> ModelType:
+        """Write `db_model` with the fields of `update_model` applied to it in place.
+
+        `db_model` is changed even if the write fails, so callers sharing it must
+        pass a copy.
+        """
+        ...
+
+    def patch(self, id: str, update_model: BaseWorkoutUpdate, owner: str) -> ModelType:
         ...
 
-    def delete(self, id: str, owner: str) -> None:
+    def delete(
+        self, id: str, owner: str, return_deleted: bool = False
+    ) -> ModelType | None:
+        ...
+
+    def get_collection_version(self, owner: str) -> int:
         ...
 
     def health_check(self) -> None:
         ...
+
+
+class AsyncWorkoutRepository(Protocol[ModelType]):
+    async def create(self, model: BaseWorkoutCreate, owner: str) -> ModelType:
+        ...
+
+    async def create_many(
+        self, models: Sequence[BaseWorkoutCreate], owner: str
+    ) -> list[BatchWriteResult]:
+        ...
+
+    async def get(self, id: str, owner: str) -> ModelType | None:
+        ...
+
+    async def get_many(self, ids: Sequence[str], owner: str) -> list[ModelType]:
+        ...
+
+    async def list(
+        self,
+        owner: str,
+        limit: int | None = None,
+        cursor: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        newest_first: bool = False,
+    ) -> Page[ModelType]:
+        ...
+
+    async def list_summaries(
+        self,
+        owner: str,
+        fields: Sequence[str],
+        limit: int | None = None,
+        cursor: str | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        newest_first: bool = False,
+    ) -> Page[WorkoutSummary]:
+        ...
+
+    def iter_items(
+        self,
+        owner: str,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        newest_first: bool = False,
+    ) -> AsyncIterator[ModelType]:
+        ...
+
+    async def update(
+        self, id: str, update_model: BaseWorkoutUpdate, db_model: ModelType, owner: str
+    ) -> ModelType:
+        ...
+
+    async def patch(
+        self, id: str, update_model: BaseWorkoutUpdate, owner: str
+    ) -> ModelType:
+        ...
+
+    async def delete(
+        self, id: str, owner: str, return_deleted: bool = False
+    ) -> ModelType | None:
+        ...
+
+    async def get_collection_version(self, owner: str) -> int:
+        ...
+
+    async def health_check(self) -> None:
+        ...
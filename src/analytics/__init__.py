@@ -0,0 +1,11 @@
+"""Progress analytics computed over a user's workout log history with NumPy."""
+__all__ = [
+    "ExerciseSets",
+    "estimated_one_rep_maxes",
+    "exercise_progress",
+    "load_exercise_sets",
+    "load_history_sets",
+    "moving_average",
+]
+from .progress import estimated_one_rep_maxes, exercise_progress, moving_average
+from .sets import ExerciseSets, load_exercise_sets, load_history_sets
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import numpy as np
+import numpy.typing as npt
+
+from src.model import ProgressBucket, ProgressPoint
+
+from .sets import ExerciseSets
+
+# 1970-01-01 was a Thursday, so day numbers are shifted by 3 to start weeks on Monday.
+_MONDAY_OFFSET = 3
+
+
+def _bucket_starts(
+    timestamps: npt.NDArray[np.datetime64], bucket: ProgressBucket
+) -> npt.NDArray[np.datetime64]:
+    days = timestamps.astype("datetime64[D]")
+    if bucket == ProgressBucket.DAY:
+        return days
+    if bucket == ProgressBucket.WEEK:
+        day_numbers = days.astype(np.int64)
+        return (day_numbers - (day_numbers + _MONDAY_OFFSET) % 7).astype(
+            "datetime64[D]"
+        )
+    return days.astype("datetime64[M]").astype("datetime64[D]")
+
+
+def estimated_one_rep_maxes(
+    weights: npt.NDArray[np.float64], reps: npt.NDArray[np.int64]
+) -> npt.NDArray[np.float64]:
+    """Estimate the one rep max of every set with the Epley formula."""
+    return np.where(reps <= 1, weights, weights * (30 + reps) / 30)
+
+
+def _grouped_max(
+    values: npt.NDArray[np.float64], starts: npt.NDArray[np.intp]
+) -> npt.NDArray[np.float64]:
+    return np.maximum.reduceat(values, starts) if len(values) else values
+
+
+def moving_average(
+    values: npt.NDArray[np.float64], window: int
+) -> npt.NDArray[np.float64]:
+    """Average every value with up to `window - 1` values before it."""
+    sums = np.cumsum(values)
+    sums[window:] = sums[window:] - sums[:-window]
+    return sums / np.minimum(np.arange(1, len(values) + 1), window)
+
+
+def exercise_progress(
+    sets: ExerciseSets, bucket: ProgressBucket, window: int = 4
+) -> list[ProgressPoint]:
+    """Compute the progress of an exercise per time bucket.
+
+    Every bucket with sets has its volume, its moving average over `window`
+    buckets, its best weight and best estimated one rep max. A bucket is a
+    record if its estimated one rep max beats every bucket before it. Sets with
+    no reps count towards totals but not towards bests.
+    """
+    if not len(sets):
+        return []
+    starts = _bucket_starts(sets.timestamps, bucket)
+    # Sets are ordered by time, so each bucket is one contiguous run.
+    first_of_bucket = np.flatnonzero(np.r_[True, starts[1:] != starts[:-1]])
+    bucket_of_set = np.cumsum(np.r_[False, starts[1:] != starts[:-1]])
+
+    set_counts = np.bincount(bucket_of_set)
+    rep_counts = np.bincount(bucket_of_set, weights=sets.reps).astype(np.int64)
+    volumes = np.bincount(bucket_of_set, weights=sets.weights * sets.reps).astype(
+        np.float64, copy=False
+    )
+    performed = sets.reps > 0
+    best_weights = _grouped_max(
+        np.where(performed, sets.weights, -np.inf), first_of_bucket
+    )
+    one_rep_maxes = _grouped_max(
+        np.where(performed, estimated_one_rep_maxes(sets.weights, sets.reps), -np.inf),
+        first_of_bucket,
+    )
+    previous_best = np.r_[-np.inf, np.maximum.accumulate(one_rep_maxes)[:-1]]
+    is_record = (one_rep_maxes > previous_best) & np.isfinite(one_rep_maxes)
+    volume_averages = moving_average(volumes, window)
+
+    return [
+        ProgressPoint(
+            period_start=period_start,
+            set_count=set_count,
+            rep_count=rep_count,
+            volume=round(volume, 2),
+            volume_moving_average=round(volume_average, 2),
+            best_weight=best_weight if np.isfinite(best_weight) else None,
+            estimated_one_rep_max=(
+                round(one_rep_max, 2) if np.isfinite(one_rep_max) else None
+            ),
+            is_record=record,
+        )
+        for (
+            period_start,
+            set_count,
+            rep_count,
+            volume,
+            volume_average,
+            best_weight,
+            one_rep_max,
+            record,
+        ) in zip(
+            starts[first_of_bucket].tolist(),
+            set_counts.tolist(),
+            rep_counts.tolist(),
+            volumes.tolist(),
+            volume_averages.tolist(),
+            best_weights.tolist(),
+            one_rep_maxes.tolist(),
+            is_record.tolist(),
+        )
+    ]
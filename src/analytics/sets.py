@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Iterable
+
+import numpy as np
+import numpy.typing as npt
+
+from src.model import ExerciseHistoryEntry, WorkoutLog
+from src.stats import normalise_exercise_name
+
+
+@dataclass(frozen=True)
+class ExerciseSets:
+    """Every set of one exercise as parallel arrays, ordered by time."""
+
+    timestamps: npt.NDArray[np.datetime64]
+    weights: npt.NDArray[np.float64]
+    reps: npt.NDArray[np.int64]
+
+    def __len__(self) -> int:
+        return len(self.weights)
+
+
+def load_exercise_sets(
+    workout_logs: Iterable[WorkoutLog], exercise: str
+) -> ExerciseSets:
+    """Load the sets of an exercise, matched by normalised name, into arrays.
+
+    This is the only pass over the workout logs in Python; every set of a workout
+    log is stamped with the time the workout log was created.
+    """
+    key = normalise_exercise_name(exercise)
+    timestamps: list[int] = []
+    weights: list[float] = []
+    reps: list[int] = []
+    for workout_log in workout_logs:
+        created_at = _epoch_milliseconds(workout_log.created_at)
+        for exercise_log in workout_log.logs:
+            if normalise_exercise_name(exercise_log.name) != key:
+                continue
+            for set_log in exercise_log.sets:
+                timestamps.append(created_at)
+                weights.append(float(set_log.weight))
+                reps.append(set_log.reps)
+    return _exercise_sets(timestamps, weights, reps)
+
+
+def load_history_sets(
+    entries: Iterable[ExerciseHistoryEntry],
+    since: datetime | None = None,
+    until: datetime | None = None,
+) -> ExerciseSets:
+    """Load the sets of an exercise's history entries into arrays.
+
+    Only entries performed between `since` and `until`, inclusive, are loaded;
+    each set is stamped with the time its workout log was created.
+    """
+    since_ms = None if since is None else _unix_milliseconds(since)
+    until_ms = None if until is None else _unix_milliseconds(until)
+    timestamps: list[int] = []
+    weights: list[float] = []
+    reps: list[int] = []
+    for entry in entries:
+        performed_at = _epoch_milliseconds(entry.performed_at)
+        if (since_ms is not None and performed_at < since_ms) or (
+            until_ms is not None and performed_at > until_ms
+        ):
+            continue
+        for set_log in entry.sets:
+            timestamps.append(performed_at)
+            weights.append(float(set_log.weight))
+            reps.append(set_log.reps)
+    return _exercise_sets(timestamps, weights, reps)
+
+
+def _exercise_sets(
+    timestamps: list[int], weights: list[float], reps: list[int]
+) -> ExerciseSets:
+    epoch_ms = np.array(timestamps, dtype=np.int64)
+    order = np.argsort(epoch_ms, kind="stable")
+    return ExerciseSets(
+        timestamps=epoch_ms[order].astype("datetime64[ms]"),
+        weights=np.array(weights, dtype=np.float64)[order],
+        reps=np.array(reps, dtype=np.int64)[order],
+    )
+
+
+def _epoch_milliseconds(isoformat: str) -> int:
+    """Get the Unix time of an ISO timestamp, which is in UTC if it has no offset."""
+    return _unix_milliseconds(datetime.fromisoformat(isoformat))
+
+
+def _unix_milliseconds(at: datetime) -> int:
+    if at.tzinfo is None:
+        at = at.replace(tzinfo=timezone.utc)
+    return int(at.timestamp() * 1000)
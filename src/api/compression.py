@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import zlib
+from typing import Protocol
+
+import brotli
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+GZIP = "gzip"
+BROTLI = "br"
+
+
+class _Compressor(Protocol):
+    def compress(self, data: bytes) -> bytes:
+        ...
+
+    def flush(self) -> bytes:
+        ...
+
+    def finish(self) -> bytes:
+        ...
+
+
+class _GzipCompressor:
+    def __init__(self, level: int):
+        # 16 + MAX_WBITS writes a gzip header and trailer around the deflate stream.
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class _BrotliCompressor:
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+def negotiate_encoding(accept_encoding: str) -> str | None:
+    """Pick brotli or gzip from an Accept-Encoding header, preferring brotli.
+
+    Codings with a quality of 0 are refused; `*` accepts either coding.
+    """
+    qualities: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = 1.0
+        name, _, value = params.strip().partition("=")
+        if name.strip() == "q":
+            try:
+                quality = float(value)
+            except ValueError:
+                quality = 0.0
+        qualities[coding.strip().lower()] = quality
+    for coding in (BROTLI, GZIP):
+        if qualities.get(coding, qualities.get("*", 0.0)) > 0:
+            return coding
+    return None
+
+
+class CompressionMiddleware:
+    """Compress responses with brotli or gzip, as negotiated with the client.
+
+    Responses whose body is smaller than `minimum_size` are sent as they are, as
+    are responses that already have a Content-Encoding. Streamed responses are
+    compressed chunk by chunk, so NDJSON lines still reach the client as they are
+    produced. The ETag of a compressed response is weakened, as its bytes differ
+    from the uncompressed representation.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        compressor: _Compressor = (
+            _BrotliCompressor(self.brotli_quality)
+            if encoding == BROTLI
+            else _GzipCompressor(self.gzip_level)
+        )
+        responder = _CompressionResponder(send, encoding, compressor, self.minimum_size)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    def __init__(
+        self, send: Send, encoding: str, compressor: _Compressor, minimum_size: int
+    ):
+        self._send = send
+        self._encoding = encoding
+        self._compressor = compressor
+        self._minimum_size = minimum_size
+        self._start_message: Message | None = None
+        self._compressing: bool | None = None
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            # Held back until the first body chunk shows whether to compress.
+            self._start_message = message
+            return
+        if message["type"] != "http.response.body":
+            await self._send(message)
+            return
+        body: bytes = message.get("body", b"")
+        more_body: bool = message.get("more_body", False)
+        if self._compressing is None:
+            await self._start(body, more_body)
+        if not self._compressing:
+            await self._send(message)
+            return
+        compressed = self._compressor.compress(body)
+        compressed += (
+            self._compressor.flush() if more_body else self._compressor.finish()
+        )
+        await self._send(
+            {"type": "http.response.body", "body": compressed, "more_body": more_body}
+        )
+
+    async def _start(self, body: bytes, more_body: bool) -> None:
+        if self._start_message is None:
+            raise RuntimeError("Response body sent before the response was started")
+        headers = MutableHeaders(scope=self._start_message)
+        self._compressing = "content-encoding" not in headers and (
+            more_body or len(body) >= self._minimum_size
+        )
+        if self._compressing:
+            headers["Content-Encoding"] = self._encoding
+            del headers["Content-Length"]
+            if (etag := headers.get("etag")) and not etag.startswith("W/"):
+                headers["ETag"] = f"W/{etag}"
+        headers.add_vary_header("Accept-Encoding")
+        await self._send(self._start_message)
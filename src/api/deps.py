@@ -1,11 +1,94 @@
 from __future__ import annotations
 
-import jwt
-from fastapi import Header
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from enum import Enum
 
+from anyio import to_thread
+from fastapi import Header, HTTPException, Query, status
 
-def get_user_email(authorization: str = Header(...)) -> str:
-    """Get the user email from the authorization header."""
-    return jwt.decode(authorization, options={"verify_signature": False})[
-        "cognito:username"
-    ]
+from src.adapters.identity import get_token_verifier
+from src.config import config
+from src.exceptions import AuthenticationError
+from src.model import WorkoutSummary
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class ListFormat(str, Enum):
+    JSON = "json"
+    NDJSON = "ndjson"
+
+
+@dataclass(frozen=True)
+class Pagination:
+    limit: int | None
+    cursor: str | None
+
+
+@dataclass(frozen=True)
+class TimeRange:
+    since: datetime | None
+    until: datetime | None
+
+
+async def get_user_email(authorization: str = Header(...)) -> str:
+    """Get the user email from the authorization header.
+
+    Tokens seen before are answered from the verifier's cache; new ones are
+    verified off the event loop, as that may fetch signing keys.
+    """
+    verifier = get_token_verifier()
+    try:
+        claims = verifier.cached_claims(authorization)
+        if claims is None:
+            claims = await to_thread.run_sync(verifier.verify, authorization)
+        return claims["cognito:username"]
+    except (AuthenticationError, KeyError):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authorization token",
+        )
+
+
+async def get_pagination(
+    limit: int | None = Query(None, ge=1, le=config.PAGE_SIZE_MAX),
+    cursor: str | None = Query(None, description="Cursor from X-Next-Cursor"),
+) -> Pagination:
+    """Get the pagination parameters of a list request.
+
+    Without a limit every item is listed, as before pagination was added.
+    """
+    return Pagination(limit=limit, cursor=cursor)
+
+
+def _as_utc(at: datetime) -> datetime:
+    return at.replace(tzinfo=timezone.utc) if at.tzinfo is None else at
+
+
+async def get_time_range(
+    since: datetime | None = None, until: datetime | None = None
+) -> TimeRange:
+    """Get the creation time range of a list request, rejecting inverted ones."""
+    if since and until and _as_utc(since) > _as_utc(until):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"since {since.isoformat()!r} is after until {until.isoformat()!r}",
+        )
+    return TimeRange(since=since, until=until)
+
+
+async def get_fields(
+    fields: str | None = Query(None, description="Comma separated fields to return"),
+) -> list[str] | None:
+    """Get the fields a list request asks for, if it asks for only some."""
+    if fields is None:
+        return None
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    if unknown := [name for name in names if name not in WorkoutSummary.__fields__]:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields {unknown!r}, "
+            f"expected any of {list(WorkoutSummary.__fields__)!r}",
+        )
+    return names
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import hashlib
+from typing import Iterable
+
+from fastapi import Response, status
+
+from src.model import BaseWorkoutDB
+
+
+def workout_etag(workout: BaseWorkoutDB) -> str:
+    """Get the strong ETag of a workout, which changes with its stored version."""
+    return f'"{workout.id}.{workout.version}"'
+
+
+def collection_etag(
+    owner: str, version: int, query_params: Iterable[tuple[str, str]]
+) -> str:
+    """Get the strong ETag of a list of an owner's workouts.
+
+    It changes with the owner's collection version and with the query parameters,
+    as they select which workouts are listed and how.
+    """
+    query = "&".join(f"{key}={value}" for key, value in sorted(query_params))
+    digest = hashlib.sha256(f"{owner}\n{version}\n{query}".encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Check an If-None-Match header against an ETag, using weak comparison."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import json
+import logging
+import time
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src import metrics
+from src.adapters.repository import DynamoDBCalls, collect_dynamodb_calls
+from src.config import config
+
+_logger = logging.getLogger(__name__)
+
+_requests = metrics.counter(
+    "http_requests_total", "HTTP requests handled.", ["method", "route", "status"]
+)
+_request_seconds = metrics.histogram(
+    "http_request_duration_seconds",
+    "Time taken to handle HTTP requests, streamed bodies included.",
+    ["method", "route", "status"],
+)
+_requests_in_flight = metrics.gauge(
+    "http_requests_in_flight", "HTTP requests being handled."
+)
+
+
+def server_timing(calls: DynamoDBCalls, duration: float) -> str:
+    """Format a Server-Timing header of the DynamoDB calls and the app's time."""
+    return (
+        f'dynamodb;dur={calls.duration * 1000:.1f};desc="{len(calls.calls)} calls, '
+        f'{calls.read_capacity:g} RCU, {calls.write_capacity:g} WCU", '
+        f"app;dur={duration * 1000:.1f}"
+    )
+
+
+class DynamoDBAccountingMiddleware:
+    """Account for the DynamoDB calls made while handling each request.
+
+    Calls made until the response starts are reported in a Server-Timing header
+    when SERVER_TIMING_ENABLED is set, as it tells any client how requests are
+    served. Every call, including those of a streamed body,
+    is reported in one JSON log line per request with the number of calls per
+    operation, so that repeated calls stand out.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        status_code = 500
+
+        with collect_dynamodb_calls() as calls:
+
+            async def send_with_timing(message: Message) -> None:
+                nonlocal status_code
+                if message["type"] == "http.response.start":
+                    status_code = message["status"]
+                    if config.SERVER_TIMING_ENABLED:
+                        MutableHeaders(scope=message).append(
+                            "Server-Timing",
+                            server_timing(calls, time.perf_counter() - start),
+                        )
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_timing)
+            finally:
+                _logger.info(
+                    json.dumps(
+                        {
+                            "method": scope["method"],
+                            "path": scope["path"],
+                            "status": status_code,
+                            "duration_ms": round(
+                                (time.perf_counter() - start) * 1000, 1
+                            ),
+                            "dynamodb_calls": len(calls.calls),
+                            "dynamodb_ms": round(calls.duration * 1000, 1),
+                            "dynamodb_items": calls.items,
+                            "read_capacity_units": calls.read_capacity,
+                            "write_capacity_units": calls.write_capacity,
+                            "dynamodb_operations": calls.operations,
+                        }
+                    )
+                )
+
+
+class MetricsMiddleware:
+    """Count requests and time them per method, route and status code.
+
+    Routes are labelled with their path template, or as unmatched, so that the
+    number of label values stays bounded.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        _requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            _requests_in_flight.dec()
+            route = scope.get("route")
+            labels = (
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                str(status_code),
+            )
+            _requests.inc(*labels)
+            _request_seconds.observe(time.perf_counter() - start, *labels)
@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import PlainTextResponse
+
+from src.config import config
+from src.metrics import render
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+router = APIRouter()
+
+
+@router.get("/metrics", include_in_schema=False)
+async def get_metrics() -> PlainTextResponse:
+    """Get every metric in the Prometheus text exposition format.
+
+    Not found unless METRICS_ENABLED is set, as metrics are served without
+    authentication. Async, so that threadpool gauges read the event loop's
+    repository limiter.
+    """
+    if not config.METRICS_ENABLED:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    return PlainTextResponse(render(), media_type=CONTENT_TYPE)
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import Any, AsyncIterator
+
+import orjson
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel
+from pydantic.json import decimal_encoder
+
+from src.adapters.repository import Page
+from src.api.deps import NEXT_CURSOR_HEADER
+from src.model import WorkoutSummary
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, Decimal):
+        return decimal_encoder(obj)
+    if isinstance(obj, BaseModel):
+        return obj.dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Serialise content to JSON with orjson, encoding Decimals as pydantic does."""
+    return orjson.dumps(content, default=_default)
+
+
+class ORJSONResponse(JSONResponse):
+    """A JSON response rendered with orjson.
+
+    Unlike FastAPI's, it encodes Decimals like `SetLog.weight` and pydantic models,
+    so both can be returned directly without a conversion pass first.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def ndjson_response(items: AsyncIterator[BaseModel]) -> StreamingResponse:
+    """Stream models as newline-delimited JSON, one line per model."""
+
+    async def lines() -> AsyncIterator[bytes]:
+        async for item in items:
+            yield dumps(item) + b"\n"
+
+    return StreamingResponse(lines(), media_type=NDJSON_MEDIA_TYPE)
+
+
+def page_response(page: Page[Any], etag: str | None = None) -> ORJSONResponse:
+    """Respond with a page of workouts as a JSON array, with its ETag and cursor.
+
+    The workouts are rendered as they are, without FastAPI validating them against
+    the response model again, as the repository built them from trusted items.
+    """
+    headers = {"ETag": etag} if etag else {}
+    if page.next_cursor:
+        headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    return ORJSONResponse(page.items, headers=headers)
+
+
+def summaries_response(page: Page[WorkoutSummary], etag: str) -> ORJSONResponse:
+    """Respond with a page of summaries, holding only the fields that were read."""
+    return page_response(
+        Page(
+            items=[summary.dict(exclude_unset=True) for summary in page.items],
+            next_cursor=page.next_cursor,
+        ),
+        etag,
+    )
@@ -1,6 +1,12 @@
 from fastapi import APIRouter
 
-from src.api.v1.endpoints import health_check, workout_log, workout_plans
+from src.api.v1.endpoints import (
+    exercises,
+    health_check,
+    stats,
+    workout_log,
+    workout_plans,
+)
 
 api_router = APIRouter()
 api_router.include_router(
@@ -8,3 +14,5 @@ api_router.include_router(
 )
 api_router.include_router(workout_plans.router, prefix="/plans", tags=["workout_plans"])
 api_router.include_router(workout_log.router, prefix="/logs", tags=["workout_logs"])
+api_router.include_router(stats.router, prefix="/stats", tags=["stats"])
+api_router.include_router(exercises.router, prefix="/exercises", tags=["exercises"])
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import logging
+
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from src import exceptions, model
+from src.adapters.repository import (
+    AsyncExerciseStatsRepository,
+    get_async_exercise_stats_repository,
+)
+from src.api.deps import Pagination, get_pagination, get_user_email
+from src.api.responses import page_response
+
+_logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+@router.get("/{name}/history", status_code=status.HTTP_200_OK)
+async def list_exercise_history(
+    *,
+    repository: AsyncExerciseStatsRepository = Depends(
+        get_async_exercise_stats_repository
+    ),
+    user_email: str = Depends(get_user_email),
+    name: str,
+    pagination: Pagination = Depends(get_pagination),
+    newest_first: bool = False,
+) -> list[model.ExerciseHistoryEntry]:
+    """List a page of the workout logs in which a user performed an exercise.
+
+    Each entry has the sets of the exercise in one workout log, ordered by the
+    time the log was created. Exercise names are matched regardless of case and
+    spacing. The cursor of the next page, if any, is returned in the X-Next-Cursor
+    header.
+    """
+    _logger.info(f"Listing history of {name!r} for user {user_email!r}")
+    try:
+        page = await repository.list_exercise_history(
+            owner=user_email,
+            exercise=name,
+            limit=pagination.limit,
+            cursor=pagination.cursor,
+            newest_first=newest_first,
+        )
+    except exceptions.InvalidCursorError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid cursor {pagination.cursor!r}",
+        )
+    return page_response(page)  # type: ignore
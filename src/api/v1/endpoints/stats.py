@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import logging
+
+from anyio import to_thread
+from fastapi import APIRouter, Depends, Query, status
+
+from src import analytics, model
+from src.adapters.repository import (
+    AsyncExerciseStatsRepository,
+    get_async_exercise_stats_repository,
+)
+from src.api.deps import TimeRange, get_time_range, get_user_email
+
+_logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+@router.get("/exercises", status_code=status.HTTP_200_OK)
+async def list_exercise_stats(
+    *,
+    repository: AsyncExerciseStatsRepository = Depends(
+        get_async_exercise_stats_repository
+    ),
+    user_email: str = Depends(get_user_email),
+) -> list[model.ExerciseStats]:
+    """List the totals and bests of every exercise a user has logged.
+
+    They are kept up to date on every workout log write, so this reads one item
+    per exercise rather than the whole workout log history.
+    """
+    _logger.info(f"Listing exercise stats for user {user_email!r}")
+    return await repository.list_exercise_stats(owner=user_email)
+
+
+@router.get("/records", status_code=status.HTTP_200_OK)
+async def list_exercise_records(
+    *,
+    repository: AsyncExerciseStatsRepository = Depends(
+        get_async_exercise_stats_repository
+    ),
+    user_email: str = Depends(get_user_email),
+) -> list[model.ExerciseRecord]:
+    """List the heaviest set a user has performed per exercise and number of reps.
+
+    Records are kept up to date on every workout log write and sorted by exercise
+    name and reps.
+    """
+    _logger.info(f"Listing exercise records for user {user_email!r}")
+    return await repository.list_exercise_records(owner=user_email)
+
+
+@router.get("/records/{exercise}", status_code=status.HTTP_200_OK)
+async def list_records_of_exercise(
+    *,
+    repository: AsyncExerciseStatsRepository = Depends(
+        get_async_exercise_stats_repository
+    ),
+    user_email: str = Depends(get_user_email),
+    exercise: str,
+) -> list[model.ExerciseRecord]:
+    """List the heaviest set a user has performed of an exercise per number of reps.
+
+    Exercise names are matched regardless of case and spacing.
+    """
+    _logger.info(f"Listing records of {exercise!r} for user {user_email!r}")
+    return await repository.list_exercise_records(owner=user_email, exercise=exercise)
+
+
+def _exercise_progress(
+    entries: list[model.ExerciseHistoryEntry],
+    bucket: model.ProgressBucket,
+    window: int,
+) -> list[model.ProgressPoint]:
+    sets = analytics.load_history_sets(entries)
+    return analytics.exercise_progress(sets, bucket=bucket, window=window)
+
+
+@router.get("/progress", status_code=status.HTTP_200_OK)
+async def get_exercise_progress(
+    *,
+    repository: AsyncExerciseStatsRepository = Depends(
+        get_async_exercise_stats_repository
+    ),
+    user_email: str = Depends(get_user_email),
+    exercise: str,
+    bucket: model.ProgressBucket = model.ProgressBucket.WEEK,
+    window: int = Query(4, ge=1, le=52, description="Buckets per moving average"),
+    time_range: TimeRange = Depends(get_time_range),
+) -> list[model.ProgressPoint]:
+    """Get the progress of an exercise per day, week or month.
+
+    Each bucket has the volume, its moving average, and the best weight and
+    estimated one rep max of the sets performed in it, and whether that beat
+    every earlier bucket. Only buckets with sets of the exercise are returned.
+    Only the history of the exercise within the time range is read, not every
+    workout log.
+    """
+    _logger.info(f"Getting progress of {exercise!r} for user {user_email!r}")
+    page = await repository.list_exercise_history(
+        owner=user_email,
+        exercise=exercise,
+        since=time_range.since,
+        until=time_range.until,
+    )
+    return await to_thread.run_sync(_exercise_progress, page.items, bucket, window)
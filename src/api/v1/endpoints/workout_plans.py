@@ -3,11 +3,38 @@ from __future__ import annotations
 import logging
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
 
 from src import exceptions, model
-from src.adapters.repository import WorkoutRepository, get_workout_plans_repository
-from src.api.deps import get_user_email
+from src.adapters.repository import (
+    AsyncWorkoutRepository,
+    get_async_workout_plans_repository,
+)
+from src.api.deps import (
+    ListFormat,
+    Pagination,
+    get_fields,
+    get_pagination,
+    get_user_email,
+)
+from src.api.etags import collection_etag, etag_matches, not_modified, workout_etag
+from src.api.responses import (
+    ORJSONResponse,
+    ndjson_response,
+    page_response,
+    summaries_response,
+)
+from src.config import config
 
 _logger = logging.getLogger(__name__)
 
@@ -15,10 +42,10 @@ router = APIRouter()
 
 
 @router.post("/", status_code=status.HTTP_201_CREATED)
-def create_workout_plan(
+async def create_workout_plan(
     *,
-    repository: WorkoutRepository[model.WorkoutPlan] = Depends(
-        get_workout_plans_repository
+    repository: AsyncWorkoutRepository[model.WorkoutPlan] = Depends(
+        get_async_workout_plans_repository
     ),
     user_email: str = Depends(get_user_email),
     workout_plan: model.WorkoutPlanCreate,
@@ -26,7 +53,7 @@ def create_workout_plan(
     """Create a users workout plan."""
     _logger.info(f"Creating workout plan {workout_plan.name!r} for user {user_email!r}")
     try:
-        plan = repository.create(
+        plan = await repository.create(
             model=workout_plan,
             owner=user_email,
         )
@@ -40,44 +67,133 @@ def create_workout_plan(
     return plan
 
 
+@router.post("/batch", status_code=status.HTTP_201_CREATED)
+async def create_workout_plans(
+    *,
+    repository: AsyncWorkoutRepository[model.WorkoutPlan] = Depends(
+        get_async_workout_plans_repository
+    ),
+    user_email: str = Depends(get_user_email),
+    workout_plans: list[model.WorkoutPlanCreate] = Body(
+        ..., min_items=1, max_items=config.BATCH_MAX_ITEMS
+    ),
+    response: Response,
+) -> list[model.BatchWriteResult]:
+    """Create many of a users workout plans in one request.
+
+    Results are in request order. The response is 207 if any workout plan failed.
+    """
+    _logger.info(f"Creating {len(workout_plans)} workout plans for user {user_email!r}")
+    results = await repository.create_many(models=workout_plans, owner=user_email)
+    if any(result.status == model.BatchWriteStatus.FAILED for result in results):
+        response.status_code = status.HTTP_207_MULTI_STATUS
+    return results
+
+
+@router.post("/get-many", status_code=status.HTTP_200_OK)
+async def get_workout_plans(
+    *,
+    repository: AsyncWorkoutRepository[model.WorkoutPlan] = Depends(
+        get_async_workout_plans_repository
+    ),
+    user_email: str = Depends(get_user_email),
+    ids: list[UUID] = Body(
+        ..., embed=True, min_items=1, max_items=config.BATCH_MAX_ITEMS
+    ),
+) -> list[model.WorkoutPlan]:
+    """Get many of a users workout plans by id.
+
+    Workout plans are returned in the order of `ids`; missing ones are left out.
+    """
+    _logger.info(f"Getting {len(ids)} workout plans for user {user_email!r}")
+    workouts = await repository.get_many(ids=[str(id) for id in ids], owner=user_email)
+    return ORJSONResponse(workouts)  # type: ignore
+
+
 @router.get("/{plan_id}", status_code=status.HTTP_200_OK)
-def get_workout_plan(
+async def get_workout_plan(
     *,
-    repository: WorkoutRepository[model.WorkoutPlan] = Depends(
-        get_workout_plans_repository
+    repository: AsyncWorkoutRepository[model.WorkoutPlan] = Depends(
+        get_async_workout_plans_repository
     ),
     user_email: str = Depends(get_user_email),
     plan_id: UUID,
+    if_none_match: str | None = Header(None),
 ) -> model.WorkoutPlan:
-    """Get a users workout plan by name."""
+    """Get a users workout plan by name.
+
+    Answers 304 if If-None-Match matches the workout plan's current ETag.
+    """
     _logger.info(f"Getting workout plan {plan_id!r} for user {user_email!r}")
-    plan = repository.get(id=str(plan_id), owner=user_email)
+    plan = await repository.get(id=str(plan_id), owner=user_email)
     if plan is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Workout plan {plan_id!r} not found",
         )
-    return plan
+    etag = workout_etag(plan)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)  # type: ignore
+    return ORJSONResponse(plan, headers={"ETag": etag})  # type: ignore
 
 
 @router.get("/", status_code=status.HTTP_200_OK)
-def list_workout_plan(
+async def list_workout_plan(
     *,
-    repository: WorkoutRepository[model.WorkoutPlan] = Depends(
-        get_workout_plans_repository
+    repository: AsyncWorkoutRepository[model.WorkoutPlan] = Depends(
+        get_async_workout_plans_repository
     ),
     user_email: str = Depends(get_user_email),
+    pagination: Pagination = Depends(get_pagination),
+    list_format: ListFormat = Query(ListFormat.JSON, alias="format"),
+    fields: list[str] | None = Depends(get_fields),
+    if_none_match: str | None = Header(None),
+    request: Request,
 ) -> list[model.WorkoutPlan]:
-    """List all workout plans for a user."""
+    """List a page of workout plans for a user.
+
+    The cursor of the next page, if any, is returned in the X-Next-Cursor header.
+    With `format=ndjson` every workout plan is streamed instead, one per line.
+    With `fields` only those fields and the id of each workout plan are read.
+    Answers 304 without listing if If-None-Match matches the list's current ETag.
+    """
     _logger.info(f"Listing workout plans for user {user_email!r}")
-    return repository.list(owner=user_email)
+    etag = collection_etag(
+        owner=user_email,
+        version=await repository.get_collection_version(owner=user_email),
+        query_params=request.query_params.multi_items(),
+    )
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)  # type: ignore
+    if list_format == ListFormat.NDJSON:
+        streaming_response = ndjson_response(repository.iter_items(owner=user_email))
+        streaming_response.headers["ETag"] = etag
+        return streaming_response  # type: ignore
+    try:
+        if fields is not None:
+            summaries = await repository.list_summaries(
+                owner=user_email,
+                fields=fields,
+                limit=pagination.limit,
+                cursor=pagination.cursor,
+            )
+            return summaries_response(summaries, etag)  # type: ignore
+        page = await repository.list(
+            owner=user_email, limit=pagination.limit, cursor=pagination.cursor
+        )
+    except exceptions.InvalidCursorError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid cursor {pagination.cursor!r}",
+        )
+    return page_response(page, etag)  # type: ignore
 
 
 @router.patch("/{plan_id}", status_code=status.HTTP_200_OK)
-def update_workout_plan(
+async def update_workout_plan(
     *,
-    repository: WorkoutRepository[model.WorkoutPlan] = Depends(
-        get_workout_plans_repository
+    repository: AsyncWorkoutRepository[model.WorkoutPlan] = Depends(
+        get_async_workout_plans_repository
     ),
     user_email: str = Depends(get_user_email),
     plan_id: UUID,
@@ -86,15 +202,9 @@ def update_workout_plan(
     """Update a users workout plan."""
     _logger.info(f"Updating workout plan {plan_id!r} for user {user_email!r}")
     try:
-        db_plan = repository.get(id=str(plan_id), owner=user_email)
-        if not db_plan:
-            raise HTTPException(
-                status_code=404, detail=f"Workout plan {plan_id!r} not found"
-            )
-        return repository.update(
+        return await repository.patch(
             id=str(plan_id),
             owner=user_email,
-            db_model=db_plan,
             update_model=workout_plan_update,
         )
     except exceptions.WorkoutNotFoundError:
@@ -105,21 +215,29 @@ def update_workout_plan(
 
 
 @router.delete("/{plan_id}")
-def delete_workout_plan(
+async def delete_workout_plan(
     *,
-    repository: WorkoutRepository[model.WorkoutPlan] = Depends(
-        get_workout_plans_repository
+    repository: AsyncWorkoutRepository[model.WorkoutPlan] = Depends(
+        get_async_workout_plans_repository
     ),
     user_email: str = Depends(get_user_email),
     plan_id: UUID,
+    return_deleted: bool = False,
 ) -> Response:
-    """Delete a users workout plan."""
+    """Delete a users workout plan.
+
+    With `return_deleted` the deleted workout plan is returned instead of 204.
+    """
     _logger.info(f"Deleting workout plan {plan_id!r} for user {user_email!r}")
-    plan = repository.get(id=str(plan_id), owner=user_email)
-    if not plan:
+    try:
+        plan = await repository.delete(
+            id=str(plan_id), owner=user_email, return_deleted=return_deleted
+        )
+    except exceptions.WorkoutNotFoundError:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Workout plan {plan_id!r} not found",
         )
-    repository.delete(id=str(plan_id), owner=user_email)
+    if plan is not None:
+        return plan  # type: ignore
     return Response(status_code=status.HTTP_204_NO_CONTENT)
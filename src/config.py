@@ -1,15 +1,49 @@
 from __future__ import annotations
 
+from enum import Enum
+
 from pydantic import BaseSettings
 
 
+class RepositoryBackend(str, Enum):
+    DYNAMODB = "dynamodb"
+    MEMORY = "memory"
+    SQLITE = "sqlite"
+
+
 class Config(BaseSettings):
     """Application settings."""
 
     API_V1_STR: str = "/api/v1"
     PROJECT_NAME: str = "Workout Tracker"
+    REPOSITORY_BACKEND: RepositoryBackend = RepositoryBackend.DYNAMODB
     TABLE_NAME: str = "workout-tracker"
+    SQLITE_PATH: str = "workout-tracker.db"
     DYNAMODB_URL: str | None = None
+    PAGE_SIZE_MAX: int = 1000
+    BATCH_MAX_ITEMS: int = 200
+    JWKS_URL: str | None = None
+    JWKS_REFRESH_SECONDS: float = 3600.0
+    JWT_ISSUER: str | None = None
+    JWT_AUDIENCE: str | None = None
+    TOKEN_CACHE_MAX_ENTRIES: int = 10_000
+    CACHE_ENABLED: bool = False
+    CACHE_TTL_SECONDS: float = 60.0
+    CACHE_MAX_ENTRIES: int = 10_000
+    DYNAMODB_MAX_POOL_CONNECTIONS: int = 50
+    DYNAMODB_CONNECT_TIMEOUT: float = 2.0
+    DYNAMODB_READ_TIMEOUT: float = 5.0
+    DYNAMODB_TCP_KEEPALIVE: bool = True
+    DYNAMODB_MAX_ATTEMPTS: int = 3
+    DYNAMODB_BATCH_MAX_ATTEMPTS: int = 5
+    DYNAMODB_BATCH_BACKOFF_BASE: float = 0.05
+    DYNAMODB_PACK_SETS: bool = False
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    SERVER_TIMING_ENABLED: bool = False
+    METRICS_ENABLED: bool = False
+    METRICS_LOG_INVOCATIONS: bool = False
 
 
 config = Config()
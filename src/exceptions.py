@@ -11,3 +11,11 @@ class DuplicateWorkoutError(WorkoutError):
 
 class WorkoutNotFoundError(WorkoutError):
     """Raised when a workout plan is not found."""
+
+
+class InvalidCursorError(WorkoutError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+class AuthenticationError(Exception):
+    """Raised when an identity token cannot be verified."""
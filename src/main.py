@@ -1,15 +1,24 @@
 from __future__ import annotations
 
+from typing import Any
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from mangum import Mangum
 
+from src.api import metrics
+from src.api.compression import CompressionMiddleware
+from src.api.deps import NEXT_CURSOR_HEADER
+from src.api.instrumentation import DynamoDBAccountingMiddleware, MetricsMiddleware
+from src.api.responses import ORJSONResponse
 from src.api.v1.api import api_router
 from src.config import config
+from src.metrics import log_metrics
 
 app = FastAPI(
     title=config.PROJECT_NAME,
     openapi_url=f"{config.API_V1_STR}/openapi.json",
+    default_response_class=ORJSONResponse,
 )
 origins = [
     "*",  # TODO: Change this to the frontend URL
@@ -21,9 +30,28 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
+)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=config.COMPRESSION_MINIMUM_SIZE,
+    gzip_level=config.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=config.COMPRESSION_BROTLI_QUALITY,
 )
+app.add_middleware(DynamoDBAccountingMiddleware)
+app.add_middleware(MetricsMiddleware)
 
 
 app.include_router(api_router, prefix=config.API_V1_STR)
+app.include_router(metrics.router)
+
+_mangum = Mangum(app)
+
 
-handle = Mangum(app)
+def handle(event: dict[str, Any], context: Any) -> dict[str, Any]:
+    """Handle a Lambda invocation, then log its metrics if configured to."""
+    try:
+        return _mangum(event, context)
+    finally:
+        if config.METRICS_LOG_INVOCATIONS:
+            log_metrics()
@@ -0,0 +1,266 @@
+from __future__ import annotations
+
+import json
+import logging
+import math
+import threading
+import weakref
+from bisect import bisect_left
+from typing import Callable, Iterator, Mapping, Sequence, TypeVar
+
+_logger = logging.getLogger(__name__)
+
+LabelValues = tuple[str, ...]
+Values = dict[LabelValues, list[float]]
+
+M = TypeVar("M", bound="Metric")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_lock = threading.Lock()
+_metrics: dict[str, Metric] = {}
+_flushed: dict[str, Values] = {}
+
+
+class _ShardOwner:
+    """Lives as long as the thread-local it is stored on, i.e. its thread."""
+
+
+class _ShardedValues:
+    """Metric values kept per thread, so that updating them takes no lock.
+
+    Each thread only writes to its own shard, and readers add up copies of every
+    shard, which the GIL makes atomic. The shards of finished threads are folded
+    into one, so that short-lived worker threads do not pile up.
+    """
+
+    def __init__(self) -> None:
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._shards: dict[int, Values] = {}
+        self._retired: Values = {}
+
+    def shard(self) -> Values:
+        try:
+            return self._local.shard
+        except AttributeError:
+            return self._add_shard()
+
+    def _add_shard(self) -> Values:
+        shard: Values = {}
+        owner = _ShardOwner()
+        with self._lock:
+            self._shards[id(owner)] = shard
+        weakref.finalize(owner, self._retire, id(owner))
+        self._local.owner = owner
+        self._local.shard = shard
+        return shard
+
+    def _retire(self, key: int) -> None:
+        with self._lock:
+            _add_values(self._retired, self._shards.pop(key))
+
+    def totals(self) -> Values:
+        with self._lock:
+            shards = [self._retired, *self._shards.values()]
+            totals: Values = {}
+            for shard in shards:
+                _add_values(totals, shard)
+        return totals
+
+
+def _add_values(totals: Values, values: Values) -> None:
+    for labels, counts in values.copy().items():
+        if (total := totals.get(labels)) is None:
+            totals[labels] = list(counts)
+        else:
+            for i, count in enumerate(counts.copy()):
+                total[i] += count
+
+
+class Metric:
+    """A named family of samples, one per combination of label values."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str]):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def values(self) -> Values:
+        raise NotImplementedError
+
+    def samples(self, values: Values) -> Iterator[tuple[str, dict[str, str], float]]:
+        for labels, (value,) in sorted(values.items()):
+            yield self.name, dict(zip(self.labelnames, labels)), value
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values = _ShardedValues()
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        shard = self._values.shard()
+        if (values := shard.get(labels)) is None:
+            shard[labels] = values = [0.0]
+        values[0] += amount
+
+    def values(self) -> Values:
+        return self._values.totals()
+
+
+class Gauge(Counter):
+    """A value that goes up and down, such as the number of requests in flight."""
+
+    kind = "gauge"
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values = _ShardedValues()
+
+    def observe(self, value: float, *labels: str) -> None:
+        """Count `value` in its bucket and add it to the sum, the last value."""
+        shard = self._values.shard()
+        if (values := shard.get(labels)) is None:
+            shard[labels] = values = [0.0] * (len(self.buckets) + 2)
+        values[bisect_left(self.buckets, value)] += 1
+        values[-1] += value
+
+    def values(self) -> Values:
+        return self._values.totals()
+
+    def samples(self, values: Values) -> Iterator[tuple[str, dict[str, str], float]]:
+        bounds = [*(f"{bucket:g}" for bucket in self.buckets), "+Inf"]
+        for labels, counts in sorted(values.items()):
+            names = dict(zip(self.labelnames, labels))
+            cumulative = 0.0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                yield f"{self.name}_bucket", {**names, "le": bound}, cumulative
+            yield f"{self.name}_sum", names, counts[-1]
+            yield f"{self.name}_count", names, cumulative
+
+
+class CallbackMetric(Metric):
+    """A counter or gauge read from elsewhere whenever metrics are collected."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        kind: str,
+        callback: Callable[[], Mapping[LabelValues, float]],
+        labelnames: Sequence[str] = (),
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.kind = kind
+        self._callback = callback
+
+    def values(self) -> Values:
+        return {labels: [value] for labels, value in self._callback().items()}
+
+
+def register(metric: M) -> M:
+    """Add a metric to those rendered and logged."""
+    with _lock:
+        if metric.name in _metrics:
+            raise ValueError(f"Metric {metric.name!r} is already registered")
+        _metrics[metric.name] = metric
+    return metric
+
+
+def counter(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+    return register(Counter(name, documentation, labelnames))
+
+
+def gauge(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+    return register(Gauge(name, documentation, labelnames))
+
+
+def histogram(
+    name: str,
+    documentation: str,
+    labelnames: Sequence[str] = (),
+    buckets: Sequence[float] = LATENCY_BUCKETS,
+) -> Histogram:
+    return register(Histogram(name, documentation, labelnames, buckets))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+def render() -> str:
+    """Render every registered metric in the Prometheus text exposition format."""
+    with _lock:
+        metrics = list(_metrics.values())
+    lines = []
+    for metric in metrics:
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        for name, labels, value in metric.samples(metric.values()):
+            if labels:
+                label_text = ",".join(
+                    f'{label}="{_escape(text)}"' for label, text in labels.items()
+                )
+                name = f"{name}{{{label_text}}}"
+            lines.append(f"{name} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+def _delta(values: Values, flushed: Values) -> Values:
+    deltas = {}
+    for labels, counts in values.items():
+        previous = flushed.get(labels, [0.0] * len(counts))
+        if (delta := [a - b for a, b in zip(counts, previous)]) != [0.0] * len(delta):
+            deltas[labels] = delta
+    return deltas
+
+
+def log_metrics() -> None:
+    """Log what changed since the last call as one JSON line.
+
+    Counters and histograms are logged as the increase since the last call,
+    leaving out empty buckets, and gauges as they are. Meant for the end of each
+    Lambda invocation, where no scraper can reach the process.
+    """
+    with _lock:
+        metrics = list(_metrics.values())
+        line: dict[str, dict[str, float]] = {}
+        for metric in metrics:
+            values = metric.values()
+            if metric.kind in ("counter", "histogram"):
+                values, _flushed[metric.name] = (
+                    _delta(values, _flushed.get(metric.name, {})),
+                    values,
+                )
+            for name, labels, value in metric.samples(values):
+                if name.endswith("_bucket") and not value:
+                    continue
+                key = ",".join(f"{label}={text}" for label, text in labels.items())
+                line.setdefault(name, {})[key] = value
+    _logger.info(json.dumps({"metrics": line}))
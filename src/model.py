@@ -1,11 +1,14 @@
 from __future__ import annotations
 
-from datetime import datetime, timezone
+import secrets
+import time
+from datetime import date, datetime, timezone
 from decimal import Decimal
 from enum import Enum
-from uuid import uuid4
+from typing import Any, TypeVar
+from uuid import UUID, uuid4
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, validator
 
 
 def now_isoformat() -> str:
@@ -13,25 +16,87 @@ def now_isoformat() -> str:
     return datetime.now(tz=timezone.utc).isoformat()
 
 
+def uuid7(timestamp_ms: int | None = None) -> str:
+    """Return a time-ordered version 7 UUID.
+
+    The first 48 bits are the Unix time in milliseconds, so the string form of
+    these ids sorts by creation time.
+    """
+    if timestamp_ms is None:
+        timestamp_ms = int(time.time() * 1000)
+    value = (
+        (timestamp_ms & 0xFFFF_FFFF_FFFF) << 80
+        | 0x7 << 76
+        | secrets.randbits(12) << 64
+        | 0b10 << 62
+        | secrets.randbits(62)
+    )
+    return str(UUID(int=value))
+
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+WorkoutDBType = TypeVar("WorkoutDBType", bound="BaseWorkoutDB")
+
+
+def _decimal(value: Any) -> Decimal:
+    return value if isinstance(value, Decimal) else Decimal(str(value))
+
+
+def _construct(cls: type[ModelT], values: dict[str, Any]) -> ModelT:
+    """Build a model from every one of its field values, without validation.
+
+    A leaner `BaseModel.construct`, which also looks up defaults of every field.
+    """
+    instance = cls.__new__(cls)
+    object.__setattr__(instance, "__dict__", values)
+    object.__setattr__(instance, "__fields_set__", set(values))
+    return instance
+
+
 class WorkoutType(str, Enum):
     LOG = "LOG"
     PLAN = "PLAN"
 
 
+class BatchWriteStatus(str, Enum):
+    CREATED = "CREATED"
+    FAILED = "FAILED"
+
+
 class SetLog(BaseModel):
     weight: Decimal
     reps: int
 
+    @classmethod
+    def from_trusted(cls, data: dict[str, Any]) -> SetLog:
+        return _construct(
+            cls, {"weight": _decimal(data["weight"]), "reps": int(data["reps"])}
+        )
+
 
 class ExerciseLog(BaseModel):
     name: str
     sets: list[SetLog]
 
+    @classmethod
+    def from_trusted(cls, data: dict[str, Any]) -> ExerciseLog:
+        return _construct(
+            cls,
+            {
+                "name": data["name"],
+                "sets": [SetLog.from_trusted(set_) for set_ in data["sets"]],
+            },
+        )
+
 
 class ExercisePlan(BaseModel):
     name: str
     sets: int
 
+    @classmethod
+    def from_trusted(cls, data: dict[str, Any]) -> ExercisePlan:
+        return _construct(cls, {"name": data["name"], "sets": int(data["sets"])})
+
 
 class BaseWorkoutCreate(BaseModel):
     name: str
@@ -50,16 +115,77 @@ class BaseWorkoutDB(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid4()))
     name: str
     created_at: str = Field(default_factory=now_isoformat)
+    updated_at: str | None = None
+    version: int = 1
+
+    @validator("updated_at", always=True)
+    def default_updated_at_to_created_at(
+        cls, updated_at: str | None, values: dict
+    ) -> str | None:
+        return updated_at or values.get("created_at")
+
+    @classmethod
+    def from_trusted(cls: type[WorkoutDBType], data: dict[str, Any]) -> WorkoutDBType:
+        """Build a workout from data this application stored, without validating it.
+
+        Stored workouts were validated when they were written, so only the types
+        the store does not keep, like DynamoDB's Decimal for every number, are
+        converted. Keys that are not fields, like the table keys, are left out.
+        """
+        return _construct(cls, cls._trusted_fields(data))
+
+    @classmethod
+    def _trusted_fields(cls, data: dict[str, Any]) -> dict[str, Any]:
+        return {
+            "id": data["id"],
+            "name": data["name"],
+            "created_at": data["created_at"],
+            "updated_at": data.get("updated_at") or data["created_at"],
+            "version": int(data.get("version", 1)),
+        }
 
 
 class WorkoutPlan(BaseWorkoutDB):
     exercises: list[ExercisePlan]
 
+    @classmethod
+    def _trusted_fields(cls, data: dict[str, Any]) -> dict[str, Any]:
+        return {
+            **super()._trusted_fields(data),
+            "exercises": [ExercisePlan.from_trusted(e) for e in data["exercises"]],
+        }
+
 
 class WorkoutLog(BaseWorkoutDB):
+    id: str = Field(default_factory=uuid7)
     plans: list[ExercisePlan]
     logs: list[ExerciseLog]
 
+    @classmethod
+    def _trusted_fields(cls, data: dict[str, Any]) -> dict[str, Any]:
+        return {
+            **super()._trusted_fields(data),
+            "plans": [ExercisePlan.from_trusted(plan) for plan in data["plans"]],
+            "logs": [ExerciseLog.from_trusted(log) for log in data["logs"]],
+        }
+
+
+class WorkoutSummary(BaseModel):
+    """A workout with only the fields that were asked for."""
+
+    id: str
+    name: str | None = None
+    created_at: str | None = None
+    updated_at: str | None = None
+    version: int | None = None
+
+    @classmethod
+    def from_trusted(cls, data: dict[str, Any]) -> WorkoutSummary:
+        fields = {name: data[name] for name in cls.__fields__ if name in data}
+        if "version" in fields:
+            fields["version"] = int(fields["version"])
+        return cls.construct(**fields)
+
 
 class BaseWorkoutUpdate(BaseModel):
     name: str | None = None
@@ -72,3 +198,104 @@ class WorkoutPlanUpdate(BaseWorkoutUpdate):
 class WorkoutLogUpdate(BaseWorkoutUpdate):
     plans: list[ExercisePlan] | None = None
     logs: list[ExerciseLog] | None = None
+
+
+class ExerciseStats(BaseModel):
+    """Totals and bests of every logged set of one exercise."""
+
+    name: str
+    log_count: int
+    set_count: int
+    rep_count: int
+    total_volume: Decimal
+    best_weight: Decimal | None = None
+    estimated_one_rep_max: Decimal | None = None
+    last_performed_at: str | None = None
+
+    @classmethod
+    def from_trusted(cls, data: dict[str, Any]) -> ExerciseStats:
+        best_weight = data.get("best_weight")
+        one_rep_max = data.get("estimated_one_rep_max")
+        return _construct(
+            cls,
+            {
+                "name": data["name"],
+                "log_count": int(data["log_count"]),
+                "set_count": int(data["set_count"]),
+                "rep_count": int(data["rep_count"]),
+                "total_volume": _decimal(data["total_volume"]),
+                "best_weight": None if best_weight is None else _decimal(best_weight),
+                "estimated_one_rep_max": (
+                    None if one_rep_max is None else _decimal(one_rep_max)
+                ),
+                "last_performed_at": data.get("last_performed_at"),
+            },
+        )
+
+
+class ExerciseRecord(BaseModel):
+    """The heaviest set of one exercise performed for one number of reps."""
+
+    name: str
+    reps: int
+    weight: Decimal
+    workout_log_id: str
+    performed_at: str
+
+    @classmethod
+    def from_trusted(cls, data: dict[str, Any]) -> ExerciseRecord:
+        return _construct(
+            cls,
+            {
+                "name": data["name"],
+                "reps": int(data["reps"]),
+                "weight": _decimal(data["weight"]),
+                "workout_log_id": data["workout_log_id"],
+                "performed_at": data["performed_at"],
+            },
+        )
+
+
+class ExerciseHistoryEntry(BaseModel):
+    """The sets of one exercise performed in one workout log."""
+
+    name: str
+    workout_log_id: str
+    performed_at: str
+    sets: list[SetLog]
+
+    @classmethod
+    def from_trusted(cls, data: dict[str, Any]) -> ExerciseHistoryEntry:
+        return _construct(
+            cls,
+            {
+                "name": data["name"],
+                "workout_log_id": data["workout_log_id"],
+                "performed_at": data["performed_at"],
+                "sets": [SetLog.from_trusted(set_) for set_ in data["sets"]],
+            },
+        )
+
+
+class ProgressBucket(str, Enum):
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+
+
+class ProgressPoint(BaseModel):
+    """The sets of one exercise performed in one time bucket."""
+
+    period_start: date
+    set_count: int
+    rep_count: int
+    volume: float
+    volume_moving_average: float
+    best_weight: float | None = None
+    estimated_one_rep_max: float | None = None
+    is_record: bool = False
+
+
+class BatchWriteResult(BaseModel):
+    id: str
+    status: BatchWriteStatus
@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Collection, Iterable
+
+from src.model import (
+    ExerciseHistoryEntry,
+    ExerciseRecord,
+    ExerciseStats,
+    SetLog,
+    WorkoutLog,
+)
+
+_ONE_REP_MAX_PRECISION = Decimal("0.01")
+
+
+def normalise_exercise_name(name: str) -> str:
+    """Normalise an exercise name, so that "Bench  Press" and "bench press" match."""
+    return " ".join(name.split()).casefold()
+
+
+def estimated_one_rep_max(weight: Decimal, reps: int) -> Decimal:
+    """Estimate the one rep max of a set with the Epley formula."""
+    if reps <= 1:
+        return weight
+    return (weight * (30 + reps) / 30).quantize(_ONE_REP_MAX_PRECISION)
+
+
+def _max(current: Decimal | None, value: Decimal) -> Decimal:
+    return value if current is None or value > current else current
+
+
+@dataclass
+class ExerciseTotals:
+    """Totals and bests of the sets of one exercise in one workout log."""
+
+    name: str
+    performed_at: str
+    set_count: int = 0
+    rep_count: int = 0
+    volume: Decimal = Decimal(0)
+    best_weight: Decimal | None = None
+    estimated_one_rep_max: Decimal | None = None
+
+    def add(self, set_log: SetLog) -> None:
+        self.set_count += 1
+        self.rep_count += set_log.reps
+        self.volume += set_log.weight * set_log.reps
+        if set_log.reps > 0:
+            self.best_weight = _max(self.best_weight, set_log.weight)
+            self.estimated_one_rep_max = _max(
+                self.estimated_one_rep_max,
+                estimated_one_rep_max(set_log.weight, set_log.reps),
+            )
+
+
+def history_entry_totals(entry: ExerciseHistoryEntry) -> ExerciseTotals:
+    """Total the sets of one exercise history entry."""
+    totals = ExerciseTotals(name=entry.name, performed_at=entry.performed_at)
+    for set_log in entry.sets:
+        totals.add(set_log)
+    return totals
+
+
+def exercise_totals(workout_log: WorkoutLog) -> dict[str, ExerciseTotals]:
+    """Total the sets of a workout log per exercise, keyed by normalised name."""
+    return {
+        key: history_entry_totals(entry)
+        for key, entry in exercise_history_entries(workout_log).items()
+    }
+
+
+def _empty_stats(name: str) -> ExerciseStats:
+    return ExerciseStats(
+        name=name, log_count=0, set_count=0, rep_count=0, total_volume=Decimal(0)
+    )
+
+
+def aggregate_exercise_stats(
+    workout_logs: Iterable[WorkoutLog], exercise: str | None = None
+) -> list[ExerciseStats]:
+    """Compute the stats of every exercise from a full workout log history.
+
+    Exercises are named as in their most recently performed log and sorted by
+    normalised name. With `exercise`, only the exercise of that normalised name
+    is aggregated.
+    """
+    stats: dict[str, ExerciseStats] = {}
+    for workout_log in workout_logs:
+        for key, totals in exercise_totals(workout_log).items():
+            if exercise is not None and key != exercise:
+                continue
+            if key not in stats:
+                stats[key] = _empty_stats(totals.name)
+            merge_exercise_totals(stats[key], totals)
+    return [stats[key] for key in sorted(stats)]
+
+
+def aggregate_exercise_history(
+    entries: Iterable[ExerciseHistoryEntry],
+) -> ExerciseStats | None:
+    """Compute the stats of one exercise from its history, if it has any."""
+    stats: ExerciseStats | None = None
+    for entry in entries:
+        if stats is None:
+            stats = _empty_stats(entry.name)
+        merge_exercise_totals(stats, history_entry_totals(entry))
+    return stats
+
+
+def merge_exercise_totals(stats: ExerciseStats, totals: ExerciseTotals) -> None:
+    """Add the totals of one more workout log to the stats of its exercise."""
+    stats.log_count += 1
+    stats.set_count += totals.set_count
+    stats.rep_count += totals.rep_count
+    stats.total_volume += totals.volume
+    if totals.best_weight is not None:
+        stats.best_weight = _max(stats.best_weight, totals.best_weight)
+    if totals.estimated_one_rep_max is not None:
+        stats.estimated_one_rep_max = _max(
+            stats.estimated_one_rep_max, totals.estimated_one_rep_max
+        )
+    if (
+        stats.last_performed_at is None
+        or totals.performed_at >= stats.last_performed_at
+    ):
+        stats.name = totals.name
+        stats.last_performed_at = totals.performed_at
+
+
+def record_key(record: ExerciseRecord) -> tuple[str, int]:
+    """Get the normalised exercise name and reps a record is kept for."""
+    return normalise_exercise_name(record.name), record.reps
+
+
+def history_entry_records(entry: ExerciseHistoryEntry) -> dict[int, ExerciseRecord]:
+    """Find the heaviest set of an exercise history entry per number of reps.
+
+    Sets with no reps hold no record.
+    """
+    records: dict[int, ExerciseRecord] = {}
+    for set_log in entry.sets:
+        if set_log.reps <= 0:
+            continue
+        if set_log.reps not in records or set_log.weight > records[set_log.reps].weight:
+            records[set_log.reps] = ExerciseRecord(
+                name=entry.name,
+                reps=set_log.reps,
+                weight=set_log.weight,
+                workout_log_id=entry.workout_log_id,
+                performed_at=entry.performed_at,
+            )
+    return records
+
+
+def exercise_records(workout_log: WorkoutLog) -> dict[tuple[str, int], ExerciseRecord]:
+    """Find the heaviest set of a workout log per exercise and number of reps.
+
+    Keyed by normalised exercise name and reps. Sets with no reps hold no record.
+    """
+    return {
+        (key, reps): record
+        for key, entry in exercise_history_entries(workout_log).items()
+        for reps, record in history_entry_records(entry).items()
+    }
+
+
+def beats_record(record: ExerciseRecord, current: ExerciseRecord) -> bool:
+    """Check whether a record beats another; of equal weights, the earlier wins."""
+    return record.weight > current.weight or (
+        record.weight == current.weight and record.performed_at < current.performed_at
+    )
+
+
+def best_exercise_records(
+    workout_logs: Iterable[WorkoutLog],
+    keys: Collection[tuple[str, int]] | None = None,
+) -> list[ExerciseRecord]:
+    """Find the records of every exercise and number of reps in a whole history.
+
+    Records are sorted by normalised exercise name and reps. With `keys`, only the
+    records of those normalised exercise names and reps are found.
+    """
+    records: dict[tuple[str, int], ExerciseRecord] = {}
+    for workout_log in workout_logs:
+        for key, record in exercise_records(workout_log).items():
+            if keys is not None and key not in keys:
+                continue
+            if key not in records or beats_record(record, records[key]):
+                records[key] = record
+    return [records[key] for key in sorted(records)]
+
+
+def best_history_records(
+    entries: Iterable[ExerciseHistoryEntry], reps: Collection[int] | None = None
+) -> list[ExerciseRecord]:
+    """Find the records of one exercise per number of reps in its history.
+
+    Records are sorted by reps. With `reps`, only the records of those reps are
+    found.
+    """
+    records: dict[int, ExerciseRecord] = {}
+    for entry in entries:
+        for key, record in history_entry_records(entry).items():
+            if reps is not None and key not in reps:
+                continue
+            if key not in records or beats_record(record, records[key]):
+                records[key] = record
+    return [records[key] for key in sorted(records)]
+
+
+def exercise_history_entries(
+    workout_log: WorkoutLog,
+) -> dict[str, ExerciseHistoryEntry]:
+    """Group the sets of a workout log by exercise, keyed by normalised name.
+
+    An exercise logged more than once in a workout log is one entry with every
+    one of its sets, named as it was first logged.
+    """
+    entries: dict[str, ExerciseHistoryEntry] = {}
+    for exercise_log in workout_log.logs:
+        key = normalise_exercise_name(exercise_log.name)
+        if key not in entries:
+            entries[key] = ExerciseHistoryEntry(
+                name=exercise_log.name,
+                workout_log_id=workout_log.id,
+                performed_at=workout_log.created_at,
+                sets=[],
+            )
+        entries[key].sets.extend(exercise_log.sets)
+    return entries
@@ -25,6 +25,7 @@ def aws_mock_envs(monkeypatch) -> None:
 
 @pytest.fixture
 def dynamodb_table(aws_mock_envs) -> Generator[str, None, None]:
+    repository.reset_dynamodb_tables()
     with mock_dynamodb():
         client: DynamoDBClient = boto3.client("dynamodb")  # type: ignore
         table_name = config.TABLE_NAME
@@ -57,6 +58,18 @@ def logs_repository(
     return repository.get_workout_logs_repository(table_name=dynamodb_table)
 
 
+@pytest.fixture
+def anyio_backend() -> str:
+    return "asyncio"
+
+
+@pytest.fixture
+def async_plans_repository(
+    plans_repository: repository.WorkoutRepository[model.WorkoutPlan],
+) -> repository.AsyncWorkoutRepository[model.WorkoutPlan]:
+    return repository.AsyncWorkoutRepositoryAdapter(plans_repository)
+
+
 @pytest.fixture
 def id_token(user_email) -> str:
     return jwt.encode({"cognito:username": user_email}, "secret")
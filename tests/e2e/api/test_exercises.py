@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from src import model
+from src.adapters import repository
+from tests.utils import add_workout_log_to_db
+
+
+def test_list_exercise_history(
+    client: TestClient,
+    API_V1_STR: str,
+    id_token: str,
+    user_email: str,
+    logs_repository: repository.WorkoutRepository[model.WorkoutLog],
+) -> None:
+    """
+    GIVEN a workout log
+    WHEN a GET request is made to /api/v1/exercises/{name}/history for one of its
+        exercises
+    THEN the response is 200 (ok) and the sets of that exercise are returned
+    """
+    workout_log = add_workout_log_to_db(
+        logs_repository=logs_repository, user_email=user_email
+    )
+    exercise_log = workout_log.logs[0]
+
+    response = client.get(
+        f"{API_V1_STR}/exercises/{exercise_log.name}/history",
+        headers={"Authorization": id_token},
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    (entry,) = response.json()
+    assert entry["workout_log_id"] == workout_log.id
+    assert entry["performed_at"] == workout_log.created_at
+    assert len(entry["sets"]) == sum(
+        len(log.sets) for log in workout_log.logs if log.name == exercise_log.name
+    )
+
+
+def test_list_exercise_history_invalid_cursor(
+    client: TestClient, API_V1_STR: str, id_token: str
+) -> None:
+    """
+    GIVEN a malformed cursor
+    WHEN a GET request is made to /api/v1/exercises/{name}/history with that cursor
+    THEN the response is 400 (bad request)
+    """
+    response = client.get(
+        f"{API_V1_STR}/exercises/squat/history",
+        params={"cursor": "not-a-cursor"},
+        headers={"Authorization": id_token},
+    )
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
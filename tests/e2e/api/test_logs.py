@@ -1,12 +1,16 @@
 from __future__ import annotations
 
+import json
+import logging
 from uuid import uuid4
 
+import pytest
 from fastapi import status
 from fastapi.testclient import TestClient
 
 from src import model
 from src.adapters import repository
+from src.config import config
 from tests.utils import add_workout_log_to_db
 
 
@@ -42,6 +46,42 @@ def test_create_workout_plan(
     assert body["id"] is not None
 
 
+def test_create_workout_logs_batch(
+    client: TestClient,
+    id_token: str,
+    API_V1_STR: str,
+    user_email: str,
+    logs_repository: repository.WorkoutRepository[model.WorkoutLog],
+) -> None:
+    """
+    GIVEN many valid workout logs
+    WHEN a POST request is made to /api/v1/logs/batch
+    THEN the response is 201 (created) with one created result per workout log
+    """
+    workout_logs_create = [
+        {
+            "name": f"test-log-{i}",
+            "plans": [{"name": "test-exercise", "sets": 1}],
+            "logs": [{"name": "test-exercise", "sets": [{"reps": 1, "weight": 1}]}],
+        }
+        for i in range(30)
+    ]
+
+    response = client.post(
+        f"{API_V1_STR}/logs/batch",
+        json=workout_logs_create,
+        headers={"Authorization": id_token},
+    )
+
+    assert response.status_code == status.HTTP_201_CREATED
+
+    body = response.json()
+    assert [result["status"] for result in body] == ["CREATED"] * 30
+    assert sorted(result["id"] for result in body) == sorted(
+        log.id for log in logs_repository.list(owner=user_email).items
+    )
+
+
 def test_get_workout_plan(
     client: TestClient,
     API_V1_STR: str,
@@ -69,6 +109,49 @@ def test_get_workout_plan(
     assert body["id"] == workout_log.id
 
 
+def test_get_workout_log_reports_dynamodb_calls(
+    client: TestClient,
+    API_V1_STR: str,
+    id_token: str,
+    user_email: str,
+    logs_repository: repository.WorkoutRepository[model.WorkoutLog],
+    caplog: pytest.LogCaptureFixture,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """
+    GIVEN a valid workout log
+    WHEN a GET request is made to /api/v1/logs/{log_id}, without and with
+        Server-Timing enabled
+    THEN its DynamoDB call is reported in a log line, and in the Server-Timing
+        header only once enabled
+    """
+    workout_log = add_workout_log_to_db(
+        logs_repository=logs_repository, user_email=user_email
+    )
+    response = client.get(
+        f"{API_V1_STR}/logs/{workout_log.id}", headers={"Authorization": id_token}
+    )
+    assert "Server-Timing" not in response.headers
+
+    monkeypatch.setattr(config, "SERVER_TIMING_ENABLED", True)
+
+    with caplog.at_level(logging.INFO, logger="src.api.instrumentation"):
+        response = client.get(
+            f"{API_V1_STR}/logs/{workout_log.id}", headers={"Authorization": id_token}
+        )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["Server-Timing"].startswith("dynamodb;dur=")
+    assert "1 calls, 0.5 RCU, 0 WCU" in response.headers["Server-Timing"]
+
+    line = json.loads(caplog.records[-1].getMessage())
+    assert line["path"] == f"{API_V1_STR}/logs/{workout_log.id}"
+    assert line["status"] == status.HTTP_200_OK
+    assert line["dynamodb_calls"] == 1
+    assert line["dynamodb_operations"] == {"GetItem": 1}
+    assert line["read_capacity_units"] == 0.5
+
+
 def test_get_workout_plan_not_found(
     client: TestClient, API_V1_STR: str, id_token: str
 ) -> None:
@@ -120,6 +203,166 @@ def test_list_workout_plans(
     assert body[1]["id"] in ids
 
 
+def test_list_workout_logs_with_fields(
+    client: TestClient,
+    API_V1_STR: str,
+    id_token: str,
+    user_email: str,
+    logs_repository: repository.WorkoutRepository[model.WorkoutLog],
+) -> None:
+    """
+    GIVEN a workout log
+    WHEN a GET request is made to /api/v1/logs with fields
+    THEN the response is 200 (ok) and only the id and those fields are returned
+    """
+    workout_log = add_workout_log_to_db(
+        logs_repository=logs_repository, user_email=user_email
+    )
+
+    response = client.get(
+        f"{API_V1_STR}/logs",
+        params={"fields": "name,created_at"},
+        headers={"Authorization": id_token},
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert "ETag" in response.headers
+    assert response.json() == [
+        {
+            "id": workout_log.id,
+            "name": workout_log.name,
+            "created_at": workout_log.created_at,
+        }
+    ]
+
+
+def test_list_workout_logs_with_unknown_fields(
+    client: TestClient, API_V1_STR: str, id_token: str
+) -> None:
+    """
+    GIVEN a field that workout log summaries do not have
+    WHEN a GET request is made to /api/v1/logs with that field
+    THEN the response is 400 (bad request)
+    """
+    response = client.get(
+        f"{API_V1_STR}/logs",
+        params={"fields": "name,logs"},
+        headers={"Authorization": id_token},
+    )
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert "logs" in response.json()["detail"]
+
+
+def test_list_workout_logs_paginated(
+    client: TestClient,
+    API_V1_STR: str,
+    id_token: str,
+    user_email: str,
+    logs_repository: repository.WorkoutRepository[model.WorkoutLog],
+) -> None:
+    """
+    GIVEN multiple workout logs
+    WHEN GET requests are made to /api/v1/logs with a limit and the returned cursor
+    THEN each workout log is returned once and the last page has no cursor header
+    """
+    workout_logs = [
+        add_workout_log_to_db(logs_repository=logs_repository, user_email=user_email)
+        for _ in range(3)
+    ]
+
+    response = client.get(
+        f"{API_V1_STR}/logs",
+        params={"limit": 2},
+        headers={"Authorization": id_token},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    first_page = response.json()
+    cursor = response.headers["X-Next-Cursor"]
+
+    response = client.get(
+        f"{API_V1_STR}/logs",
+        params={"limit": 2, "cursor": cursor},
+        headers={"Authorization": id_token},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    second_page = response.json()
+    assert "X-Next-Cursor" not in response.headers
+
+    assert sorted(log["id"] for log in first_page + second_page) == sorted(
+        log.id for log in workout_logs
+    )
+
+
+def test_list_workout_logs_ndjson_in_time_range(
+    client: TestClient,
+    API_V1_STR: str,
+    id_token: str,
+    user_email: str,
+    logs_repository: repository.WorkoutRepository[model.WorkoutLog],
+) -> None:
+    """
+    GIVEN a workout log
+    WHEN it is streamed as NDJSON since a time before and a time after its creation
+    THEN it is only streamed in the range that includes it
+    """
+    workout_log = add_workout_log_to_db(
+        logs_repository=logs_repository, user_email=user_email
+    )
+
+    response = client.get(
+        f"{API_V1_STR}/logs",
+        params={"format": "ndjson", "since": "2000-01-01T00:00:00"},
+        headers={"Authorization": id_token},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert [json.loads(line)["id"] for line in response.text.splitlines()] == [
+        workout_log.id
+    ]
+
+    response = client.get(
+        f"{API_V1_STR}/logs",
+        params={"format": "ndjson", "since": "2999-01-01T00:00:00"},
+        headers={"Authorization": id_token},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.text == ""
+
+
+def test_list_workout_logs_inverted_time_range(
+    client: TestClient, API_V1_STR: str, id_token: str
+) -> None:
+    """
+    GIVEN a time range that ends before it starts
+    WHEN a GET request is made to /api/v1/logs with that range
+    THEN the response is 400 (bad request)
+    """
+    response = client.get(
+        f"{API_V1_STR}/logs",
+        params={"since": "2021-01-02T00:00:00", "until": "2021-01-01T00:00:00Z"},
+        headers={"Authorization": id_token},
+    )
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_list_workout_logs_invalid_cursor(
+    client: TestClient, API_V1_STR: str, id_token: str
+) -> None:
+    """
+    GIVEN a malformed cursor
+    WHEN a GET request is made to /api/v1/logs with that cursor
+    THEN the response is 400 (bad request)
+    """
+    response = client.get(
+        f"{API_V1_STR}/logs",
+        params={"cursor": "not-a-cursor"},
+        headers={"Authorization": id_token},
+    )
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
 def test_update_workout_plan(
     client: TestClient,
     API_V1_STR: str,
@@ -150,6 +393,26 @@ def test_update_workout_plan(
     assert body["id"] == workout_log.id
 
 
+def test_update_workout_log_not_found(
+    client: TestClient, API_V1_STR: str, id_token: str
+) -> None:
+    """
+    GIVEN no workout logs
+    WHEN a PATCH request is made to /api/v1/logs/{log_id}
+    THEN the response is 404 (not found)
+    """
+    id = str(uuid4())
+
+    response = client.patch(
+        f"{API_V1_STR}/logs/{id}",
+        json={"name": "test-log-update"},
+        headers={"Authorization": id_token},
+    )
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert id in response.json()["detail"]
+
+
 def test_delete_workout_plan(
     client: TestClient,
     API_V1_STR: str,
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import re
+
+import pytest
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from src import model
+from src.adapters import repository
+from src.config import config
+from tests.utils import add_workout_log_to_db
+
+
+def _sample(text: str, name: str) -> float:
+    match = re.search(rf"^{re.escape(name)} (\S+)$", text, re.MULTILINE)
+    assert match, f"{name} not in metrics"
+    return float(match.group(1))
+
+
+def test_get_metrics(
+    client: TestClient,
+    API_V1_STR: str,
+    id_token: str,
+    user_email: str,
+    logs_repository: repository.WorkoutRepository[model.WorkoutLog],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """
+    GIVEN metrics are enabled and a workout log that was requested
+    WHEN a GET request is made to /metrics
+    THEN the request and its DynamoDB call are counted per route and method
+    """
+    monkeypatch.setattr(config, "METRICS_ENABLED", True)
+    workout_log = add_workout_log_to_db(
+        logs_repository=logs_repository, user_email=user_email
+    )
+    client.get(
+        f"{API_V1_STR}/logs/{workout_log.id}", headers={"Authorization": id_token}
+    )
+
+    response = client.get("/metrics")
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    route = f'method="GET",route="{API_V1_STR}/logs/{{log_id}}",status="200"'
+    assert _sample(response.text, f"http_requests_total{{{route}}}") >= 1
+    assert (
+        _sample(response.text, f"http_request_duration_seconds_count{{{route}}}") >= 1
+    )
+    dynamodb = 'repository="workout_logs",method="get",operation="GetItem"'
+    assert (
+        _sample(response.text, f"dynamodb_call_duration_seconds_count{{{dynamodb}}}")
+        >= 1
+    )
+    assert _sample(response.text, "http_requests_in_flight") == 1
+    assert 'cache_hit_ratio{workout_type="LOG"}' in response.text
+
+
+def test_get_metrics_not_enabled(client: TestClient) -> None:
+    """
+    GIVEN metrics are not enabled, as by default
+    WHEN a GET request is made to /metrics
+    THEN the response is 404 (not found)
+    """
+    response = client.get("/metrics")
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import json
 from uuid import uuid4
 
 from fastapi import status
@@ -7,7 +8,7 @@ from fastapi.testclient import TestClient
 
 from src import model
 from src.adapters import repository
-from tests.utils import add_workout_plan_to_db
+from tests.utils import add_workout_plan_to_db, random_workout_plan_create
 
 
 def test_create_workout_plan(
@@ -63,6 +64,46 @@ def test_get_workout_plan(
     assert body["id"] == workout_plan.id
 
 
+def test_get_many_workout_plans(
+    client: TestClient,
+    API_V1_STR: str,
+    id_token: str,
+    user_email: str,
+    plans_repository: repository.WorkoutRepository[model.WorkoutPlan],
+) -> None:
+    """
+    GIVEN multiple workout plans
+    WHEN a POST request is made to /api/v1/plans/get-many with their ids
+    THEN the response is 200 (ok) and the workout plans are returned in order
+    """
+    ids = [
+        add_workout_plan_to_db(
+            plans_repository=plans_repository, user_email=user_email
+        ).id
+        for _ in range(3)
+    ]
+
+    response = client.post(
+        f"{API_V1_STR}/plans/get-many",
+        json={"ids": [ids[2], str(uuid4()), ids[0]]},
+        headers={"Authorization": id_token},
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [plan["id"] for plan in response.json()] == [ids[2], ids[0]]
+
+
+def test_get_workout_plans_invalid_token(client: TestClient, API_V1_STR: str) -> None:
+    """
+    GIVEN an authorization header that is not a valid identity token
+    WHEN a GET request is made to /api/v1/plans
+    THEN the response is 401 (unauthorized)
+    """
+    response = client.get(f"{API_V1_STR}/plans", headers={"Authorization": "invalid"})
+
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
 def test_get_workout_plan_not_found(
     client: TestClient,
     API_V1_STR: str,
@@ -115,6 +156,61 @@ def test_list_workout_plans(
     assert body[1]["id"] in ids
 
 
+def test_list_workout_plans_without_limit(
+    client: TestClient,
+    API_V1_STR: str,
+    id_token: str,
+    user_email: str,
+    plans_repository: repository.WorkoutRepository[model.WorkoutPlan],
+) -> None:
+    """
+    GIVEN more than a hundred workout plans
+    WHEN a GET request is made to /api/v1/plans without a limit
+    THEN every workout plan is returned, without a cursor header
+    """
+    plans_repository.create_many(
+        models=[random_workout_plan_create() for _ in range(150)], owner=user_email
+    )
+
+    response = client.get(f"{API_V1_STR}/plans", headers={"Authorization": id_token})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.json()) == 150
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_list_workout_plans_ndjson(
+    client: TestClient,
+    API_V1_STR: str,
+    id_token: str,
+    user_email: str,
+    plans_repository: repository.WorkoutRepository[model.WorkoutPlan],
+) -> None:
+    """
+    GIVEN multiple workout plans
+    WHEN a GET request is made to /api/v1/plans?format=ndjson
+    THEN the response is 200 (ok) and every workout plan is streamed on its own line
+    """
+    workout_plans = [
+        add_workout_plan_to_db(plans_repository=plans_repository, user_email=user_email)
+        for _ in range(3)
+    ]
+
+    response = client.get(
+        f"{API_V1_STR}/plans",
+        params={"format": "ndjson"},
+        headers={"Authorization": id_token},
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["content-type"] == "application/x-ndjson"
+
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(line["id"] for line in lines) == sorted(
+        plan.id for plan in workout_plans
+    )
+
+
 def test_update_workout_plan(
     client: TestClient,
     API_V1_STR: str,
@@ -168,3 +264,117 @@ def test_delete_workout_plan(
     assert response.status_code == status.HTTP_204_NO_CONTENT
 
     assert plans_repository.get(id=workout_plan.id, owner=user_email) is None
+
+
+def test_delete_workout_plan_not_found(
+    client: TestClient, API_V1_STR: str, id_token: str
+) -> None:
+    """
+    GIVEN no workout plans
+    WHEN a DELETE request is made to /api/v1/plans/{plan_id}
+    THEN the response is 404 (not found)
+    """
+    id = str(uuid4())
+
+    response = client.delete(
+        f"{API_V1_STR}/plans/{id}", headers={"Authorization": id_token}
+    )
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
+    assert id in response.json()["detail"]
+
+
+def test_delete_workout_plan_returning_deleted(
+    client: TestClient,
+    API_V1_STR: str,
+    id_token: str,
+    user_email: str,
+    plans_repository: repository.WorkoutRepository[model.WorkoutPlan],
+) -> None:
+    """
+    GIVEN a valid workout plan
+    WHEN a DELETE request is made to /api/v1/plans/{plan_id}?return_deleted=true
+    THEN the response is 200 (ok) and the deleted workout plan is returned
+    """
+    workout_plan = add_workout_plan_to_db(
+        plans_repository=plans_repository, user_email=user_email
+    )
+
+    response = client.delete(
+        f"{API_V1_STR}/plans/{workout_plan.id}",
+        params={"return_deleted": True},
+        headers={"Authorization": id_token},
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json()["id"] == workout_plan.id
+    assert plans_repository.get(id=workout_plan.id, owner=user_email) is None
+
+
+def test_get_workout_plan_not_modified(
+    client: TestClient,
+    API_V1_STR: str,
+    id_token: str,
+    user_email: str,
+    plans_repository: repository.WorkoutRepository[model.WorkoutPlan],
+) -> None:
+    """
+    GIVEN a workout plan fetched with its ETag
+    WHEN it is fetched again with If-None-Match, before and after being patched
+    THEN the response is 304 (not modified) before and 200 (ok) after
+    """
+    workout_plan = add_workout_plan_to_db(
+        plans_repository=plans_repository, user_email=user_email
+    )
+    url = f"{API_V1_STR}/plans/{workout_plan.id}"
+    etag = client.get(url, headers={"Authorization": id_token}).headers["ETag"]
+
+    response = client.get(
+        url, headers={"Authorization": id_token, "If-None-Match": etag}
+    )
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert response.headers["ETag"] == etag
+
+    client.patch(url, json={"name": "patched"}, headers={"Authorization": id_token})
+    response = client.get(
+        url, headers={"Authorization": id_token, "If-None-Match": etag}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert response.headers["ETag"] != etag
+    assert response.json()["name"] == "patched"
+
+
+def test_list_workout_plans_not_modified(
+    client: TestClient,
+    API_V1_STR: str,
+    id_token: str,
+    user_email: str,
+    plans_repository: repository.WorkoutRepository[model.WorkoutPlan],
+) -> None:
+    """
+    GIVEN a list of workout plans fetched with its ETag
+    WHEN it is fetched again with If-None-Match, before and after a plan is added
+    THEN the response is 304 (not modified) before and 200 (ok) after
+    """
+    add_workout_plan_to_db(plans_repository=plans_repository, user_email=user_email)
+    url = f"{API_V1_STR}/plans"
+    etag = client.get(url, headers={"Authorization": id_token}).headers["ETag"]
+
+    response = client.get(
+        url, headers={"Authorization": id_token, "If-None-Match": etag}
+    )
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+
+    response = client.get(
+        url,
+        params={"limit": 1},
+        headers={"Authorization": id_token, "If-None-Match": etag},
+    )
+    assert response.status_code == status.HTTP_200_OK
+
+    add_workout_plan_to_db(plans_repository=plans_repository, user_email=user_email)
+    response = client.get(
+        url, headers={"Authorization": id_token, "If-None-Match": etag}
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.json()) == 2
@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+from decimal import Decimal
+
+import freezegun
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from src import model
+from src.adapters import repository
+from src.stats import aggregate_exercise_stats, best_exercise_records
+from tests.utils import add_workout_log_to_db
+
+
+def test_list_exercise_stats(
+    client: TestClient,
+    API_V1_STR: str,
+    id_token: str,
+    user_email: str,
+    logs_repository: repository.WorkoutRepository[model.WorkoutLog],
+) -> None:
+    """
+    GIVEN workout logs
+    WHEN a GET request is made to /api/v1/stats/exercises
+    THEN the response is 200 (ok) and the stats of every logged exercise are returned
+    """
+    workout_logs = [
+        add_workout_log_to_db(logs_repository=logs_repository, user_email=user_email)
+        for _ in range(2)
+    ]
+
+    response = client.get(
+        f"{API_V1_STR}/stats/exercises", headers={"Authorization": id_token}
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    expected = aggregate_exercise_stats(workout_logs)
+    assert sorted(stats["name"] for stats in response.json()) == sorted(
+        stats.name for stats in expected
+    )
+
+
+def test_get_exercise_progress(
+    client: TestClient,
+    API_V1_STR: str,
+    id_token: str,
+    user_email: str,
+    logs_repository: repository.WorkoutRepository[model.WorkoutLog],
+) -> None:
+    """
+    GIVEN a workout log
+    WHEN a GET request is made to /api/v1/stats/progress for one of its exercises
+    THEN the response is 200 (ok) and the progress of that exercise is returned
+    """
+    workout_log = add_workout_log_to_db(
+        logs_repository=logs_repository, user_email=user_email
+    )
+    exercise_log = workout_log.logs[0]
+
+    response = client.get(
+        f"{API_V1_STR}/stats/progress",
+        params={"exercise": exercise_log.name, "bucket": "month"},
+        headers={"Authorization": id_token},
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    (point,) = response.json()
+    assert point["set_count"] == len(exercise_log.sets)
+    assert point["is_record"] is (
+        any(set_log.reps > 0 for set_log in exercise_log.sets)
+    )
+
+
+def test_get_exercise_progress_in_time_range(
+    client: TestClient,
+    API_V1_STR: str,
+    id_token: str,
+    user_email: str,
+    logs_repository: repository.WorkoutRepository[model.WorkoutLog],
+) -> None:
+    """
+    GIVEN workout logs of an exercise created on different days
+    WHEN a GET request is made to /api/v1/stats/progress with a time range
+    THEN only the days in the range are returned, and an inverted range is 400
+    """
+    for day in (1, 2, 3):
+        with freezegun.freeze_time(f"2021-01-0{day}T12:00:00+00:00"):
+            logs_repository.create(
+                model=model.WorkoutLogCreate(
+                    name="workout",
+                    plans=[],
+                    logs=[
+                        model.ExerciseLog(
+                            name="Squat",
+                            sets=[model.SetLog(weight=Decimal(100 + day), reps=5)],
+                        )
+                    ],
+                ),
+                owner=user_email,
+            )
+
+    response = client.get(
+        f"{API_V1_STR}/stats/progress",
+        params={
+            "exercise": "squat",
+            "bucket": "day",
+            "since": "2021-01-02T00:00:00",
+            "until": "2021-01-03T00:00:00",
+        },
+        headers={"Authorization": id_token},
+    )
+    assert response.status_code == status.HTTP_200_OK
+    assert [point["best_weight"] for point in response.json()] == [102]
+
+    response = client.get(
+        f"{API_V1_STR}/stats/progress",
+        params={
+            "exercise": "squat",
+            "since": "2021-01-03T00:00:00",
+            "until": "2021-01-02T00:00:00",
+        },
+        headers={"Authorization": id_token},
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_list_exercise_records(
+    client: TestClient,
+    API_V1_STR: str,
+    id_token: str,
+    user_email: str,
+    logs_repository: repository.WorkoutRepository[model.WorkoutLog],
+) -> None:
+    """
+    GIVEN workout logs
+    WHEN a GET request is made to /api/v1/stats/records
+    THEN the response is 200 (ok) and the records of every exercise are returned
+    """
+    workout_logs = [
+        add_workout_log_to_db(logs_repository=logs_repository, user_email=user_email)
+        for _ in range(2)
+    ]
+
+    response = client.get(
+        f"{API_V1_STR}/stats/records", headers={"Authorization": id_token}
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    expected = best_exercise_records(workout_logs)
+    assert [
+        (record["name"], record["reps"], record["workout_log_id"])
+        for record in response.json()
+    ] == [(record.name, record.reps, record.workout_log_id) for record in expected]
+
+
+def test_list_records_of_exercise(
+    client: TestClient,
+    API_V1_STR: str,
+    id_token: str,
+    user_email: str,
+    logs_repository: repository.WorkoutRepository[model.WorkoutLog],
+) -> None:
+    """
+    GIVEN a workout log
+    WHEN a GET request is made to /api/v1/stats/records/{exercise}
+    THEN the response is 200 (ok) and the records of that exercise are returned
+    """
+    workout_log = add_workout_log_to_db(
+        logs_repository=logs_repository, user_email=user_email
+    )
+    exercise = workout_log.logs[0].name
+
+    response = client.get(
+        f"{API_V1_STR}/stats/records/{exercise}",
+        headers={"Authorization": id_token},
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    expected = [
+        record
+        for record in best_exercise_records([workout_log])
+        if record.name == exercise
+    ]
+    assert [record["reps"] for record in response.json()] == [
+        record.reps for record in expected
+    ]
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import pytest
+
+from src import model
+from src.adapters import repository
+from src.config import RepositoryBackend, config
+
+
+@pytest.fixture(
+    params=list(RepositoryBackend), ids=[backend.value for backend in RepositoryBackend]
+)
+def repository_backend(
+    request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch
+) -> RepositoryBackend:
+    """Run a test against every repository backend."""
+    backend: RepositoryBackend = request.param
+    if backend == RepositoryBackend.DYNAMODB:
+        request.getfixturevalue("dynamodb_table")
+    if backend == RepositoryBackend.SQLITE:
+        tmp_path = request.getfixturevalue("tmp_path")
+        monkeypatch.setattr(config, "SQLITE_PATH", str(tmp_path / "workouts.db"))
+        request.addfinalizer(repository.reset_sqlite_repositories)
+    monkeypatch.setattr(config, "REPOSITORY_BACKEND", backend)
+    repository.reset_memory_repositories()
+    return backend
+
+
+@pytest.fixture
+def plans_repository(
+    repository_backend: RepositoryBackend,
+) -> repository.WorkoutRepository[model.WorkoutPlan]:
+    return repository.get_workout_plans_repository()
+
+
+@pytest.fixture
+def logs_repository(
+    repository_backend: RepositoryBackend,
+) -> repository.WorkoutRepository[model.WorkoutLog]:
+    return repository.get_workout_logs_repository()
+
+
+@pytest.fixture
+def dynamodb_plans_repository(
+    dynamodb_table: str,
+) -> repository.DynamoDBWorkoutPlanRepository:
+    return repository.DynamoDBWorkoutPlanRepository(
+        repository.get_dynamodb_table(dynamodb_table, None),
+        workout_type=model.WorkoutType.PLAN,
+        model=model.WorkoutPlan,
+    )
+
+
+@pytest.fixture
+def dynamodb_logs_repository(
+    dynamodb_table: str,
+) -> repository.DynamoDBWorkoutLogRepository:
+    return repository.DynamoDBWorkoutLogRepository(
+        repository.get_dynamodb_table(dynamodb_table, None),
+        workout_type=model.WorkoutType.LOG,
+        model=model.WorkoutLog,
+    )
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import anyio
+import pytest
+
+from src import model
+from src.adapters import repository
+
+
+def _workout_plan_create(name: str = "test-plan") -> model.WorkoutPlanCreate:
+    return model.WorkoutPlanCreate(
+        name=name, exercises=[model.ExercisePlan(name="test-exercise", sets=3)]
+    )
+
+
+@pytest.mark.anyio
+async def test_create_and_get_workout_plan(
+    async_plans_repository: repository.AsyncWorkoutRepository[model.WorkoutPlan],
+    user_email: str,
+) -> None:
+    """
+    GIVEN a valid workout plan
+    WHEN a workout plan is created through the async repository
+    THEN the workout plan can be retrieved
+    """
+    workout_plan = await async_plans_repository.create(
+        model=_workout_plan_create(), owner=user_email
+    )
+
+    workout_plan_retrieved = await async_plans_repository.get(
+        id=workout_plan.id, owner=user_email
+    )
+    assert workout_plan_retrieved == workout_plan
+
+
+@pytest.mark.anyio
+async def test_concurrent_creates_are_all_listed(
+    async_plans_repository: repository.AsyncWorkoutRepository[model.WorkoutPlan],
+    user_email: str,
+) -> None:
+    """
+    GIVEN many workout plans created concurrently
+    WHEN the workout plans are listed
+    THEN every workout plan is returned
+    """
+    async with anyio.create_task_group() as tg:
+        for i in range(20):
+            tg.start_soon(
+                lambda i=i: async_plans_repository.create(
+                    model=_workout_plan_create(name=f"plan-{i}"), owner=user_email
+                )
+            )
+
+    workout_plans = await async_plans_repository.list(owner=user_email)
+    assert sorted(plan.name for plan in workout_plans.items) == sorted(
+        f"plan-{i}" for i in range(20)
+    )
+
+
+@pytest.mark.anyio
+async def test_delete_workout_plan(
+    async_plans_repository: repository.AsyncWorkoutRepository[model.WorkoutPlan],
+    user_email: str,
+) -> None:
+    """
+    GIVEN a valid workout plan
+    WHEN that workout plan is deleted through the async repository
+    THEN the workout plan is no longer returned
+    """
+    workout_plan = await async_plans_repository.create(
+        model=_workout_plan_create(), owner=user_email
+    )
+
+    await async_plans_repository.delete(id=workout_plan.id, owner=user_email)
+
+    assert (
+        await async_plans_repository.get(id=workout_plan.id, owner=user_email) is None
+    )
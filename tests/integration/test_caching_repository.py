@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import pytest
+
+from src import model
+from src.adapters import repository
+from src.adapters.cache import InMemoryCacheBackend
+from tests.utils import add_workout_plan_to_db
+
+
+@pytest.fixture
+def caching_plans_repository(
+    plans_repository: repository.WorkoutRepository[model.WorkoutPlan],
+) -> repository.CachingWorkoutRepository[model.WorkoutPlan]:
+    return repository.CachingWorkoutRepository(
+        plans_repository,
+        backend=InMemoryCacheBackend(max_entries=100, ttl=60),
+        namespace="WORKOUT_PLAN",
+    )
+
+
+def test_get_is_served_from_cache(
+    caching_plans_repository: repository.CachingWorkoutRepository[model.WorkoutPlan],
+    plans_repository: repository.WorkoutRepository[model.WorkoutPlan],
+    user_email: str,
+) -> None:
+    """
+    GIVEN a workout plan that has been read once
+    WHEN it is read again after being removed behind the cache's back
+    THEN the cached workout plan is returned and a hit is counted
+    """
+    workout_plan = add_workout_plan_to_db(
+        plans_repository=caching_plans_repository, user_email=user_email
+    )
+    assert caching_plans_repository.get(id=workout_plan.id, owner=user_email)
+    plans_repository.delete(workout_plan.id, owner=user_email)
+
+    cached = caching_plans_repository.get(id=workout_plan.id, owner=user_email)
+
+    assert cached == workout_plan
+    assert caching_plans_repository.stats.hits == 1
+    assert caching_plans_repository.stats.misses == 1
+
+
+def test_list_is_invalidated_by_writes(
+    caching_plans_repository: repository.CachingWorkoutRepository[model.WorkoutPlan],
+    user_email: str,
+) -> None:
+    """
+    GIVEN a cached list of workout plans
+    WHEN workout plans are created, patched and deleted through the cache
+    THEN the next list reflects each write
+    """
+    workout_plan = add_workout_plan_to_db(
+        plans_repository=caching_plans_repository, user_email=user_email
+    )
+    assert len(caching_plans_repository.list(owner=user_email).items) == 1
+    assert len(caching_plans_repository.list(owner=user_email).items) == 1
+    assert caching_plans_repository.stats.hits == 1
+
+    add_workout_plan_to_db(
+        plans_repository=caching_plans_repository, user_email=user_email
+    )
+    assert len(caching_plans_repository.list(owner=user_email).items) == 2
+
+    caching_plans_repository.patch(
+        id=workout_plan.id,
+        update_model=model.WorkoutPlanUpdate(name="patched"),
+        owner=user_email,
+    )
+    assert "patched" in {
+        plan.name for plan in caching_plans_repository.list(owner=user_email).items
+    }
+    assert caching_plans_repository.get(id=workout_plan.id, owner=user_email).name == (
+        "patched"
+    )
+
+    caching_plans_repository.delete(workout_plan.id, owner=user_email)
+    assert len(caching_plans_repository.list(owner=user_email).items) == 1
+    assert caching_plans_repository.get(id=workout_plan.id, owner=user_email) is None
+
+
+def test_updates_leave_cached_workout_plans_unchanged(
+    caching_plans_repository: repository.CachingWorkoutRepository[model.WorkoutPlan],
+    user_email: str,
+) -> None:
+    """
+    GIVEN a cached workout plan
+    WHEN the cached instance is updated through the cache
+    THEN the updated workout plan is returned and the cached instance is unchanged
+    """
+    workout_plan = add_workout_plan_to_db(
+        plans_repository=caching_plans_repository, user_email=user_email
+    )
+    cached = caching_plans_repository.get(id=workout_plan.id, owner=user_email)
+    stored = cached.copy(deep=True)
+
+    updated = caching_plans_repository.update(
+        id=workout_plan.id,
+        update_model=model.WorkoutPlanUpdate(name="updated"),
+        db_model=cached,
+        owner=user_email,
+    )
+
+    assert updated.name == "updated"
+    assert cached == stored
+
+
+def test_list_is_not_served_from_cache_after_writes_elsewhere(
+    caching_plans_repository: repository.CachingWorkoutRepository[model.WorkoutPlan],
+    plans_repository: repository.WorkoutRepository[model.WorkoutPlan],
+    user_email: str,
+) -> None:
+    """
+    GIVEN a cached list of workout plans
+    WHEN a workout plan is created behind the cache's back, as by another process
+    THEN the next list reflects the write, under the collection version it read
+    """
+    add_workout_plan_to_db(
+        plans_repository=caching_plans_repository, user_email=user_email
+    )
+    assert len(caching_plans_repository.list(owner=user_email).items) == 1
+
+    add_workout_plan_to_db(plans_repository=plans_repository, user_email=user_email)
+
+    assert len(caching_plans_repository.list(owner=user_email).items) == 2
+    assert caching_plans_repository.stats.hits == 0
+
+
+def test_get_many_only_fetches_uncached_workout_plans(
+    caching_plans_repository: repository.CachingWorkoutRepository[model.WorkoutPlan],
+    user_email: str,
+) -> None:
+    """
+    GIVEN one cached and one uncached workout plan
+    WHEN both are fetched by id
+    THEN both are returned in order with one hit and one miss counted
+    """
+    workout_plans = [
+        add_workout_plan_to_db(
+            plans_repository=caching_plans_repository, user_email=user_email
+        )
+        for _ in range(2)
+    ]
+    caching_plans_repository.get(id=workout_plans[1].id, owner=user_email)
+    caching_plans_repository.stats = repository.CacheStats()
+
+    fetched = caching_plans_repository.get_many(
+        ids=[workout_plans[1].id, workout_plans[0].id], owner=user_email
+    )
+
+    assert fetched == [workout_plans[1], workout_plans[0]]
+    assert caching_plans_repository.stats == repository.CacheStats(hits=1, misses=1)
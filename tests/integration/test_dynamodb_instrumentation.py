@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+from src.adapters import repository
+from tests.utils import add_workout_log_to_db
+
+
+def test_dynamodb_calls_are_collected(
+    dynamodb_logs_repository: repository.DynamoDBWorkoutLogRepository,
+    user_email: str,
+) -> None:
+    """
+    GIVEN a DynamoDB workout log repository
+    WHEN workout logs are created, read and listed while collecting DynamoDB calls
+    THEN every call is collected with its operation, items and consumed capacity
+    """
+    with repository.collect_dynamodb_calls() as calls:
+        workout_log = add_workout_log_to_db(
+            logs_repository=dynamodb_logs_repository, user_email=user_email
+        )
+        write_calls = len(calls.calls)
+        dynamodb_logs_repository.get(id=workout_log.id, owner=user_email)
+        dynamodb_logs_repository.list(owner=user_email)
+
+    reads = calls.calls[write_calls:]
+    assert [call.operation for call in reads] == ["GetItem", "Query"]
+    assert [call.items for call in reads] == [1, 1]
+    assert all(call.read_capacity > 0 and call.write_capacity == 0 for call in reads)
+    assert calls.write_capacity > 0
+    assert all(call.duration > 0 for call in calls.calls)
+    assert calls.operations["GetItem"] == 1
+
+
+def test_dynamodb_calls_are_only_collected_in_scope(
+    dynamodb_logs_repository: repository.DynamoDBWorkoutLogRepository,
+    user_email: str,
+) -> None:
+    """
+    GIVEN a DynamoDB workout log repository
+    WHEN a workout log is read outside the scope of a collection
+    THEN the collection does not include the call
+    """
+    with repository.collect_dynamodb_calls() as calls:
+        pass
+    dynamodb_logs_repository.list(owner=user_email)
+
+    assert calls.calls == []
+    assert calls.operations == {}
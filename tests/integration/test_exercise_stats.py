@@ -0,0 +1,389 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import freezegun
+import pytest
+from botocore.exceptions import ClientError
+
+from src import model
+from src.adapters import repository
+from src.stats import (
+    aggregate_exercise_stats,
+    best_exercise_records,
+    exercise_history_entries,
+)
+
+
+@pytest.fixture
+def stats_repository(
+    logs_repository: repository.WorkoutRepository[model.WorkoutLog],
+) -> repository.ExerciseStatsRepository:
+    return repository.get_exercise_stats_repository()
+
+
+def _exercise_log(name: str, *sets: tuple[str, int]) -> model.ExerciseLog:
+    return model.ExerciseLog(
+        name=name,
+        sets=[model.SetLog(weight=Decimal(weight), reps=reps) for weight, reps in sets],
+    )
+
+
+def _create(
+    logs_repository: repository.WorkoutRepository[model.WorkoutLog],
+    user_email: str,
+    at: str,
+    *logs: model.ExerciseLog,
+) -> model.WorkoutLog:
+    with freezegun.freeze_time(at):
+        return logs_repository.create(
+            model=model.WorkoutLogCreate(name="workout", plans=[], logs=list(logs)),
+            owner=user_email,
+        )
+
+
+def _assert_stats_match_history(
+    stats_repository: repository.ExerciseStatsRepository,
+    logs_repository: repository.WorkoutRepository[model.WorkoutLog],
+    user_email: str,
+) -> None:
+    assert stats_repository.list_exercise_stats(owner=user_email) == (
+        aggregate_exercise_stats(logs_repository.iter_items(owner=user_email))
+    )
+    assert stats_repository.list_exercise_records(owner=user_email) == (
+        best_exercise_records(logs_repository.iter_items(owner=user_email))
+    )
+    histories: dict[str, list[model.ExerciseHistoryEntry]] = {}
+    for workout_log in logs_repository.iter_items(owner=user_email):
+        for exercise, entry in exercise_history_entries(workout_log).items():
+            histories.setdefault(exercise, []).append(entry)
+    for exercise, entries in histories.items():
+        page = stats_repository.list_exercise_history(
+            owner=user_email, exercise=exercise
+        )
+        assert page.items == sorted(entries, key=lambda entry: entry.performed_at)
+
+
+def test_exercise_stats_follow_workout_log_writes(
+    stats_repository: repository.ExerciseStatsRepository,
+    logs_repository: repository.WorkoutRepository[model.WorkoutLog],
+    user_email: str,
+) -> None:
+    """
+    GIVEN workout logs that are created, updated, patched and deleted
+    WHEN exercise stats are listed after each write
+    THEN they always equal the stats computed from the whole workout log history
+    """
+    first = _create(
+        logs_repository,
+        user_email,
+        "2021-01-01",
+        _exercise_log("Bench Press", ("100", 5), ("90", 8)),
+        _exercise_log("Squat", ("140", 5)),
+    )
+    second = _create(
+        logs_repository,
+        user_email,
+        "2021-01-02",
+        _exercise_log("bench press", ("110", 2)),
+    )
+    _assert_stats_match_history(stats_repository, logs_repository, user_email)
+
+    # Removing the best set recomputes the bests from the remaining history.
+    logs_repository.patch(
+        id=second.id,
+        update_model=model.WorkoutLogUpdate(
+            logs=[_exercise_log("Bench Press", ("95", 5))]
+        ),
+        owner=user_email,
+    )
+    _assert_stats_match_history(stats_repository, logs_repository, user_email)
+
+    logs_repository.update(
+        id=first.id,
+        update_model=model.WorkoutLogUpdate(
+            logs=[_exercise_log("Deadlift", ("180", 3))]
+        ),
+        db_model=first,
+        owner=user_email,
+    )
+    _assert_stats_match_history(stats_repository, logs_repository, user_email)
+
+    logs_repository.delete(id=second.id, owner=user_email)
+    _assert_stats_match_history(stats_repository, logs_repository, user_email)
+
+    logs_repository.delete(id=first.id, owner=user_email)
+    assert stats_repository.list_exercise_stats(owner=user_email) == []
+    assert stats_repository.list_exercise_records(owner=user_email) == []
+
+
+def test_exercise_stats_of_created_workout_logs(
+    stats_repository: repository.ExerciseStatsRepository,
+    logs_repository: repository.WorkoutRepository[model.WorkoutLog],
+    user_email: str,
+) -> None:
+    """
+    GIVEN workout logs created in a batch
+    WHEN exercise stats are listed
+    THEN they total every set of every workout log
+    """
+    logs_repository.create_many(
+        models=[
+            model.WorkoutLogCreate(
+                name=f"workout-{i}",
+                plans=[],
+                logs=[_exercise_log("Squat", (str(100 + i), 5))],
+            )
+            for i in range(3)
+        ],
+        owner=user_email,
+    )
+
+    (squat,) = stats_repository.list_exercise_stats(owner=user_email)
+    assert squat.log_count == 3
+    assert squat.set_count == 3
+    assert squat.total_volume == Decimal(5 * (100 + 101 + 102))
+    assert squat.best_weight == Decimal(102)
+
+
+def test_exercise_records_of_one_exercise(
+    stats_repository: repository.ExerciseStatsRepository,
+    logs_repository: repository.WorkoutRepository[model.WorkoutLog],
+    user_email: str,
+) -> None:
+    """
+    GIVEN workout logs of exercises whose names share a prefix
+    WHEN the records of one exercise are listed
+    THEN only its records are returned, by reps, with the name matched loosely
+    """
+    _create(
+        logs_repository,
+        user_email,
+        "2021-01-01",
+        _exercise_log("Bench Press", ("80", 10), ("100", 2), ("95", 3)),
+        _exercise_log("Bench Press Incline", ("70", 5)),
+    )
+    heaviest = _create(
+        logs_repository,
+        user_email,
+        "2021-01-02",
+        _exercise_log("bench press", ("105", 2)),
+    )
+
+    records = stats_repository.list_exercise_records(
+        owner=user_email, exercise="BENCH  press"
+    )
+
+    assert [(record.reps, record.weight) for record in records] == [
+        (2, Decimal(105)),
+        (3, Decimal(95)),
+        (10, Decimal(80)),
+    ]
+    assert records[0].workout_log_id == heaviest.id
+    assert records[0].name == "bench press"
+
+
+def test_exercise_history_pages(
+    stats_repository: repository.ExerciseStatsRepository,
+    logs_repository: repository.WorkoutRepository[model.WorkoutLog],
+    user_email: str,
+) -> None:
+    """
+    GIVEN workout logs, some of which have an exercise
+    WHEN the history of that exercise is listed a page at a time
+    THEN every workout log with the exercise is returned once, oldest first
+    """
+    squat_logs = [
+        _create(
+            logs_repository,
+            user_email,
+            f"2021-01-0{day}",
+            _exercise_log("Squat", (str(100 + day), 5)),
+        )
+        for day in range(1, 6)
+    ]
+    _create(logs_repository, user_email, "2021-01-06", _exercise_log("Deadlift"))
+
+    ids: list[str] = []
+    cursor = None
+    while True:
+        page = stats_repository.list_exercise_history(
+            owner=user_email, exercise="squat", limit=2, cursor=cursor
+        )
+        assert len(page.items) <= 2
+        ids.extend(entry.workout_log_id for entry in page.items)
+        if not (cursor := page.next_cursor):
+            break
+
+    assert ids == [workout_log.id for workout_log in squat_logs]
+    newest_first = stats_repository.list_exercise_history(
+        owner=user_email, exercise="SQUAT", newest_first=True
+    )
+    assert [entry.workout_log_id for entry in newest_first.items] == ids[::-1]
+
+
+def test_exercise_history_is_listed_in_time_range(
+    stats_repository: repository.ExerciseStatsRepository,
+    logs_repository: repository.WorkoutRepository[model.WorkoutLog],
+    user_email: str,
+) -> None:
+    """
+    GIVEN workout logs of an exercise created on different days
+    WHEN its history is listed since, until and between times
+    THEN only the workout logs created in the range are returned, bounds included
+    """
+    squat_logs = [
+        _create(logs_repository, user_email, at, _exercise_log("Squat", ("100", 5)))
+        for at in ("2021-01-01", "2021-01-02T12:00:00.5", "2021-01-03")
+    ]
+
+    def history_ids(**time_range: datetime) -> list[str]:
+        page = stats_repository.list_exercise_history(
+            owner=user_email, exercise="squat", **time_range
+        )
+        return [entry.workout_log_id for entry in page.items]
+
+    ids = [workout_log.id for workout_log in squat_logs]
+    assert history_ids(since=datetime(2021, 1, 1)) == ids
+    assert history_ids(since=datetime(2021, 1, 1, 0, 0, 0, 1)) == ids[1:]
+    assert history_ids(until=datetime(2021, 1, 2, 12, 0, 0, 500000)) == ids[:2]
+    assert history_ids(until=datetime(2021, 1, 2, 12, 0, 0, 499999)) == ids[:1]
+    assert (
+        history_ids(
+            since=datetime(2021, 1, 2, tzinfo=timezone.utc),
+            until=datetime(2021, 1, 3, tzinfo=timezone.utc),
+        )
+        == ids[1:]
+    )
+
+
+def test_exercise_stats_of_a_batch_are_written_once_per_exercise(
+    dynamodb_logs_repository: repository.DynamoDBWorkoutLogRepository,
+    user_email: str,
+) -> None:
+    """
+    GIVEN workout logs of one exercise created in a batch, then one that beats nothing
+    WHEN the DynamoDB calls of each write are collected
+    THEN the batch updates the exercise's stats and record once each, and the
+    workout log that beats nothing writes no bests or records
+    """
+    with repository.collect_dynamodb_calls() as calls:
+        dynamodb_logs_repository.create_many(
+            models=[
+                model.WorkoutLogCreate(
+                    name=f"workout-{i}",
+                    plans=[],
+                    logs=[_exercise_log("Squat", (str(100 + i), 5))],
+                )
+                for i in range(10)
+            ],
+            owner=user_email,
+        )
+    # Stats, the five reps record and the collection version are updated once.
+    assert calls.operations == {"BatchWriteItem": 2, "BatchGetItem": 1, "UpdateItem": 3}
+
+    with repository.collect_dynamodb_calls() as calls:
+        _create(
+            dynamodb_logs_repository,
+            user_email,
+            "2021-01-01",
+            _exercise_log("Squat", ("50", 5)),
+        )
+    assert calls.operations == {
+        "PutItem": 1,
+        "BatchWriteItem": 1,
+        "BatchGetItem": 1,
+        "UpdateItem": 2,
+    }
+
+
+def test_exercise_stats_errors_leave_workout_log_writes(
+    dynamodb_logs_repository: repository.DynamoDBWorkoutLogRepository,
+    user_email: str,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """
+    GIVEN a workout log holding the best set of its exercise
+    WHEN it is deleted while the exercise history cannot be read to recompute bests
+    THEN the workout log is deleted regardless
+    """
+    workout_log = _create(
+        dynamodb_logs_repository,
+        user_email,
+        "2021-01-01",
+        _exercise_log("Squat", ("100", 5)),
+    )
+    _create(
+        dynamodb_logs_repository,
+        user_email,
+        "2021-01-02",
+        _exercise_log("Squat", ("90", 5)),
+    )
+
+    def failing_query(**kwargs):
+        raise ClientError(
+            {"Error": {"Code": "InternalServerError", "Message": "failed"}}, "Query"
+        )
+
+    monkeypatch.setattr(dynamodb_logs_repository._table, "query", failing_query)
+
+    dynamodb_logs_repository.delete(id=workout_log.id, owner=user_email)
+
+    monkeypatch.undo()
+    assert dynamodb_logs_repository.get(id=workout_log.id, owner=user_email) is None
+
+
+def test_rebuilt_exercise_stats_follow_workout_log_writes(
+    dynamodb_logs_repository: repository.DynamoDBWorkoutLogRepository,
+    user_email: str,
+) -> None:
+    """
+    GIVEN workout logs whose stats and records were never kept, and a stale stat
+    WHEN the stats are rebuilt and a workout log is then deleted
+    THEN the stats always equal those computed from the whole workout log history
+    """
+    stats_repository = repository.DynamoDBExerciseStatsRepository(
+        dynamodb_logs_repository._table
+    )
+    first = _create(
+        dynamodb_logs_repository,
+        user_email,
+        "2021-01-01",
+        _exercise_log("Bench Press", ("100", 5)),
+        _exercise_log("Squat", ("140", 5)),
+    )
+    _create(
+        dynamodb_logs_repository,
+        user_email,
+        "2021-01-02",
+        _exercise_log("bench press", ("110", 2)),
+    )
+    table = dynamodb_logs_repository._table
+    for pk in (
+        f"OWNER#{user_email}#EXERCISE_STATS",
+        f"OWNER#{user_email}#EXERCISE_RECORDS",
+    ):
+        for item in table.query(
+            KeyConditionExpression="PK = :pk", ExpressionAttributeValues={":pk": pk}
+        )["Items"]:
+            table.delete_item(Key={"PK": item["PK"], "SK": item["SK"]})
+    table.put_item(
+        Item={
+            "PK": f"OWNER#{user_email}#EXERCISE_STATS",
+            "SK": "EXERCISE#deadlift",
+            "name": "Deadlift",
+            "log_count": 1,
+            "set_count": 1,
+            "rep_count": 1,
+            "total_volume": 200,
+        }
+    )
+
+    stats_repository.rebuild(
+        user_email, dynamodb_logs_repository.iter_items(owner=user_email)
+    )
+    _assert_stats_match_history(stats_repository, dynamodb_logs_repository, user_email)
+
+    dynamodb_logs_repository.delete(id=first.id, owner=user_email)
+    _assert_stats_match_history(stats_repository, dynamodb_logs_repository, user_email)
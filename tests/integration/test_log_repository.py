@@ -0,0 +1,362 @@
+from __future__ import annotations
+
+import json
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import Any
+from uuid import UUID, uuid4
+
+import freezegun
+import pytest
+from boto3.dynamodb.types import Binary
+
+from migrate_workout_log_keys import legacy_log_items, migrate_item
+from src import model
+from src.adapters import repository
+from tests.utils import add_workout_log_to_db
+
+
+def _add_workout_log_at(
+    logs_repository: repository.WorkoutRepository[model.WorkoutLog],
+    user_email: str,
+    at: str,
+) -> model.WorkoutLog:
+    with freezegun.freeze_time(at):
+        return add_workout_log_to_db(
+            logs_repository=logs_repository, user_email=user_email
+        )
+
+
+def _add_legacy_workout_log(
+    logs_repository: repository.DynamoDBWorkoutLogRepository,
+    user_email: str,
+    *logs: model.ExerciseLog,
+) -> model.WorkoutLog:
+    workout_log = model.WorkoutLog(
+        id=str(uuid4()), name="legacy-log", plans=[], logs=list(logs)
+    )
+    logs_repository._table.put_item(
+        Item={
+            "PK": f"OWNER#{user_email}#WORKOUT_LOG",
+            "SK": f"WORKOUT_PLAN#{workout_log.id}",
+            "owner": user_email,
+            **workout_log.dict(),
+        }
+    )
+    return workout_log
+
+
+def test_workout_log_ids_are_time_ordered(
+    logs_repository: repository.WorkoutRepository[model.WorkoutLog],
+    user_email: str,
+) -> None:
+    """
+    GIVEN workout logs created at different times
+    WHEN they are listed
+    THEN they are returned oldest first, or newest first if asked
+    """
+    workout_logs = [
+        _add_workout_log_at(logs_repository, user_email, at)
+        for at in ("2021-01-03", "2021-01-01", "2021-01-02")
+    ]
+    assert all(UUID(log.id).version == 7 for log in workout_logs)
+    oldest_first = [workout_logs[1].id, workout_logs[2].id, workout_logs[0].id]
+
+    listed = logs_repository.list(owner=user_email).items
+    assert [log.id for log in listed] == oldest_first
+
+    listed = logs_repository.list(owner=user_email, newest_first=True).items
+    assert [log.id for log in listed] == oldest_first[::-1]
+
+
+def test_list_workout_logs_in_time_range(
+    logs_repository: repository.WorkoutRepository[model.WorkoutLog],
+    user_email: str,
+) -> None:
+    """
+    GIVEN workout logs created on different days
+    WHEN workout logs are listed or iterated over since and until a given time
+    THEN only the workout logs created in that range are returned
+    """
+    workout_logs = [
+        _add_workout_log_at(logs_repository, user_email, f"2021-01-0{day}T12:00:00")
+        for day in range(1, 6)
+    ]
+
+    listed = logs_repository.list(
+        owner=user_email,
+        since=datetime(2021, 1, 2, 12, tzinfo=timezone.utc),
+        until=datetime(2021, 1, 4, 11, tzinfo=timezone.utc),
+    ).items
+    assert [log.id for log in listed] == [workout_logs[1].id, workout_logs[2].id]
+
+    listed = logs_repository.list(
+        owner=user_email, since=datetime(2021, 1, 4), newest_first=True
+    ).items
+    assert [log.id for log in listed] == [workout_logs[4].id, workout_logs[3].id]
+
+    iterated = logs_repository.iter_items(
+        owner=user_email, since=datetime(2021, 1, 4), newest_first=True
+    )
+    assert [log.id for log in iterated] == [workout_logs[4].id, workout_logs[3].id]
+
+
+def test_list_workout_log_summaries(
+    logs_repository: repository.WorkoutRepository[model.WorkoutLog],
+    user_email: str,
+) -> None:
+    """
+    GIVEN workout logs
+    WHEN summaries of them are listed with some fields
+    THEN only the id and those fields of each workout log are returned
+    """
+    workout_logs = [
+        _add_workout_log_at(logs_repository, user_email, f"2021-01-0{day}T12:00:00")
+        for day in range(1, 4)
+    ]
+
+    page = logs_repository.list_summaries(
+        owner=user_email, fields=["name", "created_at"], limit=2
+    )
+    assert [summary.dict(exclude_unset=True) for summary in page.items] == [
+        {"id": log.id, "name": log.name, "created_at": log.created_at}
+        for log in workout_logs[:2]
+    ]
+
+    page = logs_repository.list_summaries(
+        owner=user_email, fields=["name"], cursor=page.next_cursor
+    )
+    assert [summary.id for summary in page.items] == [workout_logs[2].id]
+    assert page.next_cursor is None
+
+
+def test_legacy_workout_logs_are_readable_and_migrated(
+    dynamodb_logs_repository: repository.DynamoDBWorkoutLogRepository,
+    user_email: str,
+) -> None:
+    """
+    GIVEN a workout log keyed by a random id
+    WHEN it is read, and then migrated to a time-ordered id
+    THEN it is readable by its old id before and listed by date range after, and
+        the collection version changed
+    """
+    legacy_log = _add_legacy_workout_log(dynamodb_logs_repository, user_email)
+    version = dynamodb_logs_repository.get_collection_version(owner=user_email)
+    assert (
+        dynamodb_logs_repository.get(id=legacy_log.id, owner=user_email) == legacy_log
+    )
+    assert (
+        dynamodb_logs_repository.list(
+            owner=user_email, since=datetime(2000, 1, 1)
+        ).items
+        == []
+    )
+
+    (item,) = legacy_log_items(dynamodb_logs_repository._table)
+    id = migrate_item(dynamodb_logs_repository._table, item)
+
+    migrated = dynamodb_logs_repository.list(
+        owner=user_email, since=datetime(2000, 1, 1)
+    ).items
+    assert [log.id for log in migrated] == [id]
+    assert migrated[0].created_at == legacy_log.created_at
+    assert dynamodb_logs_repository.get(id=legacy_log.id, owner=user_email) is None
+    assert dynamodb_logs_repository.get_collection_version(owner=user_email) > version
+
+
+def test_migrated_workout_logs_keep_their_history_and_records(
+    dynamodb_logs_repository: repository.DynamoDBWorkoutLogRepository,
+    user_email: str,
+) -> None:
+    """
+    GIVEN a workout log keyed by a random id with history entries and records
+    WHEN it is migrated to a time-ordered id
+    THEN its history entries and records hold the new id, and only them
+    """
+    legacy_log = _add_legacy_workout_log(
+        dynamodb_logs_repository,
+        user_email,
+        model.ExerciseLog(
+            name="Squat",
+            sets=[
+                model.SetLog(weight=Decimal(100), reps=5),
+                model.SetLog(weight=Decimal(120), reps=1),
+            ],
+        ),
+    )
+    stats_repository = repository.DynamoDBExerciseStatsRepository(
+        dynamodb_logs_repository._table
+    )
+    stats_repository.rebuild(user_email, [legacy_log])
+    stats_repository.write_exercise_history(user_email, legacy_log)
+
+    (item,) = legacy_log_items(dynamodb_logs_repository._table)
+    id = migrate_item(dynamodb_logs_repository._table, item)
+
+    records = stats_repository.list_exercise_records(owner=user_email)
+    assert [record.reps for record in records] == [1, 5]
+    assert all(record.workout_log_id == id for record in records)
+    history = stats_repository.list_exercise_history(owner=user_email, exercise="squat")
+    assert [entry.workout_log_id for entry in history.items] == [id]
+
+
+def test_interrupted_workout_log_migrations_are_resumed(
+    dynamodb_logs_repository: repository.DynamoDBWorkoutLogRepository,
+    user_email: str,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """
+    GIVEN a workout log keyed by a random id with history entries and records
+    WHEN its migration stops after re-keying the log, and the migration is rerun
+    THEN the rerun moves its history entries and records to the new id
+    """
+    legacy_log = _add_legacy_workout_log(
+        dynamodb_logs_repository,
+        user_email,
+        model.ExerciseLog(
+            name="Squat", sets=[model.SetLog(weight=Decimal(100), reps=5)]
+        ),
+    )
+    stats_repository = repository.DynamoDBExerciseStatsRepository(
+        dynamodb_logs_repository._table
+    )
+    stats_repository.rebuild(user_email, [legacy_log])
+    stats_repository.write_exercise_history(user_email, legacy_log)
+
+    def crash(*args: Any, **kwargs: Any) -> None:
+        raise KeyboardInterrupt
+
+    with monkeypatch.context() as patch:
+        patch.setattr(
+            repository.DynamoDBExerciseStatsRepository, "rekey_exercise_history", crash
+        )
+        (item,) = legacy_log_items(dynamodb_logs_repository._table)
+        with pytest.raises(KeyboardInterrupt):
+            migrate_item(dynamodb_logs_repository._table, item)
+
+    (item,) = legacy_log_items(dynamodb_logs_repository._table)
+    id = migrate_item(dynamodb_logs_repository._table, item)
+
+    assert [
+        log.id for log in dynamodb_logs_repository.list(owner=user_email).items
+    ] == [id]
+    (record,) = stats_repository.list_exercise_records(owner=user_email)
+    assert record.workout_log_id == id
+    history = stats_repository.list_exercise_history(owner=user_email, exercise="squat")
+    assert [entry.workout_log_id for entry in history.items] == [id]
+    assert list(legacy_log_items(dynamodb_logs_repository._table)) == []
+
+
+@pytest.fixture
+def packed_logs_repository(
+    dynamodb_table: str,
+) -> repository.DynamoDBWorkoutLogRepository:
+    return repository.DynamoDBWorkoutLogRepository(
+        repository.get_dynamodb_table(dynamodb_table, None),
+        workout_type=model.WorkoutType.LOG,
+        model=model.WorkoutLog,
+        pack_sets=True,
+    )
+
+
+def test_packed_sets_are_read_back_as_set_logs(
+    packed_logs_repository: repository.DynamoDBWorkoutLogRepository,
+    dynamodb_logs_repository: repository.DynamoDBWorkoutLogRepository,
+    user_email: str,
+) -> None:
+    """
+    GIVEN a workout log repository that packs sets
+    WHEN workout logs are created, patched and read back by either repository
+    THEN the sets are stored as one binary attribute per exercise and read unchanged
+    """
+    workout_log = add_workout_log_to_db(
+        logs_repository=packed_logs_repository, user_email=user_email
+    )
+    stored = packed_logs_repository._table.get_item(
+        Key={
+            "PK": f"OWNER#{user_email}#WORKOUT_LOG",
+            "SK": f"WORKOUT_LOG#{workout_log.id}",
+        }
+    )["Item"]
+    assert all(isinstance(log["sets"], Binary) for log in stored["logs"])
+
+    assert (
+        packed_logs_repository.get(id=workout_log.id, owner=user_email) == workout_log
+    )
+    assert (
+        dynamodb_logs_repository.get(id=workout_log.id, owner=user_email) == workout_log
+    )
+    listed = packed_logs_repository.list(owner=user_email).items
+    assert listed == [workout_log]
+
+    logs = [
+        model.ExerciseLog(
+            name="Squat", sets=[model.SetLog(weight=Decimal("142.5"), reps=3)]
+        )
+    ]
+    patched = packed_logs_repository.patch(
+        id=workout_log.id,
+        update_model=model.WorkoutLogUpdate(logs=logs),
+        owner=user_email,
+    )
+    assert patched.logs == logs
+
+
+def test_packed_repository_reads_unpacked_workout_logs(
+    packed_logs_repository: repository.DynamoDBWorkoutLogRepository,
+    dynamodb_logs_repository: repository.DynamoDBWorkoutLogRepository,
+    user_email: str,
+) -> None:
+    """
+    GIVEN a workout log stored with sets as maps
+    WHEN it is read by a workout log repository that packs sets
+    THEN it is returned unchanged
+    """
+    workout_log = add_workout_log_to_db(
+        logs_repository=dynamodb_logs_repository, user_email=user_email
+    )
+
+    assert (
+        packed_logs_repository.get(id=workout_log.id, owner=user_email) == workout_log
+    )
+
+
+def test_packed_sets_shrink_heavy_workout_logs(
+    packed_logs_repository: repository.DynamoDBWorkoutLogRepository,
+    dynamodb_logs_repository: repository.DynamoDBWorkoutLogRepository,
+    user_email: str,
+) -> None:
+    """
+    GIVEN a workout log with many sets
+    WHEN it is stored with and without packed sets
+    THEN the packed item is several times smaller
+    """
+    workout_log = model.WorkoutLogCreate(
+        name="Volume Day",
+        plans=[],
+        logs=[
+            model.ExerciseLog(
+                name=f"exercise-{exercise}",
+                sets=[
+                    model.SetLog(weight=Decimal("102.5"), reps=10) for _ in range(20)
+                ],
+            )
+            for exercise in range(6)
+        ],
+    )
+
+    def stored_size(repo: repository.DynamoDBWorkoutLogRepository) -> int:
+        created = repo.create(model=workout_log, owner=user_email)
+        item = repo._table.get_item(
+            Key={
+                "PK": f"OWNER#{user_email}#WORKOUT_LOG",
+                "SK": f"WORKOUT_LOG#{created.id}",
+            }
+        )["Item"]
+        return len(
+            json.dumps(item, default=lambda value: str(getattr(value, "value", value)))
+        )
+
+    assert stored_size(packed_logs_repository) * 3 < stored_size(
+        dynamodb_logs_repository
+    )
@@ -1,15 +1,18 @@
 from __future__ import annotations
 
+from uuid import uuid4
+
 import pytest
+from botocore.exceptions import ClientError
 
-from src import model
+from src import exceptions, model
 from src.adapters import repository
-from tests.utils import add_workout_plan_to_db
+from tests.utils import add_workout_plan_to_db, random_workout_plan_create
 
 
 @pytest.mark.usefixtures("frozen_time")
 def test_create_workout_plan(
-    plans_repository: repository.DynamoDBWorkoutPlanRepository,
+    plans_repository: repository.WorkoutRepository[model.WorkoutPlan],
     user_email: str,
     now_iso: str,
 ) -> None:
@@ -30,8 +33,112 @@ def test_create_workout_plan(
     assert workout_plan_retrieved.created_at == now_iso
 
 
+def test_create_many_workout_plans(
+    plans_repository: repository.WorkoutRepository[model.WorkoutPlan],
+    user_email: str,
+) -> None:
+    """
+    GIVEN more workout plans than fit in one batch write
+    WHEN the workout plans are created in bulk
+    THEN every workout plan is created and results are in request order
+    """
+    workout_plans_create = [random_workout_plan_create() for _ in range(30)]
+
+    results = plans_repository.create_many(
+        models=workout_plans_create, owner=user_email
+    )
+
+    assert all(result.status == model.BatchWriteStatus.CREATED for result in results)
+    workout_plans = {
+        plan.id: plan for plan in plans_repository.list(owner=user_email).items
+    }
+    assert [workout_plans[result.id].name for result in results] == [
+        plan.name for plan in workout_plans_create
+    ]
+
+
+def test_create_many_retries_unprocessed_workout_plans(
+    dynamodb_plans_repository: repository.DynamoDBWorkoutPlanRepository,
+    user_email: str,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """
+    GIVEN DynamoDB leaves some items of a batch write unprocessed
+    WHEN workout plans are created in bulk
+    THEN the unprocessed items are retried and every workout plan is created
+    """
+    client = dynamodb_plans_repository._table.meta.client
+    batch_write_item = client.batch_write_item
+    calls = []
+
+    def throttled_batch_write_item(RequestItems):
+        calls.append(RequestItems)
+        if len(calls) > 1:
+            return batch_write_item(RequestItems=RequestItems)
+        (table_name, requests), *_ = RequestItems.items()
+        batch_write_item(RequestItems={table_name: requests[:1]})
+        return {"UnprocessedItems": {table_name: requests[1:]}}
+
+    monkeypatch.setattr(client, "batch_write_item", throttled_batch_write_item)
+
+    results = dynamodb_plans_repository.create_many(
+        models=[random_workout_plan_create() for _ in range(3)], owner=user_email
+    )
+
+    assert len(calls) == 2
+    assert all(result.status == model.BatchWriteStatus.CREATED for result in results)
+    assert len(dynamodb_plans_repository.list(owner=user_email).items) == 3
+
+
+def test_create_workout_plan_fails_when_collection_version_is_not_bumped(
+    dynamodb_plans_repository: repository.DynamoDBWorkoutPlanRepository,
+    user_email: str,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """
+    GIVEN DynamoDB fails to bump the owner's collection version
+    WHEN a workout plan is created
+    THEN an error is raised rather than leaving the list's ETag stale
+    """
+    table = dynamodb_plans_repository._table
+
+    def failing_update_item(**kwargs):
+        raise ClientError(
+            {"Error": {"Code": "InternalServerError", "Message": "failed"}},
+            "UpdateItem",
+        )
+
+    monkeypatch.setattr(table, "update_item", failing_update_item)
+
+    with pytest.raises(exceptions.WorkoutError):
+        dynamodb_plans_repository.create(
+            model=random_workout_plan_create(), owner=user_email
+        )
+
+
+def test_get_many_workout_plans(
+    plans_repository: repository.WorkoutRepository[model.WorkoutPlan],
+    user_email: str,
+) -> None:
+    """
+    GIVEN more workout plans than fit in one batch get
+    WHEN they are fetched by id together with a duplicate and a missing id
+    THEN the existing workout plans are returned once each in the requested order
+    """
+    results = plans_repository.create_many(
+        models=[random_workout_plan_create() for _ in range(120)], owner=user_email
+    )
+    ids = [result.id for result in reversed(results)]
+
+    workout_plans = plans_repository.get_many(
+        ids=[*ids, str(uuid4()), ids[0]], owner=user_email
+    )
+
+    assert [plan.id for plan in workout_plans] == ids
+
+
 def test_list_user_workout_plans(
-    plans_repository: repository.DynamoDBWorkoutPlanRepository,
+    plans_repository: repository.WorkoutRepository[model.WorkoutPlan],
     user_email: str,
 ) -> None:
     """
@@ -49,14 +156,89 @@ def test_list_user_workout_plans(
         plans_repository=plans_repository, user_email="another_user@email.com"
     )
 
-    workout_plan_retrieved = plans_repository.list(owner=user_email)
+    workout_plan_retrieved = plans_repository.list(owner=user_email).items
     assert len(workout_plan_retrieved) == 2
     assert workout_plan_1 in workout_plan_retrieved
     assert workout_plan_2 in workout_plan_retrieved
 
 
+def test_list_user_workout_plans_paginated(
+    plans_repository: repository.WorkoutRepository[model.WorkoutPlan],
+    user_email: str,
+) -> None:
+    """
+    GIVEN multiple workout plans
+    WHEN the workout plans are listed a page at a time
+    THEN each workout plan is returned exactly once and the last page has no cursor
+    """
+    workout_plans = [
+        add_workout_plan_to_db(plans_repository=plans_repository, user_email=user_email)
+        for _ in range(5)
+    ]
+
+    pages = [plans_repository.list(owner=user_email, limit=2)]
+    while pages[-1].next_cursor:
+        pages.append(
+            plans_repository.list(
+                owner=user_email, limit=2, cursor=pages[-1].next_cursor
+            )
+        )
+
+    assert [len(page.items) for page in pages] == [2, 2, 1]
+    assert pages[-1].next_cursor is None
+    listed_ids = [plan.id for page in pages for plan in page.items]
+    assert sorted(listed_ids) == sorted(plan.id for plan in workout_plans)
+
+
+def test_list_rejects_cursor_of_another_owner(
+    plans_repository: repository.WorkoutRepository[model.WorkoutPlan],
+    user_email: str,
+) -> None:
+    """
+    GIVEN a cursor issued while listing another user's workout plans
+    WHEN it is used to list this user's workout plans
+    THEN an invalid cursor error is raised
+    """
+    another_user_email = "another_user@email.com"
+    for _ in range(2):
+        add_workout_plan_to_db(
+            plans_repository=plans_repository, user_email=another_user_email
+        )
+    cursor = plans_repository.list(owner=another_user_email, limit=1).next_cursor
+    assert cursor is not None
+
+    with pytest.raises(exceptions.InvalidCursorError):
+        plans_repository.list(owner=user_email, cursor=cursor)
+
+    with pytest.raises(exceptions.InvalidCursorError):
+        plans_repository.list(owner=user_email, cursor="not-a-cursor")
+
+
+def test_iter_user_workout_plans(
+    plans_repository: repository.WorkoutRepository[model.WorkoutPlan],
+    user_email: str,
+) -> None:
+    """
+    GIVEN multiple workout plans
+    WHEN the workout plans of a user are iterated
+    THEN only the workout plans for that user are yielded
+    """
+    workout_plans = [
+        add_workout_plan_to_db(plans_repository=plans_repository, user_email=user_email)
+        for _ in range(3)
+    ]
+    add_workout_plan_to_db(
+        plans_repository=plans_repository, user_email="another_user@email.com"
+    )
+
+    iterated = list(plans_repository.iter_items(owner=user_email))
+    assert sorted(plan.id for plan in iterated) == sorted(
+        plan.id for plan in workout_plans
+    )
+
+
 def test_update_workout_plan(
-    plans_repository: repository.DynamoDBWorkoutPlanRepository,
+    plans_repository: repository.WorkoutRepository[model.WorkoutPlan],
     user_email: str,
 ) -> None:
     """
@@ -67,6 +249,7 @@ def test_update_workout_plan(
     workout_plan = add_workout_plan_to_db(
         plans_repository=plans_repository, user_email=user_email
     )
+    version = workout_plan.version
 
     workout_plan_update = model.WorkoutPlanUpdate(
         exercises=[model.ExercisePlan(name="test-exercise", sets=1)],
@@ -82,10 +265,86 @@ def test_update_workout_plan(
     assert plan_updated.name == workout_plan.name
     assert plan_updated.exercises == workout_plan_update.exercises
     assert plan_updated.id == workout_plan.id
+    assert plan_updated.version == version + 1
+
+
+def test_patch_workout_plan(
+    plans_repository: repository.WorkoutRepository[model.WorkoutPlan],
+    user_email: str,
+) -> None:
+    """
+    GIVEN a valid workout plan
+    WHEN that workout plan is patched
+    THEN only the fields set on the update are changed
+    """
+    workout_plan = add_workout_plan_to_db(
+        plans_repository=plans_repository, user_email=user_email
+    )
+
+    workout_plan_update = model.WorkoutPlanUpdate(
+        exercises=[model.ExercisePlan(name="test-exercise", sets=1)],
+    )
+    plan_patched = plans_repository.patch(
+        id=workout_plan.id, update_model=workout_plan_update, owner=user_email
+    )
+
+    assert plan_patched.name == workout_plan.name
+    assert plan_patched.exercises == workout_plan_update.exercises
+    assert plan_patched.created_at == workout_plan.created_at
+    assert plans_repository.get(id=workout_plan.id, owner=user_email) == plan_patched
+
+
+def test_writes_bump_versions(
+    plans_repository: repository.WorkoutRepository[model.WorkoutPlan],
+    user_email: str,
+) -> None:
+    """
+    GIVEN a valid workout plan
+    WHEN workout plans are created, patched and deleted
+    THEN the workout plan version and the owner's collection version increase
+    """
+    assert plans_repository.get_collection_version(owner=user_email) == 0
+    workout_plan = add_workout_plan_to_db(
+        plans_repository=plans_repository, user_email=user_email
+    )
+    assert workout_plan.version == 1
+    assert workout_plan.updated_at == workout_plan.created_at
+    assert plans_repository.get_collection_version(owner=user_email) == 1
+
+    patched = plans_repository.patch(
+        id=workout_plan.id,
+        update_model=model.WorkoutPlanUpdate(name="patched"),
+        owner=user_email,
+    )
+    assert patched.version == 2
+    assert plans_repository.get_collection_version(owner=user_email) == 2
+
+    plans_repository.delete(workout_plan.id, owner=user_email)
+    assert plans_repository.get_collection_version(owner=user_email) == 3
+    assert plans_repository.get_collection_version(owner="another@email.com") == 0
+
+
+def test_patch_missing_workout_plan(
+    plans_repository: repository.WorkoutRepository[model.WorkoutPlan],
+    user_email: str,
+) -> None:
+    """
+    GIVEN no workout plans
+    WHEN a workout plan is patched
+    THEN a not found error is raised and no workout plan is created
+    """
+    id = str(uuid4())
+
+    with pytest.raises(exceptions.WorkoutNotFoundError):
+        plans_repository.patch(
+            id=id, update_model=model.WorkoutPlanUpdate(name="name"), owner=user_email
+        )
+
+    assert plans_repository.get(id=id, owner=user_email) is None
 
 
 def test_delete_workout_plan(
-    plans_repository: repository.DynamoDBWorkoutPlanRepository,
+    plans_repository: repository.WorkoutRepository[model.WorkoutPlan],
     user_email: str,
 ) -> None:
     """
@@ -100,3 +359,36 @@ def test_delete_workout_plan(
     plans_repository.delete(workout_plan.id, owner=user_email)
 
     assert plans_repository.get(id=workout_plan.id, owner=user_email) is None
+
+
+def test_delete_workout_plan_returning_deleted(
+    plans_repository: repository.WorkoutRepository[model.WorkoutPlan],
+    user_email: str,
+) -> None:
+    """
+    GIVEN a valid workout plan
+    WHEN that workout plan is deleted asking for the deleted workout plan
+    THEN the deleted workout plan is returned
+    """
+    workout_plan = add_workout_plan_to_db(
+        plans_repository=plans_repository, user_email=user_email
+    )
+
+    deleted = plans_repository.delete(
+        workout_plan.id, owner=user_email, return_deleted=True
+    )
+
+    assert deleted == workout_plan
+
+
+def test_delete_missing_workout_plan(
+    plans_repository: repository.WorkoutRepository[model.WorkoutPlan],
+    user_email: str,
+) -> None:
+    """
+    GIVEN no workout plans
+    WHEN a workout plan is deleted
+    THEN a not found error is raised
+    """
+    with pytest.raises(exceptions.WorkoutNotFoundError):
+        plans_repository.delete(str(uuid4()), owner=user_email)
@@ -1,9 +1,16 @@
+import pytest
+
 from src.adapters.repository import (
     DynamoDBWorkoutLogRepository,
     DynamoDBWorkoutPlanRepository,
+    InMemoryExerciseStatsRepository,
+    InMemoryWorkoutRepository,
+    get_dynamodb_table,
+    get_exercise_stats_repository,
     get_workout_logs_repository,
     get_workout_plans_repository,
 )
+from src.config import RepositoryBackend, config
 
 
 def test_get_workout_plans_repository():
@@ -16,3 +23,30 @@ def test_get_workout_logs_repository():
     """Test get_workout_logs_repository."""
     repo = get_workout_logs_repository()
     assert isinstance(repo, DynamoDBWorkoutLogRepository)
+
+
+def test_repositories_share_pooled_table(dynamodb_table: str):
+    """Test repositories for the same table and endpoint reuse one pooled table."""
+    plans_repo = get_workout_plans_repository(table_name=dynamodb_table)
+    logs_repo = get_workout_logs_repository(table_name=dynamodb_table)
+    assert plans_repo._table is logs_repo._table
+    assert get_dynamodb_table(dynamodb_table) is plans_repo._table
+
+
+def test_pooled_table_is_keyed_by_endpoint(dynamodb_table: str):
+    """Test tables for different endpoints are pooled separately."""
+    local_table = get_dynamodb_table(dynamodb_table, "http://localhost:9999")
+    assert local_table is not get_dynamodb_table(dynamodb_table)
+    assert local_table is get_dynamodb_table(dynamodb_table, "http://localhost:9999")
+
+
+def test_memory_backend_repositories_are_shared(monkeypatch: pytest.MonkeyPatch):
+    """Test that the memory backend serves one repository per workout type."""
+    monkeypatch.setattr(config, "REPOSITORY_BACKEND", RepositoryBackend.MEMORY)
+    plans_repo = get_workout_plans_repository()
+    logs_repo = get_workout_logs_repository()
+    assert isinstance(plans_repo, InMemoryWorkoutRepository)
+    assert isinstance(logs_repo, InMemoryWorkoutRepository)
+    assert plans_repo is get_workout_plans_repository()
+    assert plans_repo is not logs_repo
+    assert isinstance(get_exercise_stats_repository(), InMemoryExerciseStatsRepository)
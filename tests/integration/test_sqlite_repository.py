@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Generator
+
+import pytest
+
+from src import exceptions, model
+from src.adapters import repository
+from tests.utils import random_workout_plan_create
+
+
+@pytest.fixture
+def sqlite_plans_repository(
+    tmp_path: Path,
+) -> Generator[repository.SQLiteWorkoutRepository[model.WorkoutPlan], None, None]:
+    sqlite_repository = repository.SQLiteWorkoutRepository(
+        str(tmp_path / "workouts.db"),
+        workout_type=model.WorkoutType.PLAN,
+        model=model.WorkoutPlan,
+    )
+    yield sqlite_repository
+    sqlite_repository.close()
+
+
+def test_threads_write_through_their_own_connections(
+    sqlite_plans_repository: repository.SQLiteWorkoutRepository[model.WorkoutPlan],
+    user_email: str,
+) -> None:
+    """
+    GIVEN a SQLite workout plan repository
+    WHEN workout plans are created from several threads at once
+    THEN every workout plan is created, each thread used its own WAL connection
+        and the collection version counts every write
+    """
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        created = list(
+            executor.map(
+                lambda _: sqlite_plans_repository.create(
+                    model=random_workout_plan_create(), owner=user_email
+                ),
+                range(20),
+            )
+        )
+        # The connections of the worker threads are closed once they end.
+        connections = list(sqlite_plans_repository._connections.values())
+        assert len(connections) > 1
+        assert all(
+            connection.execute("PRAGMA journal_mode").fetchone() == ("wal",)
+            for connection in connections
+        )
+
+    listed = sqlite_plans_repository.list(owner=user_email).items
+    assert sorted(plan.id for plan in listed) == sorted(plan.id for plan in created)
+    assert sqlite_plans_repository.get_collection_version(owner=user_email) == 20
+
+
+def test_connections_are_closed_when_their_threads_end(
+    sqlite_plans_repository: repository.SQLiteWorkoutRepository[model.WorkoutPlan],
+    user_email: str,
+) -> None:
+    """
+    GIVEN a SQLite workout plan repository
+    WHEN workout plans are created from many short-lived threads
+    THEN the connection of each thread is closed when the thread ends
+    """
+    connections: list[sqlite3.Connection] = []
+
+    def create() -> None:
+        sqlite_plans_repository.create(
+            model=random_workout_plan_create(), owner=user_email
+        )
+        connections.append(sqlite_plans_repository._connection())
+
+    for _ in range(50):
+        thread = threading.Thread(target=create)
+        thread.start()
+        thread.join()
+
+    assert len(sqlite_plans_repository._connections) == 1
+    assert len(sqlite_plans_repository.list(owner=user_email).items) == 50
+    for connection in connections:
+        with pytest.raises(sqlite3.ProgrammingError):
+            connection.execute("SELECT 1")
+
+
+def test_time_ranges_are_read_through_the_creation_time_index(
+    sqlite_plans_repository: repository.SQLiteWorkoutRepository[model.WorkoutPlan],
+) -> None:
+    """
+    GIVEN a SQLite workout repository
+    WHEN the plan of a query by owner, type and creation time is explained
+    THEN the query searches the creation time index rather than scanning
+    """
+    plan = (
+        sqlite_plans_repository._connection()
+        .execute(
+            "EXPLAIN QUERY PLAN SELECT payload FROM workouts "
+            "WHERE owner = ? AND type = ? AND created_key >= ? "
+            "ORDER BY created_key, id",
+            ("owner", "LOG", "2021"),
+        )
+        .fetchall()
+    )
+
+    (*_, detail), *_ = plan
+    assert detail.startswith("SEARCH")
+    assert "INDEX workouts_by_created_at" in detail
+
+
+class _BusyOnCommit:
+    """A connection whose COMMIT fails once, as when the database is busy."""
+
+    def __init__(self, connection: sqlite3.Connection):
+        self._connection = connection
+        self.failed = False
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._connection, name)
+
+    def execute(self, sql: str, *args: Any) -> sqlite3.Cursor:
+        if sql == "COMMIT" and not self.failed:
+            self.failed = True
+            raise sqlite3.OperationalError("database is locked")
+        return self._connection.execute(sql, *args)
+
+
+def test_failed_commits_are_rolled_back(
+    sqlite_plans_repository: repository.SQLiteWorkoutRepository[model.WorkoutPlan],
+    user_email: str,
+) -> None:
+    """
+    GIVEN a SQLite connection whose COMMIT fails
+    WHEN a workout plan is created, and then another
+    THEN the first fails and is rolled back, and the second is created
+    """
+    connection = _BusyOnCommit(sqlite_plans_repository._connection())
+    sqlite_plans_repository._local.connection = connection
+
+    with pytest.raises(exceptions.WorkoutError):
+        sqlite_plans_repository.create(
+            model=random_workout_plan_create(), owner=user_email
+        )
+    assert connection.failed
+    assert not connection.in_transaction
+
+    created = sqlite_plans_repository.create(
+        model=random_workout_plan_create(), owner=user_email
+    )
+    assert [
+        plan.id for plan in sqlite_plans_repository.list(owner=user_email).items
+    ] == [created.id]
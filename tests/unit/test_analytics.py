@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from src.analytics import (
+    exercise_progress,
+    load_exercise_sets,
+    load_history_sets,
+    moving_average,
+)
+from src.model import ExerciseLog, ProgressBucket, SetLog, WorkoutLog
+from src.stats import exercise_history_entries
+
+
+def _workout_log(created_at: str, *sets: tuple[str, int]) -> WorkoutLog:
+    return WorkoutLog(
+        name="workout",
+        created_at=created_at,
+        plans=[],
+        logs=[
+            ExerciseLog(
+                name="Squat",
+                sets=[
+                    SetLog(weight=Decimal(weight), reps=reps) for weight, reps in sets
+                ],
+            ),
+            ExerciseLog(name="Bench Press", sets=[SetLog(weight=Decimal(60), reps=5)]),
+        ],
+    )
+
+
+@pytest.fixture
+def workout_logs() -> list[WorkoutLog]:
+    return [
+        # Out of order, to check sets are sorted by time.
+        _workout_log("2021-01-06T18:00:00+00:00", ("105", 5)),
+        _workout_log("2021-01-04T18:00:00+00:00", ("100", 5), ("100", 5)),
+        _workout_log("2021-01-12T18:00:00+00:00", ("102.5", 5), ("120", 0)),
+        _workout_log("2021-01-20T18:00:00+00:00", ("110", 3)),
+    ]
+
+
+def test_load_exercise_sets(workout_logs):
+    sets = load_exercise_sets(workout_logs, exercise=" squat ")
+
+    assert len(sets) == 6
+    assert sets.weights.tolist() == [100, 100, 105, 102.5, 120, 110]
+    assert sets.reps.tolist() == [5, 5, 5, 5, 0, 3]
+    assert np.all(np.diff(sets.timestamps.astype(np.int64)) >= 0)
+
+
+def test_load_history_sets(workout_logs):
+    entries = [exercise_history_entries(log)["squat"] for log in workout_logs]
+
+    sets = load_history_sets(
+        entries,
+        since=datetime(2021, 1, 5, tzinfo=timezone.utc),
+        until=datetime(2021, 1, 12, 18),
+    )
+
+    assert sets.weights.tolist() == [105, 102.5, 120]
+    assert sets.reps.tolist() == [5, 5, 0]
+    assert load_history_sets(entries).weights.tolist() == (
+        load_exercise_sets(workout_logs, exercise="Squat").weights.tolist()
+    )
+
+
+def test_exercise_progress_by_week(workout_logs):
+    sets = load_exercise_sets(workout_logs, exercise="Squat")
+
+    progress = exercise_progress(sets, bucket=ProgressBucket.WEEK, window=2)
+
+    assert [point.period_start for point in progress] == [
+        date(2021, 1, 4),
+        date(2021, 1, 11),
+        date(2021, 1, 18),
+    ]
+    assert [point.set_count for point in progress] == [3, 2, 1]
+    assert [point.rep_count for point in progress] == [15, 5, 3]
+    assert [point.volume for point in progress] == [1525, 512.5, 330]
+    assert [point.volume_moving_average for point in progress] == [
+        1525,
+        1018.75,
+        421.25,
+    ]
+    # Sets without reps do not count towards bests.
+    assert [point.best_weight for point in progress] == [105, 102.5, 110]
+    assert [point.estimated_one_rep_max for point in progress] == [122.5, 119.58, 121]
+    assert [point.is_record for point in progress] == [True, False, False]
+
+
+def test_exercise_progress_by_day_and_month(workout_logs):
+    sets = load_exercise_sets(workout_logs, exercise="Squat")
+
+    by_day = exercise_progress(sets, bucket=ProgressBucket.DAY)
+    by_month = exercise_progress(sets, bucket=ProgressBucket.MONTH)
+
+    assert len(by_day) == 4
+    assert [point.period_start for point in by_month] == [date(2021, 1, 1)]
+    assert by_month[0].set_count == 6
+
+
+def test_exercise_progress_without_sets():
+    sets = load_exercise_sets([], exercise="Squat")
+
+    assert exercise_progress(sets, bucket=ProgressBucket.WEEK) == []
+
+
+def test_moving_average():
+    averages = moving_average(np.array([1.0, 2.0, 3.0, 4.0]), window=3)
+
+    assert averages.tolist() == [1, 1.5, 2, 3]
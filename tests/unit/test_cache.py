@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+import freezegun
+
+from src.adapters.cache import InMemoryCacheBackend
+from src.adapters.repository import CacheStats
+
+
+def test_in_memory_cache_evicts_least_recently_used():
+    cache = InMemoryCacheBackend(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+
+
+def test_in_memory_cache_expires_entries():
+    with freezegun.freeze_time("2021-01-01") as frozen_time:
+        cache = InMemoryCacheBackend(max_entries=10, ttl=60)
+        cache.set("default-ttl", 1)
+        cache.set("short-ttl", 2, ttl=1)
+
+        frozen_time.tick(timedelta(seconds=2))
+        assert cache.get("default-ttl") == 1
+        assert cache.get("short-ttl") is None
+
+        frozen_time.tick(timedelta(seconds=60))
+        assert cache.get("default-ttl") is None
+
+
+def test_in_memory_cache_delete():
+    cache = InMemoryCacheBackend(max_entries=10)
+    cache.set("a", 1)
+
+    cache.delete("a")
+    cache.delete("missing")
+
+    assert cache.get("a") is None
+
+
+def test_cache_stats_count_every_thread():
+    stats = CacheStats()
+
+    def count(_: int) -> None:
+        for _ in range(1000):
+            stats.count(hits=1)
+            stats.count(misses=1)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(count, range(8)))
+
+    assert stats == CacheStats(hits=8000, misses=8000)
+    assert stats.hit_ratio == 0.5
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import gzip
+
+import brotli
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from src.api.compression import CompressionMiddleware, negotiate_encoding
+
+BODY = "workout\n" * 1000
+
+
+@pytest.fixture
+def client() -> TestClient:
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=100)
+
+    @app.get("/large")
+    def large() -> PlainTextResponse:
+        return PlainTextResponse(BODY, headers={"ETag": '"abc"'})
+
+    @app.get("/small")
+    def small() -> PlainTextResponse:
+        return PlainTextResponse("workout")
+
+    @app.get("/stream")
+    def stream() -> StreamingResponse:
+        return StreamingResponse(iter(["workout\n"] * 1000))
+
+    return TestClient(app)
+
+
+def _get_raw(client: TestClient, path: str, encoding: str) -> tuple[dict, bytes]:
+    with client.stream("GET", path, headers={"Accept-Encoding": encoding}) as response:
+        return dict(response.headers), b"".join(response.iter_raw())
+
+
+def test_negotiate_encoding():
+    assert negotiate_encoding("gzip, deflate, br") == "br"
+    assert negotiate_encoding("gzip, br;q=0") == "gzip"
+    assert negotiate_encoding("*") == "br"
+    assert negotiate_encoding("identity") is None
+    assert negotiate_encoding("") is None
+
+
+@pytest.mark.parametrize(
+    "encoding, decompress", [("br", brotli.decompress), ("gzip", gzip.decompress)]
+)
+@pytest.mark.parametrize("path", ["/large", "/stream"])
+def test_responses_are_compressed(client, encoding, decompress, path):
+    headers, body = _get_raw(client, path, encoding)
+
+    assert headers["content-encoding"] == encoding
+    assert "content-length" not in headers
+    assert "Accept-Encoding" in headers["vary"]
+    assert decompress(body) == BODY.encode()
+
+
+def test_compressed_etags_are_weak(client):
+    headers, _ = _get_raw(client, "/large", "br")
+
+    assert headers["etag"] == 'W/"abc"'
+
+
+def test_small_responses_are_not_compressed(client):
+    headers, body = _get_raw(client, "/small", "br")
+
+    assert "content-encoding" not in headers
+    assert body == b"workout"
+
+
+def test_responses_are_not_compressed_unless_accepted(client):
+    headers, body = _get_raw(client, "/large", "identity")
+
+    assert "content-encoding" not in headers
+    assert body == BODY.encode()
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+from src.api.etags import collection_etag, etag_matches, workout_etag
+from src.model import WorkoutPlan
+
+
+def test_workout_etag_changes_with_version():
+    plan = WorkoutPlan(name="Leg Day", exercises=[])
+    etag = workout_etag(plan)
+
+    plan.version += 1
+
+    assert workout_etag(plan) != etag
+
+
+def test_collection_etag_ignores_query_parameter_order():
+    etag = collection_etag("owner", 1, [("limit", "10"), ("format", "json")])
+
+    assert etag == collection_etag("owner", 1, [("format", "json"), ("limit", "10")])
+    assert etag != collection_etag("owner", 2, [("format", "json"), ("limit", "10")])
+    assert etag != collection_etag("other", 1, [("format", "json"), ("limit", "10")])
+    assert etag != collection_etag("owner", 1, [("limit", "20"), ("format", "json")])
+
+
+def test_etag_matches():
+    etag = '"abc"'
+
+    assert etag_matches('"abc"', etag)
+    assert etag_matches('W/"abc"', etag)
+    assert etag_matches('"xyz", "abc"', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"xyz"', etag)
+    assert not etag_matches(None, etag)
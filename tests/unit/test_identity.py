@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from datetime import timedelta
+from typing import Any
+
+import freezegun
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from src.adapters.cache import InMemoryCacheBackend
+from src.adapters.identity import JWKSCache, TokenVerifier
+from src.exceptions import AuthenticationError
+
+JWKS_URL = "https://cognito-idp.example.com/.well-known/jwks.json"
+
+
+class _KeyServer:
+    """Serves a JWKS of RSA keys and counts how often it is fetched."""
+
+    def __init__(self) -> None:
+        self.keys: dict[str, rsa.RSAPrivateKey] = {}
+        self.fetches = 0
+
+    def add_key(self, kid: str) -> None:
+        self.keys[kid] = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+    def fetch(self, url: str) -> dict[str, Any]:
+        assert url == JWKS_URL
+        self.fetches += 1
+        return {
+            "keys": [
+                {
+                    **json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(key.public_key())),
+                    "kid": kid,
+                    "alg": "RS256",
+                    "use": "sig",
+                }
+                for kid, key in self.keys.items()
+            ]
+        }
+
+    def token(self, kid: str, expires_in: float = 3600, **claims: Any) -> str:
+        return jwt.encode(
+            {"cognito:username": "user@email.com", "exp": time.time() + expires_in}
+            | claims,
+            self.keys[kid],
+            algorithm="RS256",
+            headers={"kid": kid},
+        )
+
+
+@pytest.fixture
+def key_server() -> _KeyServer:
+    key_server = _KeyServer()
+    key_server.add_key("key-1")
+    return key_server
+
+
+@pytest.fixture
+def verifier(key_server: _KeyServer) -> TokenVerifier:
+    return TokenVerifier(
+        key_set=JWKSCache(JWKS_URL, refresh_interval=3600, fetch=key_server.fetch),
+        cache=InMemoryCacheBackend(max_entries=100),
+    )
+
+
+def test_verify_caches_claims(verifier: TokenVerifier, key_server: _KeyServer):
+    token = key_server.token("key-1")
+    assert verifier.cached_claims(token) is None
+
+    claims = verifier.verify(token)
+
+    assert claims["cognito:username"] == "user@email.com"
+    assert verifier.cached_claims(token) == claims
+    assert verifier.verify(token) == claims
+    assert key_server.fetches == 1
+
+
+def test_cached_claims_expire_with_token(
+    verifier: TokenVerifier, key_server: _KeyServer
+):
+    with freezegun.freeze_time("2021-01-01") as frozen_time:
+        token = key_server.token("key-1", expires_in=60)
+        verifier.verify(token)
+
+        frozen_time.tick(timedelta(seconds=61))
+
+        assert verifier.cached_claims(token) is None
+        with pytest.raises(AuthenticationError):
+            verifier.verify(token)
+
+
+def test_verify_rejects_invalid_tokens(verifier: TokenVerifier, key_server: _KeyServer):
+    key_server.add_key("key-2")
+    forged = jwt.encode(
+        jwt.decode(key_server.token("key-2"), options={"verify_signature": False}),
+        key_server.keys["key-2"],
+        algorithm="RS256",
+        headers={"kid": "key-1"},
+    )
+
+    for token in (
+        forged,
+        key_server.token("key-1", expires_in=-1),
+        jwt.encode({"cognito:username": "user@email.com"}, "secret"),
+        "not-a-token",
+    ):
+        with pytest.raises(AuthenticationError):
+            verifier.verify(token)
+
+
+def test_unknown_key_id_refreshes_keys(verifier: TokenVerifier, key_server: _KeyServer):
+    verifier.verify(key_server.token("key-1"))
+    key_server.add_key("key-2")
+
+    with freezegun.freeze_time(timedelta(seconds=31), tick=True):
+        claims = verifier.verify(key_server.token("key-2"))
+
+    assert claims["cognito:username"] == "user@email.com"
+    assert key_server.fetches == 2
+
+
+def test_stale_keys_are_refreshed_in_background(key_server: _KeyServer):
+    key_set = JWKSCache(JWKS_URL, refresh_interval=0, fetch=key_server.fetch)
+    key_set.refresh()
+
+    assert key_set.get_signing_key("key-1")
+    for thread in threading.enumerate():
+        if thread.name == "jwks-refresh":
+            thread.join()
+
+    assert key_server.fetches == 2
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import json
+import logging
+import threading
+
+import pytest
+
+from src import main, metrics
+
+
+def test_counter_adds_up_every_thread():
+    counter = metrics.Counter("test_counter_total", "Test counter.", ["kind"])
+
+    def increment() -> None:
+        for _ in range(1000):
+            counter.inc("a")
+
+    threads = [threading.Thread(target=increment) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    counter.inc("b", amount=2)
+
+    assert counter.values() == {("a",): [4000.0], ("b",): [2.0]}
+
+
+def test_histogram_samples_are_cumulative():
+    histogram = metrics.Histogram(
+        "test_seconds", "Test histogram.", ["route"], buckets=[0.1, 1]
+    )
+    for value in (0.05, 0.1, 0.5, 2):
+        histogram.observe(value, "/logs")
+
+    assert list(histogram.samples(histogram.values())) == [
+        ("test_seconds_bucket", {"route": "/logs", "le": "0.1"}, 2),
+        ("test_seconds_bucket", {"route": "/logs", "le": "1"}, 3),
+        ("test_seconds_bucket", {"route": "/logs", "le": "+Inf"}, 4),
+        ("test_seconds_sum", {"route": "/logs"}, 2.65),
+        ("test_seconds_count", {"route": "/logs"}, 4),
+    ]
+
+
+def test_render_escapes_label_values():
+    metrics.counter("test_render_total", "Test render.", ["path"]).inc(
+        '/"quoted"\\path'
+    )
+
+    text = metrics.render()
+
+    assert "# TYPE test_render_total counter" in text
+    assert 'test_render_total{path="/\\"quoted\\"\\\\path"} 1.0' in text
+
+
+def test_register_refuses_duplicate_names():
+    metrics.gauge("test_duplicate", "Test duplicate.")
+
+    with pytest.raises(ValueError):
+        metrics.gauge("test_duplicate", "Test duplicate.")
+
+
+def test_log_metrics_logs_increases_since_last_call(caplog):
+    counter = metrics.counter("test_logged_total", "Test logged.", ["kind"])
+    counter.inc("a", amount=3)
+    metrics.log_metrics()
+    counter.inc("a")
+
+    with caplog.at_level(logging.INFO, logger="src.metrics"):
+        metrics.log_metrics()
+
+    line = json.loads(caplog.records[-1].getMessage())
+    assert line["metrics"]["test_logged_total"] == {"kind=a": 1.0}
+
+
+def test_lambda_handler_logs_metrics(monkeypatch, caplog):
+    monkeypatch.setattr(main.config, "METRICS_LOG_INVOCATIONS", True)
+    monkeypatch.setattr(main, "_mangum", lambda event, context: {"statusCode": 200})
+
+    with caplog.at_level(logging.INFO, logger="src.metrics"):
+        response = main.handle({}, None)
+
+    assert response == {"statusCode": 200}
+    assert "metrics" in json.loads(caplog.records[-1].getMessage())
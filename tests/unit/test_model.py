@@ -46,3 +46,36 @@ def test_workout_log(now_iso: str):
 @pytest.mark.usefixtures("frozen_time")
 def test_workout_log_with_id(now_iso: str):
     assert now_isoformat() == now_iso
+
+
+def test_workout_log_from_trusted_matches_validated_model():
+    log = WorkoutLog(
+        name="Leg Day",
+        plans=[ExercisePlan(name="Squats", sets=3)],
+        logs=[ExerciseLog(name="Squats", sets=[SetLog(weight=Decimal(100), reps=10)])],
+    )
+    item = {
+        "PK": "OWNER#user#WORKOUT_LOG",
+        "SK": f"WORKOUT_LOG#{log.id}",
+        **log.dict(),
+        "version": Decimal(1),
+        "plans": [{"name": "Squats", "sets": Decimal(3)}],
+        "logs": [
+            {"name": "Squats", "sets": [{"weight": Decimal(100), "reps": Decimal(10)}]}
+        ],
+    }
+
+    trusted = WorkoutLog.from_trusted(item)
+
+    assert trusted == log
+    assert trusted.dict() == log.dict()
+    assert isinstance(trusted.logs[0].sets[0].reps, int)
+
+
+def test_workout_plan_from_trusted_defaults_missing_fields():
+    item = {"id": "1", "name": "Leg Day", "created_at": "2021-01-01", "exercises": []}
+
+    plan = WorkoutPlan.from_trusted(item)
+
+    assert plan.updated_at == "2021-01-01"
+    assert plan.version == 1
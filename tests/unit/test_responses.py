@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+import json
+from decimal import Decimal
+
+from src.api.responses import dumps
+from src.model import ExerciseLog, SetLog
+
+
+def test_dumps_encodes_decimals_and_models_like_pydantic():
+    exercise_log = ExerciseLog(
+        name="Squat",
+        sets=[
+            SetLog(weight=Decimal("100"), reps=5),
+            SetLog(weight=Decimal("102.5"), reps=3),
+        ],
+    )
+
+    assert json.loads(dumps([exercise_log])) == [json.loads(exercise_log.json())]
+    assert dumps({"weight": Decimal("102.5")}) == b'{"weight":102.5}'
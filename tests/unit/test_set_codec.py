@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import struct
+from decimal import Decimal
+
+import pytest
+
+from src.adapters.repository.set_codec import COMPRESSED, pack_sets, unpack_sets
+from src.exceptions import WorkoutError
+
+
+def test_pack_sets_round_trips_decimals():
+    sets = [
+        {"weight": Decimal("102.5"), "reps": 5},
+        {"weight": Decimal("100"), "reps": 8},
+        {"weight": Decimal("0.125"), "reps": 12},
+    ]
+
+    packed = pack_sets(sets)
+
+    assert packed is not None
+    assert unpack_sets(packed) == sets
+
+
+def test_pack_sets_compresses_repetitive_sets():
+    sets = [{"weight": Decimal("140"), "reps": 5} for _ in range(100)]
+
+    packed = pack_sets(sets)
+
+    assert packed is not None
+    assert packed[1] & COMPRESSED
+    assert len(packed) < 100
+    assert unpack_sets(packed) == sets
+
+
+def test_pack_sets_without_sets():
+    packed = pack_sets([])
+
+    assert packed is not None
+    assert unpack_sets(packed) == []
+
+
+@pytest.mark.parametrize(
+    "set_",
+    [
+        {"weight": Decimal("0.0000000001"), "reps": 1},
+        {"weight": Decimal(2**31), "reps": 1},
+        {"weight": Decimal(1), "reps": 2**31},
+    ],
+)
+def test_pack_sets_refuses_unpackable_sets(set_):
+    assert pack_sets([set_]) is None
+
+
+def test_unpack_sets_refuses_unknown_versions():
+    with pytest.raises(WorkoutError):
+        unpack_sets(struct.pack("<BB", 99, 0))
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+from decimal import Decimal
+
+from src.model import ExerciseLog, SetLog, WorkoutLog
+from src.stats import (
+    aggregate_exercise_stats,
+    best_exercise_records,
+    estimated_one_rep_max,
+    exercise_history_entries,
+    exercise_records,
+    normalise_exercise_name,
+)
+
+
+def _workout_log(created_at: str, name: str, *sets: tuple[str, int]) -> WorkoutLog:
+    return WorkoutLog(
+        name="workout",
+        created_at=created_at,
+        plans=[],
+        logs=[
+            ExerciseLog(
+                name=name,
+                sets=[
+                    SetLog(weight=Decimal(weight), reps=reps) for weight, reps in sets
+                ],
+            )
+        ],
+    )
+
+
+def test_normalise_exercise_name():
+    assert normalise_exercise_name("  Bench   Press ") == "bench press"
+
+
+def test_estimated_one_rep_max():
+    assert estimated_one_rep_max(Decimal(100), 1) == Decimal(100)
+    assert estimated_one_rep_max(Decimal(100), 10) == Decimal("133.33")
+
+
+def test_aggregate_exercise_stats():
+    workout_logs = [
+        _workout_log("2021-01-01", "bench press", ("100", 5), ("90", 8)),
+        _workout_log("2021-01-02", "Bench Press", ("105", 3)),
+        _workout_log("2021-01-03", "Squat", ("140", 0)),
+    ]
+
+    bench_press, squat = aggregate_exercise_stats(workout_logs)
+
+    assert bench_press.name == "Bench Press"
+    assert bench_press.log_count == 2
+    assert bench_press.set_count == 3
+    assert bench_press.rep_count == 16
+    assert bench_press.total_volume == Decimal(500 + 720 + 315)
+    assert bench_press.best_weight == Decimal(105)
+    assert bench_press.estimated_one_rep_max == Decimal("116.67")
+    assert bench_press.last_performed_at == "2021-01-02"
+    assert squat.best_weight is None
+    assert squat.estimated_one_rep_max is None
+    assert aggregate_exercise_stats(workout_logs, exercise="squat") == [squat]
+
+
+def test_exercise_records():
+    workout_log = _workout_log(
+        "2021-01-01", "Squat", ("100", 5), ("110", 5), ("120", 1), ("200", 0)
+    )
+
+    records = exercise_records(workout_log)
+
+    assert set(records) == {("squat", 5), ("squat", 1)}
+    assert records[("squat", 5)].weight == Decimal(110)
+    assert records[("squat", 5)].workout_log_id == workout_log.id
+    assert records[("squat", 5)].performed_at == "2021-01-01"
+
+
+def test_best_exercise_records():
+    first = _workout_log("2021-01-01", "squat", ("100", 5), ("120", 1))
+    tied = _workout_log("2021-01-02", "Squat", ("100", 5))
+    heavier = _workout_log("2021-01-03", "Squat", ("125", 1))
+
+    one_rep, five_reps = best_exercise_records([tied, heavier, first])
+
+    assert (one_rep.reps, one_rep.weight) == (1, Decimal(125))
+    assert one_rep.workout_log_id == heavier.id
+    assert (five_reps.reps, five_reps.weight) == (5, Decimal(100))
+    assert five_reps.workout_log_id == first.id
+    assert best_exercise_records([first, heavier], keys={("squat", 5)}) == [five_reps]
+
+
+def test_exercise_history_entries():
+    workout_log = _workout_log("2021-01-01", "Squat", ("100", 5))
+    workout_log.logs.append(
+        ExerciseLog(name="squat ", sets=[SetLog(weight=Decimal(90), reps=8)])
+    )
+
+    (squat,) = exercise_history_entries(workout_log).values()
+
+    assert squat.name == "Squat"
+    assert squat.workout_log_id == workout_log.id
+    assert squat.performed_at == "2021-01-01"
+    assert [set_log.weight for set_log in squat.sets] == [Decimal(100), Decimal(90)]
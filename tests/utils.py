@@ -12,19 +12,22 @@ def random_lower_string() -> str:
     return "".join(random.choices(string.ascii_lowercase, k=32))
 
 
-def add_workout_plan_to_db(
-    plans_repository: repository.WorkoutRepository[model.WorkoutPlan],
-    user_email: str,
-) -> model.WorkoutPlan:
-    """Add a random workout plan to the database."""
-    workout_plan_create = model.WorkoutPlanCreate(
+def random_workout_plan_create() -> model.WorkoutPlanCreate:
+    return model.WorkoutPlanCreate(
         name=random_lower_string(),
         exercises=[
             model.ExercisePlan(name=random_lower_string(), sets=random.randint(1, 10))
             for _ in range(random.randint(1, 10))
         ],
     )
-    return plans_repository.create(model=workout_plan_create, owner=user_email)
+
+
+def add_workout_plan_to_db(
+    plans_repository: repository.WorkoutRepository[model.WorkoutPlan],
+    user_email: str,
+) -> model.WorkoutPlan:
+    """Add a random workout plan to the database."""
+    return plans_repository.create(model=random_workout_plan_create(), owner=user_email)
 
 
 def add_workout_log_to_db(